@@ -0,0 +1,60 @@
+"""Home Assistant core setup shared by the benchmark scripts."""
+from __future__ import annotations
+
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+REPO = Path(__file__).resolve().parent.parent
+DOMAIN = "nio_vehicle"
+
+
+def free_port() -> int:
+    """Return a TCP port that is free on the loopback interface."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def async_start_hass(prefix: str) -> HomeAssistant:
+    """Return a bare Home Assistant core with the integration set up.
+
+    The core runs in a temporary config directory that links to the
+    integration of this repository. Stop it with async_stop_hass.
+    """
+    # homeassistant.core 必须先于 loader 导入，否则会循环导入
+    from homeassistant.core import HomeAssistant
+    from homeassistant import bootstrap, loader
+    from homeassistant.auth import auth_manager_from_config
+    from homeassistant.config_entries import ConfigEntries
+    from homeassistant.setup import async_setup_component
+
+    config_dir = tempfile.mkdtemp(prefix=prefix)
+    os.symlink(REPO / "custom_components", Path(config_dir) / "custom_components")
+    sys.path.insert(0, config_dir)
+
+    hass = HomeAssistant(config_dir)
+    if hasattr(loader, "async_setup"):
+        loader.async_setup(hass)
+    hass.config.skip_pip = True
+    hass.config_entries = ConfigEntries(hass, {})
+    # 加载注册表和配置条目；http（集成的依赖）还需要认证管理器
+    await bootstrap.async_load_base_functionality(hass)
+    hass.auth = await auth_manager_from_config(hass, [], [])
+    # 集成依赖 http，使用空闲端口以免与运行中的 Home Assistant 冲突
+    await async_setup_component(
+        hass, DOMAIN, {"http": {"server_host": ["127.0.0.1"], "server_port": free_port()}}
+    )
+    return hass
+
+
+async def async_stop_hass(hass: HomeAssistant) -> None:
+    """Stop a core started with async_start_hass."""
+    await hass.async_stop(force=True)
+    sys.path.remove(hass.config.config_dir)
@@ -0,0 +1,272 @@
+"""Local stand-in for the NIO vehicle status API.
+
+Serves /api/2/rvs/vehicle/{vehicle_id}/status with deterministic, slowly
+changing vehicle data. Latency, error rates and payload size are
+configurable, so the integration can be exercised without the real cloud.
+
+/api/2/rvs/vehicle/{vehicle_id}/stream pushes the changed status groups as
+websocket messages (or server-sent events for plain HTTP requests), as a
+stand-in for a push bridge.
+
+POST /api/2/rvs/vehicle/{vehicle_id}/command/{command} accepts the remote
+commands; their effect shows up in the status after a configurable delay.
+
+    python bench/mock_server.py --port 8080 --latency 80 --error-rate 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+STATUS_PATH = "/api/2/rvs/vehicle/{vehicle_id}/status"
+STREAM_PATH = "/api/2/rvs/vehicle/{vehicle_id}/stream"
+COMMAND_PATH = "/api/2/rvs/vehicle/{vehicle_id}/command/{command}"
+
+# 命令生效后覆盖的状态字段：(字段组, 属性, 值)
+COMMAND_EFFECTS = {
+    "lock": ("door_status", "vehicle_lock_status", 1),
+    "unlock": ("door_status", "vehicle_lock_status", 0),
+    "hvac_on": ("hvac_status", "air_con_on", 1),
+    "hvac_off": ("hvac_status", "air_con_on", 0),
+    "charge_port_open": ("door_status", "second_charge_port_ajar_status", 0),
+    "charge_port_close": ("door_status", "second_charge_port_ajar_status", 1),
+}
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock server."""
+
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    padding: int = 0
+    # 仿真时间倍速，用于快速产生行驶和充电数据
+    speed: float = 1.0
+    # 推送流检查状态变化的间隔（秒）
+    push_interval: float = 1.0
+    # 远程命令在状态中生效的延迟（秒）
+    command_delay: float = 5.0
+
+
+@dataclass
+class MockStats:
+    """Counters of served requests."""
+
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    bytes_sent: int = 0
+    pushes: int = 0
+    commands: int = 0
+    fields: dict[str, int] = field(default_factory=dict)
+
+
+def _seed(vehicle_id: str) -> int:
+    return zlib.crc32(vehicle_id.encode())
+
+
+def vehicle_status(vehicle_id: str, now: float, padding: int = 0) -> dict:
+    """Return the full status of a simulated vehicle at a point in time."""
+    seed = _seed(vehicle_id)
+    # 每辆车以 2 小时为周期：行驶 30 分钟、停放、充电 40 分钟
+    phase = (now + seed % 7200) % 7200
+    cycle = (now + seed % 7200) // 7200
+    driving = phase < 1800
+    charging = 3600 <= phase < 6000
+    progress = min(phase, 1800) / 1800
+
+    mileage = 10000 + seed % 50000 + cycle * 40 + progress * 40
+    if charging:
+        soc = 40 + (phase - 3600) / 2400 * 50
+    elif phase < 1800:
+        soc = 90 - progress * 50
+    elif phase < 3600:
+        soc = 40
+    else:
+        soc = 90
+    angle = (seed % 360) * math.pi / 180
+    latitude = 31.2 + (seed % 1000) / 10000 + math.sin(angle) * progress * 0.2
+    longitude = 121.4 + (seed % 977) / 10000 + math.cos(angle) * progress * 0.2
+    pressure = 2.6 + (seed % 10) / 100 + random.uniform(-0.01, 0.01)
+
+    status = {
+        "soc_status": {
+            "soc": round(soc, 1),
+            "remaining_range": round(soc * 5.2),
+            "remaining_actual_range": round(soc * 4.6),
+            "charge_state": 1 if charging else 0,
+        },
+        "door_status": {
+            "vehicle_lock_status": 0 if driving else 1,
+            "door_ajar_front_left_status": 1,
+            "door_ajar_front_right_status": 1,
+            "door_ajar_rear_left_status": 1,
+            "door_ajar_rear_right_status": 1,
+            "tailgate_ajar_status": 1,
+            "second_charge_port_ajar_status": 0 if charging else 1,
+        },
+        "tyre_status": {
+            f"{position}_wheel_press_bar": round(pressure, 2)
+            for position in ("front_left", "front_right", "rear_left", "rear_right")
+        },
+        "hvac_status": {
+            "outside_temperature": round(18 + 8 * math.sin(now / 43200 * math.pi), 1),
+        },
+        "exterior_status": {"mileage": round(mileage, 1)},
+        "position_status": {
+            "latitude": round(latitude, 6),
+            "longitude": round(longitude, 6),
+        },
+        "connection_status": {"connection": 1},
+    }
+    if padding:
+        status["special_status"] = {"padding": "x" * padding}
+    return status
+
+
+def _status_key(field_name: str) -> str:
+    return field_name if field_name.endswith("_status") else f"{field_name}_status"
+
+
+def create_app(config: MockConfig | None = None) -> web.Application:
+    """Create the mock API application."""
+    config = config or MockConfig()
+    stats = MockStats()
+    started = time.time()
+    app = web.Application()
+    app["config"] = config
+    app["stats"] = stats
+
+    # 车辆 ID -> {(字段组, 属性): (值, 生效时间)}
+    overrides: dict[str, dict[tuple[str, str], tuple[int, float]]] = {}
+
+    def simulated_now() -> float:
+        return started + (time.time() - started) * config.speed
+
+    def current_status(vehicle_id: str) -> dict:
+        status = vehicle_status(vehicle_id, simulated_now(), config.padding)
+        now = time.time()
+        for (key, name), (value, effective) in overrides.get(vehicle_id, {}).items():
+            if effective <= now:
+                status[key][name] = value
+        return status
+
+    async def handle_status(request: web.Request) -> web.Response:
+        stats.requests += 1
+        await asyncio.sleep(max(random.gauss(config.latency, config.jitter), 0))
+
+        roll = random.random()
+        if roll < config.rate_limit_rate:
+            stats.rate_limited += 1
+            return web.Response(status=429, headers={"Retry-After": "30"})
+        if roll < config.rate_limit_rate + config.error_rate:
+            stats.errors += 1
+            return web.Response(status=503)
+
+        requested = request.query.getall("field", [])
+        for name in requested:
+            stats.fields[name] = stats.fields.get(name, 0) + 1
+        status = current_status(request.match_info["vehicle_id"])
+        if requested:
+            keys = {_status_key(name) for name in requested}
+            status = {key: value for key, value in status.items() if key in keys}
+
+        body = json.dumps({"result_code": "success", "data": status}).encode()
+        stats.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def handle_stream(request: web.Request) -> web.StreamResponse:
+        vehicle_id = request.match_info["vehicle_id"]
+        websocket = web.WebSocketResponse(heartbeat=30)
+        if websocket.can_prepare(request).ok:
+            response: web.StreamResponse = websocket
+        else:
+            # 普通 HTTP 请求按 server-sent events 推送
+            response = web.StreamResponse(
+                headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+            )
+        await response.prepare(request)
+
+        previous: dict = {}
+        try:
+            while not websocket.closed:
+                status = current_status(vehicle_id)
+                # 只推送发生变化的字段组；胎压带有噪声，不推送
+                delta = {
+                    key: value
+                    for key, value in status.items()
+                    if key != "tyre_status" and previous.get(key) != value
+                }
+                previous = status
+                if delta:
+                    stats.pushes += 1
+                    message = json.dumps({"vehicle_id": vehicle_id, "data": delta})
+                    if response is websocket:
+                        await websocket.send_str(message)
+                    else:
+                        await response.write(f"data: {message}\n\n".encode())
+                await asyncio.sleep(config.push_interval)
+        except ConnectionResetError:
+            pass
+        return response
+
+    async def handle_command(request: web.Request) -> web.Response:
+        stats.commands += 1
+        await asyncio.sleep(max(random.gauss(config.latency, config.jitter), 0))
+        if (effect := COMMAND_EFFECTS.get(request.match_info["command"])) is None:
+            body = {"result_code": "invalid_command"}
+        else:
+            key, name, value = effect
+            overrides.setdefault(request.match_info["vehicle_id"], {})[key, name] = (
+                value,
+                time.time() + config.command_delay,
+            )
+            body = {"result_code": "success", "data": {}}
+        return web.json_response(body)
+
+    app.router.add_get(STATUS_PATH, handle_status)
+    app.router.add_get(STREAM_PATH, handle_stream)
+    app.router.add_post(COMMAND_PATH, handle_command)
+    return app
+
+
+def main() -> None:
+    """Run the mock server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=50, help="mean latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="latency stddev in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--padding", type=int, default=0, help="extra payload bytes")
+    parser.add_argument("--speed", type=float, default=1.0, help="simulated time factor")
+    parser.add_argument("--push-interval", type=float, default=1.0, help="stream check interval in s")
+    parser.add_argument("--command-delay", type=float, default=5.0, help="command effect delay in s")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        padding=args.padding,
+        speed=args.speed,
+        push_interval=args.push_interval,
+        command_delay=args.command_delay,
+    )
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Offline replay of recorded NIO API traffic.
+
+Sets up a Home Assistant core with one config entry per recording (see
+"Record API traffic" in the integration options) and feeds the recordings
+through the replay push transport, by default as fast as possible. No
+network access is needed: the API client is replaced by one that answers
+the first poll from the recording. Reports the replay throughput, CPU time
+per record and state writes, and optionally a cProfile of the run.
+
+Requires homeassistant to be installed:
+
+    python bench/replay.py config/nio_vehicle_traffic/*.jsonl.gz --profile replay.prof
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import json
+import time
+from pathlib import Path
+
+from harness import DOMAIN, async_start_hass, async_stop_hass
+
+
+async def run_replay(paths: list[Path], args: argparse.Namespace) -> dict:
+    """Replay the recordings and return the measurements."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import EVENT_STATE_CHANGED
+
+    hass = await async_start_hass("nio_replay_")
+
+    # 与集成加载器使用同一个模块，才能替换共享的客户端
+    from custom_components.nio_vehicle.api import NIOApiClient
+    from custom_components.nio_vehicle.const import DATA_CLIENT
+    from custom_components.nio_vehicle.traffic import KIND_POLL, read_recording
+
+    first_polls = {}
+    for index, path in enumerate(paths):
+        first_polls[f"replay{index:04d}"] = next(
+            (record.data for record in read_recording(path) if record.kind == KIND_POLL),
+            {},
+        )
+
+    class ReplayClient(NIOApiClient):
+        """API client that answers polls from the recordings."""
+
+        async def async_get_status(self, request, fields, timing=None):
+            return first_polls[request.vehicle_id]
+
+        async def async_send_command(self, request, command, params, timing=None):
+            return {}
+
+    hass.data[DATA_CLIENT] = ReplayClient(None)
+
+    state_writes = 0
+
+    def _count_state(event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state)
+
+    entries = [
+        ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title=f"NIO Vehicle ({vehicle_id})",
+            data={
+                "vehicle_id": vehicle_id,
+                "access_token": "replay",
+                "device_id": "replay",
+                "sign": "replay",
+                "timestamp": str(int(time.time())),
+                "app_version": "5.36.1",
+            },
+            source="user",
+            options={
+                "push_transport": "replay",
+                "replay_path": str(path.resolve()),
+                "replay_speed": args.speed,
+                "enable_archive": args.archive,
+            },
+        )
+        for vehicle_id, path in zip(first_polls, paths)
+    ]
+    await asyncio.gather(*(hass.config_entries.async_add(entry) for entry in entries))
+    await hass.async_block_till_done()
+    transports = [hass.data[DOMAIN][entry.entry_id].push for entry in entries]
+
+    state_writes = 0
+    profiler = cProfile.Profile() if args.profile else None
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    await asyncio.gather(*(transport.finished.wait() for transport in transports))
+    await hass.async_block_till_done()
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+    wall = time.perf_counter() - wall_start
+    cpu_used = time.process_time() - cpu_start
+
+    records = sum(transport.records for transport in transports)
+    await async_stop_hass(hass)
+
+    return {
+        "recordings": len(paths),
+        "records": records,
+        "seconds": round(wall, 3),
+        "records_per_second": round(records / wall, 1) if wall else None,
+        "cpu_ms_per_record": round(cpu_used * 1000 / records, 3) if records else None,
+        "state_writes": state_writes,
+    }
+
+
+def main() -> None:
+    """Run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="+", type=Path)
+    parser.add_argument(
+        "--speed", type=float, default=0, help="replay speed, 0 for as fast as possible"
+    )
+    parser.add_argument("--archive", action="store_true", help="enable the telemetry archive")
+    parser.add_argument("--profile", help="write a cProfile of the replay to this file")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run_replay(args.recordings, args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Scalability benchmark for the NIO Vehicle integration.
+
+Starts the mock API in a separate process, sets up a Home Assistant core
+with one config entry per simulated vehicle and lets the coordinators and
+all platforms run against the mock for a while. Reports poll latency
+percentiles, event loop lag, CPU time per poll, memory per vehicle and
+state writes per minute.
+
+Requires homeassistant to be installed:
+
+    python bench/run_benchmark.py --vehicles 1,100,1000 --duration 120
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import quantiles
+
+from aiohttp import web
+
+from harness import DOMAIN, async_start_hass, async_stop_hass, free_port
+import mock_server
+
+
+def _serve(port: int, config: mock_server.MockConfig) -> None:
+    web.run_app(
+        mock_server.create_app(config), host="127.0.0.1", port=port, print=None
+    )
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p95": value, "p99": value, "max": value}
+    cuts = quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(values)}
+
+
+async def _monitor_loop_lag(lags: list[float], interval: float = 0.1) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def run_scenario(vehicles: int, duration: float, args: argparse.Namespace) -> dict:
+    """Run one benchmark scenario and return its measurements."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import EVENT_STATE_CHANGED
+
+    hass = await async_start_hass("nio_bench_")
+
+    # 与集成加载器使用同一个模块，才能替换共享的客户端和调度器
+    from custom_components.nio_vehicle import NIOVehicleDataUpdateCoordinator
+    from custom_components.nio_vehicle.api import NIOApiClient, async_get_client
+    from custom_components.nio_vehicle.const import DATA_CLIENT, DATA_FLEET
+    from custom_components.nio_vehicle.fleet import FleetScheduler
+
+    client = async_get_client(hass)
+    hass.data[DATA_CLIENT] = NIOApiClient(
+        client.session, base_url=f"http://127.0.0.1:{args.port}/api/2/rvs/vehicle"
+    )
+    hass.data[DATA_FLEET] = FleetScheduler(args.concurrency)
+
+    latencies: list[float] = []
+    polls = 0
+    original_update = NIOVehicleDataUpdateCoordinator._async_update_data
+
+    async def timed_update(self):
+        nonlocal polls
+        start = time.perf_counter()
+        try:
+            return await original_update(self)
+        finally:
+            polls += 1
+            latencies.append(time.perf_counter() - start)
+
+    NIOVehicleDataUpdateCoordinator._async_update_data = timed_update
+
+    state_writes = 0
+
+    def _count_state(event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state)
+
+    gc.collect()
+    tracemalloc.start()
+    base_memory = tracemalloc.get_traced_memory()[0]
+    entries = [
+        ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title=f"NIO Vehicle ({index})",
+            data={
+                "vehicle_id": f"bench{index:06d}",
+                "access_token": f"token{index % 10}",
+                "device_id": "bench",
+                "sign": "bench",
+                "timestamp": str(int(time.time())),
+                "app_version": "5.36.1",
+            },
+            source="user",
+            options={
+                "min_scan_interval": args.interval,
+                "max_scan_interval": args.interval,
+            },
+        )
+        for index in range(vehicles)
+    ]
+    await asyncio.gather(*(hass.config_entries.async_add(entry) for entry in entries))
+    await hass.async_block_till_done()
+    gc.collect()
+    memory_per_vehicle = (tracemalloc.get_traced_memory()[0] - base_memory) / vehicles
+    tracemalloc.stop()
+
+    latencies.clear()
+    polls = 0
+    state_writes = 0
+    lags: list[float] = []
+    monitor = asyncio.create_task(_monitor_loop_lag(lags))
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu_used = time.process_time() - cpu_start
+    monitor.cancel()
+
+    NIOVehicleDataUpdateCoordinator._async_update_data = original_update
+    await async_stop_hass(hass)
+
+    return {
+        "vehicles": vehicles,
+        "polls": polls,
+        "poll_latency_ms": {
+            key: round(value * 1000, 1) for key, value in _percentiles(latencies).items()
+        },
+        "loop_lag_ms": {
+            key: round(value * 1000, 1) for key, value in _percentiles(lags).items()
+        },
+        "cpu_ms_per_poll": round(cpu_used * 1000 / polls, 3) if polls else None,
+        "memory_kb_per_vehicle": round(memory_per_vehicle / 1024, 1),
+        "state_writes_per_minute": round(state_writes * 60 / duration, 1),
+    }
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", default="1,100,1000")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per scenario")
+    parser.add_argument("--interval", type=int, default=10, help="poll interval in s")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=50, help="mock latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--padding", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=60, help="simulated time factor")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+    args.port = free_port()
+
+    server = multiprocessing.Process(
+        target=_serve,
+        args=(
+            args.port,
+            mock_server.MockConfig(
+                latency=args.latency / 1000,
+                jitter=args.latency / 4000,
+                error_rate=args.error_rate,
+                padding=args.padding,
+                speed=args.speed,
+            ),
+        ),
+        daemon=True,
+    )
+    server.start()
+    time.sleep(1)
+
+    results = []
+    try:
+        for vehicles in (int(value) for value in args.vehicles.split(",")):
+            result = asyncio.run(run_scenario(vehicles, args.duration, args))
+            results.append(result)
+            print(json.dumps(result))
+    finally:
+        server.terminate()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,24 @@
 """The NIO Vehicle integration."""
 from __future__ import annotations
 
-import logging
 import asyncio
-from datetime import timedelta
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import count
+from typing import Any
 
-import aiohttp
-import async_timeout
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
@@ -27,16 +33,67 @@ from .const import (
     CONF_DEVICE_ID,
     CONF_SIGN,
     CONF_TIMESTAMP,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_BATTERY_CAPACITY,
+    CONF_CHARGE_TARGET,
+    CONF_ENABLE_METRICS,
+    CONF_ENABLE_ARCHIVE,
+    CONF_ENABLE_COMMANDS,
+    CONF_ENABLE_EXPORTER,
+    CONF_PLACES_FILE,
+    CONF_RECORD_TRAFFIC,
+    CREDENTIAL_RENEW_AHEAD,
+    DATA_FLEET,
     DEFAULT_SCAN_INTERVAL,
-    API_HEADERS,
-    API_BASE_URL,
-    DEFAULT_APP_ID,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_CHARGE_TARGET,
     DEFAULT_APP_VERSION,
-    DEFAULT_LANGUAGE,
-    DEFAULT_REGION,
+    DEFAULT_REFRESH_MAX_AGE,
+    PUSH_RECONCILE_INTERVAL,
+    PUSH_REPLAY,
+    ATTR_CACHED_AT,
+    CACHE_MAX_AGE,
     MANUFACTURER,
     MODEL,
+    SCHEDULER_FIELDS,
+    SLOW_FIELDS,
+    SLOW_FIELDS_INTERVAL,
+    STATUS_FIELDS,
+    TOPIC_CHARGING,
+    TOPIC_EFFICIENCY,
+    TOPIC_PLACE,
+    TOPIC_TRIP,
+    TOPIC_TYRE_LEAK,
+)
+from .api import NIOApiAuthError, NIOApiError, async_get_client
+from .archive import TelemetryArchive
+from .charging import ChargingTracker
+from .commands import CommandQueue
+from .credentials import CredentialInfo
+from .efficiency import EfficiencyStats, EfficiencyWindow, compute_efficiency
+from .exporter import EXPORTED_FIELDS, async_get_exporter
+from .fleet import FleetScheduler
+from .geocode import Geocoder, PlaceMatch, async_get_geocoder
+from .metrics import PollMetrics, RequestTiming
+from .model import GROUP_MODELS, VehicleSnapshot
+from .push import async_create_transport
+from .resilience import async_call_with_retry, async_get_circuit_breaker
+from .scheduler import AdaptiveScheduler
+from .services import (
+    async_setup_command_service,
+    async_setup_services,
+    async_unload_command_service,
 )
+from .storage import SnapshotCache
+from .traffic import KIND_POLL, KIND_PUSH, TrafficRecorder
+from .trail import LocationTrail
+from .trips import TripDetector
+from .tyres import TyreLeakDetector
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,6 +113,10 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Required(CONF_SIGN): str,
                 vol.Required(CONF_TIMESTAMP): str,
                 vol.Optional(CONF_APP_VERSION, default=DEFAULT_APP_VERSION): str,
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=DEFAULT_MAX_CONCURRENT_REQUESTS,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             }
         )
     },
@@ -65,6 +126,12 @@ CONFIG_SCHEMA = vol.Schema(
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the NIO Vehicle component."""
     hass.data.setdefault(DOMAIN, {})
+    hass.data[DATA_FLEET] = FleetScheduler(
+        config.get(DOMAIN, {}).get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+    )
+    async_setup_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -74,24 +141,113 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         config_entry=entry,
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    if places_file := entry.options.get(CONF_PLACES_FILE):
+        coordinator.geocoder = await async_get_geocoder(hass, places_file)
+
+    coordinator.initial_fields = _async_initial_fields(hass, entry, coordinator)
+    snapshot = await coordinator.cache.async_load()
+    if snapshot is None:
+        await coordinator.async_config_entry_first_refresh()
+    else:
+        # 先用缓存的状态创建实体，实时数据在后台获取
+        coordinator.async_set_updated_data(snapshot)
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    if coordinator.commands is not None:
+        async_setup_command_service(hass)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    
+    if entry.options.get(CONF_ENABLE_EXPORTER):
+        entry.async_on_unload(async_get_exporter(hass).async_register(coordinator))
+    if snapshot is not None:
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_refresh(),
+            f"{DOMAIN}_first_refresh_{coordinator.vehicle_id}",
+        )
+    if coordinator.push is not None:
+        entry.async_on_unload(coordinator.push.async_stop)
+        entry.async_create_background_task(
+            hass,
+            coordinator.push.async_start(),
+            f"{DOMAIN}_push_start_{coordinator.vehicle_id}",
+        )
+    if stores := [
+        store
+        for store in (coordinator.archive, coordinator.traffic)
+        if store is not None
+    ]:
+
+        @callback
+        def _async_flush_stores(event: Event | None = None) -> None:
+            for store in stores:
+                hass.async_create_task(store.async_flush())
+
+        entry.async_on_unload(_async_flush_stores)
+        entry.async_on_unload(
+            hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _async_flush_stores)
+        )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
+@callback
+def _async_initial_fields(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: NIOVehicleDataUpdateCoordinator,
+) -> frozenset[str]:
+    """Return the field groups of the entities the platforms will add.
+
+    The first refresh runs before the entities register their listeners,
+    so the groups are taken from the entity tables and the registry.
+    """
+    # 平台模块导入本模块，只能在这里导入
+    from .binary_sensor import BINARY_SENSORS
+    from .sensor import SENSORS
+
+    registry = er.async_get(hass)
+    vehicle_id = entry.data[CONF_VEHICLE_ID]
+    fields = {"position"}
+    for platform, descriptions in (
+        (Platform.SENSOR, SENSORS),
+        (Platform.BINARY_SENSOR, BINARY_SENSORS),
+    ):
+        for description in descriptions:
+            if description.path is None:
+                continue
+            entity_id = registry.async_get_entity_id(
+                platform, DOMAIN, f"{vehicle_id}_{description.key}"
+            )
+            if entity_id is None:
+                enabled = description.entity_registry_enabled_default
+            else:
+                enabled = not registry.async_get(entity_id).disabled
+            if enabled:
+                fields.add(description.path.split(".")[0])
+    if entry.options.get(CONF_ENABLE_EXPORTER):
+        fields |= EXPORTED_FIELDS
+    return frozenset(fields)
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_unload_command_service(hass)
 
     return unload_ok
 
-class NIOVehicleDataUpdateCoordinator(DataUpdateCoordinator):
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached status of a deleted config entry."""
+    await SnapshotCache(hass, entry.entry_id).async_remove()
+
+class NIOVehicleDataUpdateCoordinator(DataUpdateCoordinator[VehicleSnapshot]):
     """Class to manage fetching NIO Vehicle data."""
 
     def __init__(
@@ -107,66 +263,444 @@ class NIOVehicleDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=DEFAULT_SCAN_INTERVAL,
         )
         self.config_entry = config_entry
-        self.session = async_get_clientsession(hass)
+        self.vehicle_id = config_entry.data[CONF_VEHICLE_ID]
+        self.client = async_get_client(hass)
+        self._request = self.client.vehicle_request(config_entry.data)
+        self.breaker = async_get_circuit_breaker(hass, config_entry.data)
+        self.credentials = CredentialInfo.from_data(config_entry.data)
+        self._reauth_requested = False
+        self.metrics = (
+            PollMetrics() if config_entry.options.get(CONF_ENABLE_METRICS) else None
+        )
+        self.trail = LocationTrail()
+        self.trips = TripDetector()
+        self.tyre_leaks = TyreLeakDetector()
+        self.charging = ChargingTracker(
+            capacity=config_entry.options.get(
+                CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY
+            ),
+            target_soc=config_entry.options.get(
+                CONF_CHARGE_TARGET, DEFAULT_CHARGE_TARGET
+            ),
+        )
+        self.efficiency = EfficiencyWindow()
+        self.efficiency_stats: EfficiencyStats | None = None
+        self._efficiency_task: asyncio.Task | None = None
+        self.cache = SnapshotCache(hass, config_entry.entry_id)
+        self.archive = (
+            TelemetryArchive(hass, self.vehicle_id)
+            if config_entry.options.get(CONF_ENABLE_ARCHIVE)
+            else None
+        )
+        # 由 async_setup_entry 在首次刷新前加载
+        self.geocoder: Geocoder | None = None
+        self.place: PlaceMatch | None = None
+        self.traffic = (
+            TrafficRecorder(hass, self.vehicle_id)
+            if config_entry.options.get(CONF_RECORD_TRAFFIC)
+            else None
+        )
+        self.push = async_create_transport(
+            hass, config_entry, self._async_handle_push, self._async_push_connection
+        )
+        self.fleet: FleetScheduler = hass.data[DATA_FLEET]
+        self.commands = (
+            CommandQueue(self)
+            if config_entry.options.get(CONF_ENABLE_COMMANDS)
+            else None
+        )
+        config_entry.async_on_unload(self.fleet.async_register(self.vehicle_id))
+        self.scheduler = AdaptiveScheduler(
+            min_interval=timedelta(
+                seconds=config_entry.options.get(
+                    CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                )
+            ),
+            max_interval=timedelta(
+                seconds=config_entry.options.get(
+                    CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                )
+            ),
+        )
+        # 首次刷新时实体尚未注册，由 async_setup_entry 根据实体表设置
+        self.initial_fields: frozenset[str] = frozenset()
+        # 曾经请求过的字段组，用于判断慢字段是否已获取过
+        self._requested_fields: set[str] = set()
+        self._slow_fetched_at: datetime | None = None
+        # 本次刷新中发生变化的字段组，None 表示通知全部监听者
+        self._changed_fields: set[str] | None = None
+        self._last_notified_success = True
+        # 按需刷新：额外请求的字段组和进行中的共享请求
+        self._forced_fields: set[str] = set()
+        self._refresh_task: asyncio.Task | None = None
+        self._refresh_fields: frozenset[str] | None = None
 
-    async def _async_update_data(self):
-        """Fetch data from NIO API."""
-        headers = API_HEADERS.copy()
-        headers["Authorization"] = f"Bearer {self.config_entry.data[CONF_ACCESS_TOKEN]}"
-        headers["User-Agent"] = headers["User-Agent"].replace(
-            DEFAULT_APP_VERSION, 
-            self.config_entry.data.get(CONF_APP_VERSION, DEFAULT_APP_VERSION)
+    @property
+    def serving_cache(self) -> bool:
+        """Return True while the restored snapshot stands in for live data.
+
+        A restored snapshot is replaced by the first successful poll, so
+        entities stay available on it while the API is unreachable at
+        startup, until it is too old.
+        """
+        snapshot = self.data
+        return (
+            snapshot is not None
+            and snapshot.restored
+            and dt_util.utcnow() - snapshot.fetched_at <= CACHE_MAX_AGE
         )
 
-        url = f"{API_BASE_URL}/{self.config_entry.data[CONF_VEHICLE_ID]}/status"
-        
-        params = {
-            "field": [
-                "soc", "door", "position", "connection", "exterior",
-                "hvac", "window", "tyre", "maintain", "special",
-                "fota", "heating", "offcar_mode_status", "light",
-                "mix_auth", "remote_operate_status", "frdg",
-                "nearby_car_ctrl", "trip_share_status",
-                "offcar_power_swap_status"
-            ],
-            "timestamp": self.config_entry.data[CONF_TIMESTAMP],
-            "device_id": self.config_entry.data[CONF_DEVICE_ID],
-            "app_id": DEFAULT_APP_ID,
-            "app_ver": self.config_entry.data.get(CONF_APP_VERSION, DEFAULT_APP_VERSION),
-            "lang": DEFAULT_LANGUAGE,
-            "region": DEFAULT_REGION,
-            "sign": self.config_entry.data[CONF_SIGN]
+    @property
+    def requested_fields(self) -> frozenset[str]:
+        """Return the field groups requested so far."""
+        return frozenset(self._requested_fields)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose status groups changed."""
+        if self.metrics is None:
+            self._async_notify_listeners()
+            return
+        start = time.perf_counter()
+        self._async_notify_listeners()
+        self.metrics.record_dispatch(time.perf_counter() - start)
+
+    @callback
+    def _async_notify_listeners(self) -> None:
+        changed, self._changed_fields = self._changed_fields, None
+        if (
+            changed is None
+            or not self.last_update_success
+            or not self._last_notified_success
+        ):
+            self._last_notified_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or not context.isdisjoint(changed):
+                update_callback()
+
+    def _diff_fields(self, snapshot: VehicleSnapshot) -> set[str] | None:
+        """Return the field groups that differ from the current snapshot."""
+        if self.data is None or self.data.restored:
+            return None
+        previous = self.data
+        return {
+            field
+            for field in GROUP_MODELS
+            if previous.group(field) != snapshot.group(field)
+        }
+
+    def _fields_to_request(self) -> list[str]:
+        """Return the minimal set of field groups needed by enabled entities."""
+        needed = set(SCHEDULER_FIELDS)
+        if self.data is None:
+            needed |= self.initial_fields
+        for context in self.async_contexts():
+            needed.update(context.intersection(STATUS_FIELDS))
+
+        slow = needed & SLOW_FIELDS
+        if slow:
+            now = dt_util.utcnow()
+            if (
+                slow <= self._requested_fields
+                and self._slow_fetched_at is not None
+                and now - self._slow_fetched_at < SLOW_FIELDS_INTERVAL
+            ):
+                needed -= slow
+            else:
+                self._slow_fetched_at = now
+
+        # 按需刷新明确要求的字段组不受慢字段周期限制
+        needed |= self._forced_fields
+        self._forced_fields.clear()
+        if self._refresh_task is not None and self._refresh_fields is None:
+            self._refresh_fields = frozenset(needed)
+
+        self._requested_fields |= needed
+        return [field for field in STATUS_FIELDS if field in needed]
+
+    def _merge_unrequested(
+        self, snapshot: VehicleSnapshot, fields: Iterable[str]
+    ) -> VehicleSnapshot:
+        """Carry over slow field groups that were not part of this request."""
+        if self.data is None:
+            return snapshot
+        carried = {
+            field: self.data.group(field)
+            for field in SLOW_FIELDS.difference(fields)
+            if snapshot.group(field) is None and self.data.group(field) is not None
         }
+        return replace(snapshot, **carried) if carried else snapshot
 
+    def _track_snapshot(self, snapshot: VehicleSnapshot) -> None:
+        """Feed a new snapshot to the per-vehicle trackers."""
+        position = snapshot.position
+        if position and position.latitude is not None and position.longitude is not None:
+            self.trail.add(snapshot.fetched_at, position.latitude, position.longitude)
+            if self.geocoder is not None:
+                place = self.geocoder.lookup(position.latitude, position.longitude)
+                if place != self.place:
+                    self.place = place
+                    self._mark_changed(TOPIC_PLACE)
+        if self.trips.update(snapshot) is not None:
+            self._mark_changed(TOPIC_TRIP)
+        if self.charging.update(snapshot):
+            self._mark_changed(TOPIC_CHARGING)
+        if self.tyre_leaks.update(snapshot):
+            self._mark_changed(TOPIC_TYRE_LEAK)
+        if self.archive is not None:
+            self.archive.add(snapshot)
+        if self.efficiency.add(snapshot) and self._efficiency_task is None:
+            self._efficiency_task = self.hass.async_create_background_task(
+                self._async_update_efficiency(),
+                f"{DOMAIN}_efficiency_{self.vehicle_id}",
+            )
+
+    async def _async_update_efficiency(self) -> None:
+        """Recompute the efficiency statistics in the executor."""
         try:
-            # 构建完整的URL用于日志
-            from urllib.parse import urlencode
-            query_string = urlencode(params, doseq=True)
-            full_url = f"{url}?{query_string}"
-            _LOGGER.debug("Full request URL: %s", full_url)
-            
-            async with async_timeout.timeout(10):
-                response = await self.session.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                data = await response.json()
-                
-                if data.get("result_code") != "success":
-                    raise UpdateFailed("API request failed")
-                
-                return data
-
-        except asyncio.TimeoutError as err:
-            raise UpdateFailed("Timeout error") from err
-        except (aiohttp.ClientError, KeyError) as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+            added = None
+            while added != self.efficiency.added:
+                # 计算期间窗口又前进时再算一次
+                added = self.efficiency.added
+                stats = await self.hass.async_add_executor_job(
+                    compute_efficiency, self.efficiency.samples()
+                )
+                if stats != self.efficiency_stats:
+                    self.efficiency_stats = stats
+                    self._changed_fields = {TOPIC_EFFICIENCY}
+                    self.async_update_listeners()
+        finally:
+            self._efficiency_task = None
+
+    def _mark_changed(self, topic: str) -> None:
+        """Notify listeners of a derived topic with the next update."""
+        if self._changed_fields is not None:
+            self._changed_fields.add(topic)
+
+    def _is_fresh(self, max_age: timedelta, fields: frozenset[str]) -> bool:
+        """Return True if the current snapshot satisfies an on-demand refresh."""
+        snapshot = self.data
+        return (
+            snapshot is not None
+            and not snapshot.restored
+            and self.last_update_success
+            and dt_util.utcnow() - snapshot.fetched_at <= max_age
+            and snapshot.has_groups(tuple(fields))
+        )
+
+    async def async_refresh_status(
+        self,
+        max_age: timedelta = DEFAULT_REFRESH_MAX_AGE,
+        fields: Iterable[str] = (),
+    ) -> bool:
+        """Refresh on demand unless the current snapshot is recent enough.
+
+        Concurrent requests share a single fetch as long as it includes
+        their field groups. Returns True if a fetch was made.
+        """
+        fields = frozenset(fields)
+        if self._is_fresh(max_age, fields):
+            return False
+        while True:
+            self._forced_fields |= fields
+            if self._refresh_task is None:
+                self._refresh_fields = None
+                self._refresh_task = self.hass.async_create_task(
+                    self._async_refresh_on_demand()
+                )
+            task = self._refresh_task
+            # 字段组尚未确定的请求会合并本次的字段
+            joined = self._refresh_fields is None or fields <= self._refresh_fields
+            await asyncio.shield(task)
+            if joined:
+                break
+        if not self.last_update_success:
+            raise HomeAssistantError(
+                f"Refreshing {self.vehicle_id} failed: {self.last_exception}"
+            )
+        return True
+
+    async def _async_refresh_on_demand(self) -> None:
+        try:
+            await self.async_refresh()
+        finally:
+            self._refresh_task = None
+
+    @callback
+    def _async_handle_push(
+        self, status: dict, fetched_at: datetime | None = None
+    ) -> None:
+        """Record and apply a status delivered by the push transport."""
+        if self.traffic is not None and self.push.name != PUSH_REPLAY:
+            self.traffic.record(KIND_PUSH, status)
+        self.async_apply_status(status, fetched_at)
+
+    @callback
+    def async_apply_status(
+        self, status: dict, fetched_at: datetime | None = None
+    ) -> None:
+        """Apply a (partial) status pushed by the transport or polled for commands."""
+        if self.data is None:
+            # 没有基准快照时无法合并增量，等待首次轮询
+            return
+        snapshot = self.data.merge_status(status, fetched_at or dt_util.utcnow())
+        changed = self._diff_fields(snapshot)
+        if changed is not None and not changed:
+            return
+        self._changed_fields = changed
+        self.cache.async_save(snapshot)
+        self._track_snapshot(snapshot)
+
+        # 不经过 async_set_updated_data，以免推迟对账轮询
+        self.data = snapshot
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    @callback
+    def _async_push_connection(self, connected: bool) -> None:
+        """Fall back to adaptive polling while the push transport is down."""
+        if connected:
+            if self.push.name == PUSH_REPLAY:
+                # 回放期间暂停轮询，以免实时状态与录制的状态交错
+                self.update_interval = None
+                self._async_unsub_refresh()
+            return
+        if self.update_interval is None:
+            # 回放结束：即使下一次轮询失败也要继续调度
+            self.update_interval = self.scheduler.min_interval
+        self.hass.async_create_task(self.async_request_refresh())
+
+    async def _async_fetch_status(self, fields: list[str], attempts: count) -> dict:
+        """Fetch the status while holding a fleet request slot.
+
+        Each call of async_call_with_retry passes its own attempt counter,
+        so polls running at the same time do not count each other's retries.
+        """
+        attempt = next(attempts)
+        timing = RequestTiming() if self.metrics is not None else None
+        try:
+            async with self.fleet.slot(self.vehicle_id):
+                status = await self.client.async_get_status(
+                    self._request, fields, timing
+                )
+        finally:
+            if timing is not None:
+                self.metrics.record_request(timing, attempt)
+        if self.traffic is not None:
+            self.traffic.record(KIND_POLL, status, fields)
+        return status
+
+    async def async_send_command(
+        self, command: str, params: Mapping[str, Any]
+    ) -> None:
+        """Send a remote command while holding a fleet request slot."""
+
+        async def _async_send() -> None:
+            async with self.fleet.slot(self.vehicle_id):
+                await self.client.async_send_command(self._request, command, params)
+
+        await async_call_with_retry(self.breaker, _async_send)
+
+    async def async_poll_fields(self, fields: list[str]) -> VehicleSnapshot | None:
+        """Fetch only the given field groups and apply them to the snapshot."""
+        status = await async_call_with_retry(
+            self.breaker, partial(self._async_fetch_status, fields, count())
+        )
+        self.async_apply_status(status)
+        return self.data
+
+    def _check_credentials(self) -> None:
+        """Stop polling with expired credentials and ask for new ones early."""
+        if (expires_in := self.credentials.expires_in(dt_util.utcnow())) is None:
+            return
+        if expires_in <= timedelta(0):
+            raise ConfigEntryAuthFailed("The access token has expired")
+        if expires_in <= CREDENTIAL_RENEW_AHEAD and not self._reauth_requested:
+            # 令牌仍然有效，继续轮询，同时提示用户更新凭据
+            self._reauth_requested = True
+            _LOGGER.info(
+                "Access token of %s expires in %s, requesting new credentials",
+                self.vehicle_id,
+                expires_in,
+            )
+            self.config_entry.async_start_reauth(self.hass)
+
+    async def _async_update_data(self) -> VehicleSnapshot:
+        """Fetch data from NIO API."""
+        self._check_credentials()
+        fields = self._fields_to_request()
+        start = time.perf_counter()
+
+        try:
+            status = await async_call_with_retry(
+                self.breaker, partial(self._async_fetch_status, fields, count())
+            )
+        except NIOApiAuthError as err:
+            if self.metrics is not None:
+                self.metrics.record_poll(time.perf_counter() - start, False)
+            # 停止轮询并启动重新认证流程
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except NIOApiError as err:
+            if self.metrics is not None:
+                self.metrics.record_poll(time.perf_counter() - start, False)
+            if (retry_in := self.breaker.retry_in()) > 0:
+                # 熔断期间不再按原周期轮询，熔断结束时再探测一次
+                self.update_interval = max(
+                    timedelta(seconds=retry_in), self.scheduler.min_interval
+                )
+            raise UpdateFailed(str(err)) from err
+
+        if self.metrics is not None:
+            self.metrics.record_poll(time.perf_counter() - start, True)
+
+        snapshot = VehicleSnapshot.from_status(status, dt_util.utcnow())
+        snapshot = self._merge_unrequested(snapshot, fields)
+        self._changed_fields = self._diff_fields(snapshot)
+        self.cache.async_save(snapshot)
+        self._track_snapshot(snapshot)
+
+        # 根据车辆状态调整下一次轮询间隔
+        interval = self.scheduler.next_interval(snapshot)
+        if self.push is not None and self.push.connected:
+            if self.push.name == PUSH_REPLAY:
+                # 回放开始前发出的轮询，不恢复调度
+                return snapshot
+            # 推送正常时，轮询只用于对账
+            interval = max(interval, PUSH_RECONCILE_INTERVAL)
+        self.update_interval = self.fleet.next_interval(
+            self.vehicle_id,
+            interval,
+            self.scheduler.min_interval,
+            self.scheduler.max_interval,
+        )
+        _LOGGER.debug(
+            "Vehicle %s is %s, next poll in %s",
+            self.vehicle_id,
+            self.scheduler.state,
+            self.update_interval,
+        )
+
+        return snapshot
 
 class NIOVehicleEntity(CoordinatorEntity):
     """Base class for NIO Vehicle entities."""
 
-    def __init__(self, coordinator: NIOVehicleDataUpdateCoordinator, device_class: str) -> None:
+    def __init__(
+        self,
+        coordinator: NIOVehicleDataUpdateCoordinator,
+        device_class: str,
+        fields: Iterable[str] = (),
+        topics: Iterable[str] = (),
+    ) -> None:
         """Initialize the entity."""
-        super().__init__(coordinator)
+        # fields 为实体读取的状态字段组，协调器据此决定请求哪些字段
+        # topics 为实体读取的派生数据（如行程），变化时同样通知实体
+        super().__init__(coordinator, frozenset((*fields, *topics)) or None)
         self._attr_device_class = device_class
+        self._fields = tuple(fields)
         
         # 保持原有的unique_id生成逻辑
         self._attr_unique_id = f"{coordinator.config_entry.data[CONF_VEHICLE_ID]}_{device_class}"
@@ -184,3 +718,27 @@ class NIOVehicleEntity(CoordinatorEntity):
             "manufacturer": MANUFACTURER,
             "model": MODEL,
         }
+
+    @property
+    def available(self) -> bool:
+        """Return True if the status groups this entity reads are present."""
+        if not super().available and not self.coordinator.serving_cache:
+            return False
+        return self.coordinator.data.has_groups(self._fields)
+
+    async def async_update(self) -> None:
+        """Refresh the status groups of this entity on demand.
+
+        Used by homeassistant.update_entity; calls of entities of the same
+        vehicle share one request.
+        """
+        if not self.enabled:
+            return
+        await self.coordinator.async_refresh_status(fields=self._fields)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str] | None:
+        """Mark states that come from the cached snapshot."""
+        if self.coordinator.data is not None and self.coordinator.data.restored:
+            return {ATTR_CACHED_AT: self.coordinator.data.fetched_at.isoformat()}
+        return None
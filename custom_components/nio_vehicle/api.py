@@ -0,0 +1,298 @@
+"""Client for the NIO vehicle status API."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from http import HTTPStatus
+from types import MappingProxyType
+from typing import Any
+
+import aiohttp
+import async_timeout
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+from homeassistant.util.ssl import client_context
+
+from .const import (
+    API_BASE_URL,
+    API_HEADERS,
+    API_KEEPALIVE_TIMEOUT,
+    API_LIMIT_PER_HOST,
+    API_TIMEOUT,
+    AUTH_RESULT_CODES,
+    CONF_ACCESS_TOKEN,
+    CONF_APP_VERSION,
+    CONF_DEVICE_ID,
+    CONF_SIGN,
+    CONF_TIMESTAMP,
+    CONF_VEHICLE_ID,
+    DATA_CLIENT,
+    DEFAULT_APP_ID,
+    DEFAULT_APP_VERSION,
+    DEFAULT_LANGUAGE,
+    DEFAULT_REGION,
+)
+from .metrics import RequestTiming, create_trace_config
+
+_LOGGER = logging.getLogger(__name__)
+
+try:
+    import brotli  # noqa: F401
+
+    _HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        _HAS_BROTLI = True
+    except ImportError:
+        _HAS_BROTLI = False
+
+# 只声明 aiohttp 能解码的压缩格式
+ACCEPT_ENCODING = (
+    API_HEADERS["Accept-Encoding"] if _HAS_BROTLI else "gzip;q=1.0, deflate;q=0.8"
+)
+
+
+class NIOApiError(Exception):
+    """Base error of the NIO API client."""
+
+
+class NIOApiConnectionError(NIOApiError):
+    """Error to indicate the API could not be reached."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def transient(self) -> bool:
+        """Return True if retrying the request may succeed."""
+        return self.status is None or self.status >= 500
+
+
+class NIOApiRateLimitError(NIOApiError):
+    """Error to indicate the API is rate limiting requests."""
+
+    def __init__(self, retry_after: float | None) -> None:
+        """Initialize the error."""
+        super().__init__(f"Rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class NIOApiCircuitOpenError(NIOApiError):
+    """Error to indicate requests are suspended after repeated failures."""
+
+    def __init__(self, retry_in: float) -> None:
+        """Initialize the error."""
+        super().__init__(f"Requests suspended for {retry_in:.0f}s after repeated failures")
+        self.retry_in = retry_in
+
+
+class NIOApiResponseError(NIOApiError):
+    """Error to indicate the API rejected the request."""
+
+    def __init__(self, result_code: str | None) -> None:
+        """Initialize the error."""
+        super().__init__(f"API request failed: {result_code}")
+        self.result_code = result_code
+
+
+class NIOApiAuthError(NIOApiResponseError):
+    """Error to indicate the access token or signature was rejected."""
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleRequest:
+    """Immutable request template of a vehicle's status endpoint."""
+
+    vehicle_id: str
+    url: str
+    command_url: str
+    headers: Mapping[str, str]
+    params: tuple[tuple[str, str], ...]
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if (value := headers.get("Retry-After")) is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - dt_util.utcnow()).total_seconds(), 0.0)
+
+
+@lru_cache(maxsize=32)
+def _field_params(fields: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+    """Return the query parameters of a set of field groups."""
+    return tuple(("field", field) for field in fields)
+
+
+class NIOApiClient:
+    """Client for the NIO vehicle status API."""
+
+    def __init__(
+        self, session: aiohttp.ClientSession, base_url: str = API_BASE_URL
+    ) -> None:
+        """Initialize the client."""
+        self.session = session
+        self.base_url = base_url
+
+    def vehicle_request(self, data: Mapping[str, Any]) -> VehicleRequest:
+        """Build the request template for the vehicle of a config entry."""
+        app_version = data.get(CONF_APP_VERSION) or DEFAULT_APP_VERSION
+        headers = {
+            key: value for key, value in API_HEADERS.items() if key != "Host"
+        }
+        headers["Authorization"] = f"Bearer {data[CONF_ACCESS_TOKEN]}"
+        headers["User-Agent"] = headers["User-Agent"].replace(
+            DEFAULT_APP_VERSION, app_version
+        )
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        return VehicleRequest(
+            vehicle_id=data[CONF_VEHICLE_ID],
+            url=f"{self.base_url}/{data[CONF_VEHICLE_ID]}/status",
+            command_url=f"{self.base_url}/{data[CONF_VEHICLE_ID]}/command",
+            headers=MappingProxyType(headers),
+            params=(
+                ("timestamp", data[CONF_TIMESTAMP]),
+                ("device_id", data[CONF_DEVICE_ID]),
+                ("app_id", DEFAULT_APP_ID),
+                ("app_ver", app_version),
+                ("lang", DEFAULT_LANGUAGE),
+                ("region", DEFAULT_REGION),
+                ("sign", data[CONF_SIGN]),
+            ),
+        )
+
+    async def async_get_status(
+        self,
+        request: VehicleRequest,
+        fields: Sequence[str],
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        """Fetch the given field groups and return the "data" object.
+
+        If a timing object is given, the phases of the request are recorded
+        in it.
+        """
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Requesting %s fields: %s", request.url, ",".join(fields))
+        return await self._async_request(
+            "GET",
+            request.url,
+            request,
+            _field_params(tuple(fields)) + request.params,
+            timing=timing,
+        )
+
+    async def async_send_command(
+        self,
+        request: VehicleRequest,
+        command: str,
+        params: Mapping[str, Any],
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        """Send a remote command and return the "data" object."""
+        _LOGGER.debug("Sending command %s to %s", command, request.vehicle_id)
+        return await self._async_request(
+            "POST",
+            f"{request.command_url}/{command}",
+            request,
+            request.params,
+            payload=dict(params),
+            timing=timing,
+        )
+
+    async def _async_request(
+        self,
+        method: str,
+        url: str,
+        request: VehicleRequest,
+        params: tuple[tuple[str, str], ...],
+        payload: dict[str, Any] | None = None,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        """Make a signed request and return the "data" object.
+
+        If a timing object is given, the phases of the request are recorded
+        in it.
+        """
+        try:
+            async with async_timeout.timeout(API_TIMEOUT), self.session.request(
+                method,
+                url,
+                headers=request.headers,
+                params=params,
+                json=payload,
+                trace_request_ctx=timing,
+            ) as response:
+                if response.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+                    raise NIOApiAuthError(f"HTTP {response.status}")
+                if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+                    raise NIOApiRateLimitError(_retry_after(response.headers))
+                if response.status >= 400:
+                    raise NIOApiConnectionError(
+                        f"HTTP error {response.status}", response.status
+                    )
+                if timing is None:
+                    data = json_loads(await response.read())
+                else:
+                    read_start = time.perf_counter()
+                    body = await response.read()
+                    decode_start = time.perf_counter()
+                    data = json_loads(body)
+                    timing.read = decode_start - read_start
+                    timing.decode = time.perf_counter() - decode_start
+                    timing.size = len(body)
+        except asyncio.TimeoutError as err:
+            raise NIOApiConnectionError("Timeout error") from err
+        except (aiohttp.ClientError, ValueError) as err:
+            raise NIOApiConnectionError(f"Error communicating with API: {err}") from err
+
+        if not isinstance(data, dict) or data.get("result_code") != "success":
+            result_code = data.get("result_code") if isinstance(data, dict) else None
+            if result_code in AUTH_RESULT_CODES:
+                raise NIOApiAuthError(result_code)
+            raise NIOApiResponseError(result_code)
+        return data.get("data") or {}
+
+
+@callback
+def async_get_client(hass: HomeAssistant) -> NIOApiClient:
+    """Return the API client shared by all NIO Vehicle config entries."""
+    if (client := hass.data.get(DATA_CLIENT)) is not None:
+        return client
+
+    # 独立连接池：保持长连接，并限制到同一主机的并发连接数
+    connector = aiohttp.TCPConnector(
+        limit_per_host=API_LIMIT_PER_HOST,
+        keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+        ssl=client_context(),
+    )
+    session = aiohttp.ClientSession(
+        connector=connector, trace_configs=[create_trace_config()]
+    )
+    client = hass.data[DATA_CLIENT] = NIOApiClient(session)
+
+    async def _async_close(event: Event) -> None:
+        await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return client
@@ -0,0 +1,281 @@
+"""Compressed telemetry archive for NIO Vehicle.
+
+Numeric telemetry is kept outside the recorder, one directory per vehicle:
+
+- active.bin: fixed-size little-endian rows, appended in batches.
+- <start>-<end>.seg: closed segments. A segment starts with MAGIC, a
+  4-byte header length and a JSON header, followed by one zlib
+  compressed column after another. Times are stored as deltas in whole
+  seconds.
+
+The active file is rotated into a segment once it spans a day. Queries
+skip segments by their file name and only decompress the requested
+columns. All file access runs in the executor.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import (
+    ARCHIVE_DIR,
+    ARCHIVE_FLUSH_INTERVAL,
+    ARCHIVE_FLUSH_ROWS,
+    ARCHIVE_MIN_INTERVAL,
+    ARCHIVE_SEGMENT_ROWS,
+    ARCHIVE_SEGMENT_SPAN,
+)
+from .model import VehicleSnapshot, compile_path
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"NIOTLM1\n"
+ACTIVE_FILE = "active.bin"
+SEGMENT_SUFFIX = ".seg"
+
+# 列名、数组类型码和快照路径
+COLUMNS: tuple[tuple[str, str, str], ...] = (
+    ("soc", "f", "soc.soc"),
+    ("remaining_range", "f", "soc.remaining_range"),
+    ("remaining_actual_range", "f", "soc.remaining_actual_range"),
+    ("mileage", "f", "exterior.mileage"),
+    ("tyre_front_left", "f", "tyre.front_left_wheel_press_bar"),
+    ("tyre_front_right", "f", "tyre.front_right_wheel_press_bar"),
+    ("tyre_rear_left", "f", "tyre.rear_left_wheel_press_bar"),
+    ("tyre_rear_right", "f", "tyre.rear_right_wheel_press_bar"),
+    ("outside_temperature", "f", "hvac.outside_temperature"),
+    ("latitude", "d", "position.latitude"),
+    ("longitude", "d", "position.longitude"),
+)
+ARCHIVE_FIELDS = tuple(name for name, _, _ in COLUMNS)
+
+_ACCESSORS = tuple(compile_path(path) for _, _, path in COLUMNS)
+_ROW = struct.Struct("<d" + "".join(code for _, code, _ in COLUMNS))
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode, data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _segment_range(path: Path) -> tuple[int, int] | None:
+    try:
+        start, end = path.stem.split("-")
+        return int(start), int(end)
+    except ValueError:
+        return None
+
+
+def _value(value: float) -> float | None:
+    return None if math.isnan(value) else round(value, 6)
+
+
+class TelemetryArchive:
+    """Append-only telemetry archive of one vehicle."""
+
+    def __init__(self, hass: HomeAssistant, vehicle_id: str) -> None:
+        """Initialize the archive."""
+        self.hass = hass
+        self.vehicle_id = vehicle_id
+        self.path = Path(hass.config.path(ARCHIVE_DIR, slugify(vehicle_id)))
+        self._pending: list[bytes] = []
+        self._last_time = 0.0
+        self._last_flush = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @callback
+    def add(self, snapshot: VehicleSnapshot) -> None:
+        """Buffer a row for a snapshot."""
+        timestamp = snapshot.fetched_at.timestamp()
+        if timestamp - self._last_time < ARCHIVE_MIN_INTERVAL:
+            return
+        self._last_time = timestamp
+        values = [accessor(snapshot) for accessor in _ACCESSORS]
+        self._pending.append(
+            _ROW.pack(timestamp, *(math.nan if v is None else v for v in values))
+        )
+        if (
+            len(self._pending) >= ARCHIVE_FLUSH_ROWS
+            or time.monotonic() - self._last_flush
+            >= ARCHIVE_FLUSH_INTERVAL.total_seconds()
+        ):
+            self.hass.async_create_background_task(
+                self.async_flush(), f"nio_vehicle_archive_{self.vehicle_id}"
+            )
+
+    async def async_flush(self) -> None:
+        """Write the buffered rows to disk."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        data, self._pending = b"".join(self._pending), []
+        async with self._lock:
+            await self.hass.async_add_executor_job(self._append, data)
+
+    async def async_query(
+        self, start: datetime, end: datetime, fields: list[str] | None = None
+    ) -> dict[str, list]:
+        """Return the archived columns between two times."""
+        names = [name for name in ARCHIVE_FIELDS if fields is None or name in fields]
+        pending = b"".join(self._pending)
+        async with self._lock:
+            return await self.hass.async_add_executor_job(
+                self._query, start.timestamp(), end.timestamp(), names, pending
+            )
+
+    def _append(self, data: bytes) -> None:
+        """Append rows to the active file and rotate it when full."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        active = self.path / ACTIVE_FILE
+        with active.open("ab") as file:
+            file.write(data)
+            size = file.tell()
+        with active.open("rb") as file:
+            start = _ROW.unpack(file.read(_ROW.size))[0]
+        end = _ROW.unpack_from(data, len(data) - _ROW.size)[0]
+        if (
+            end - start >= ARCHIVE_SEGMENT_SPAN.total_seconds()
+            or size // _ROW.size >= ARCHIVE_SEGMENT_ROWS
+        ):
+            self._rotate(active)
+
+    def _rotate(self, active: Path) -> None:
+        """Compress the active file into a segment."""
+        raw = active.read_bytes()
+        # 丢弃异常退出时写了一半的行
+        rows = list(_ROW.iter_unpack(raw[: len(raw) // _ROW.size * _ROW.size]))
+        if not rows:
+            active.unlink()
+            return
+        columns = list(zip(*rows))
+        seconds = [round(value) for value in columns[0]]
+        deltas = array("i", (b - a for a, b in zip([seconds[0], *seconds], seconds)))
+
+        blobs = [zlib.compress(_to_bytes(deltas))]
+        blobs.extend(
+            zlib.compress(_to_bytes(array(code, values)))
+            for (_, code, _), values in zip(COLUMNS, columns[1:])
+        )
+        header_columns = []
+        offset = 0
+        for (name, code), blob in zip(
+            [("time", "i"), *((name, code) for name, code, _ in COLUMNS)], blobs
+        ):
+            header_columns.append([name, code, offset, len(blob)])
+            offset += len(blob)
+        header = json.dumps(
+            {
+                "rows": len(rows),
+                "start": seconds[0],
+                "end": seconds[-1],
+                "columns": header_columns,
+            }
+        ).encode()
+
+        segment = self.path / f"{seconds[0]}-{seconds[-1]}{SEGMENT_SUFFIX}"
+        temp = segment.with_suffix(".tmp")
+        with temp.open("wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<I", len(header)))
+            file.write(header)
+            for blob in blobs:
+                file.write(blob)
+        os.replace(temp, segment)
+        active.unlink()
+        _LOGGER.debug(
+            "Archived %d rows of %s into %s (%d bytes)",
+            len(rows),
+            self.vehicle_id,
+            segment.name,
+            offset,
+        )
+
+    def _query(
+        self, start: float, end: float, names: list[str], pending: bytes
+    ) -> dict[str, list]:
+        """Read the rows between two timestamps."""
+        result: dict[str, list] = {name: [] for name in ("time", *names)}
+        if self.path.is_dir():
+            segments = sorted(
+                (span, path)
+                for path in self.path.glob(f"*{SEGMENT_SUFFIX}")
+                if (span := _segment_range(path)) is not None
+            )
+            for (first, last), path in segments:
+                if last >= start and first <= end:
+                    self._read_segment(path, start, end, names, result)
+            active = self.path / ACTIVE_FILE
+            data = active.read_bytes() if active.exists() else b""
+        else:
+            data = b""
+
+        data = data[: len(data) // _ROW.size * _ROW.size] + pending
+        indexes = [ARCHIVE_FIELDS.index(name) + 1 for name in names]
+        for row in _ROW.iter_unpack(data):
+            if start <= row[0] <= end:
+                result["time"].append(round(row[0]))
+                for name, index in zip(names, indexes):
+                    result[name].append(_value(row[index]))
+        return result
+
+    @staticmethod
+    def _read_segment(
+        path: Path,
+        start: float,
+        end: float,
+        names: list[str],
+        result: dict[str, list],
+    ) -> None:
+        """Read the requested columns of a segment."""
+        with path.open("rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                _LOGGER.warning("Skipping invalid archive segment %s", path)
+                return
+            (length,) = struct.unpack("<I", file.read(4))
+            header = json.loads(file.read(length))
+            base = file.tell()
+            columns = {
+                name: (code, offset, size)
+                for name, code, offset, size in header["columns"]
+            }
+
+            def read(name: str) -> array:
+                code, offset, size = columns[name]
+                file.seek(base + offset)
+                return _from_bytes(code, zlib.decompress(file.read(size)))
+
+            times = list(accumulate(read("time"), initial=header["start"]))[1:]
+            low = bisect_left(times, start)
+            high = bisect_right(times, end)
+            if low >= high:
+                return
+            result["time"].extend(times[low:high])
+            for name in names:
+                if name in columns:
+                    result[name].extend(map(_value, read(name)[low:high]))
+                else:
+                    result[name].extend([None] * (high - low))
@@ -1,102 +1,179 @@
 """Support for NIO Vehicle binary sensors."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
+    BinarySensorEntityDescription,
     BinarySensorDeviceClass,
 )
 
-from . import DOMAIN, NIOVehicleEntity
+from . import DOMAIN, NIOVehicleDataUpdateCoordinator, NIOVehicleEntity
+from .const import TOPIC_TYRE_LEAK, TYRE_POSITIONS
+from .model import compile_path, is_open
+
+
+def _is_on(value: int | bool | None) -> bool | None:
+    # 1 表示开启；模型属性返回的布尔值同样适用
+    return None if value is None else value == 1
+
+
+@dataclass
+class NIOBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a NIO Vehicle binary sensor.
+
+    Binary sensors read either a "group.attribute" path of the status
+    snapshot or a value function of the coordinator for derived data.
+    """
+
+    path: str | None = None
+    on_fn: Callable[[Any], bool | None] = _is_on
+    value_fn: Callable[[NIOVehicleDataUpdateCoordinator], bool | None] | None = None
+    attr_fn: Callable[[NIOVehicleDataUpdateCoordinator], dict[str, Any] | None] | None = None
+    # entity_id 后缀，默认与 key 相同
+    object_id: str | None = None
+    topics: tuple[str, ...] = ()
+
+
+BINARY_SENSORS: tuple[NIOBinarySensorEntityDescription, ...] = (
+    NIOBinarySensorEntityDescription(
+        key="door_lock",
+        object_id="lock",
+        name="车辆锁定状态 Door Lock",
+        path="door.locked",
+        # 锁类型的二值传感器在解锁时为开启
+        on_fn=lambda locked: None if locked is None else not locked,
+        device_class=BinarySensorDeviceClass.LOCK,
+    ),
+    *(
+        NIOBinarySensorEntityDescription(
+            key=f"door_{position}",
+            name=f"Door {name_en.title()}",
+            path=f"door.door_ajar_{position}_status",
+            on_fn=is_open,
+            device_class=BinarySensorDeviceClass.DOOR,
+        )
+        for position, (_, name_en) in TYRE_POSITIONS.items()
+    ),
+    NIOBinarySensorEntityDescription(
+        key="door_trunk",
+        name="Door Trunk",
+        path="door.tailgate_ajar_status",
+        on_fn=is_open,
+        device_class=BinarySensorDeviceClass.DOOR,
+    ),
+    NIOBinarySensorEntityDescription(
+        key="charging_port",
+        name="充电口状态 Charging Port",
+        path="door.charge_port_open",
+        device_class=BinarySensorDeviceClass.DOOR,
+    ),
+    NIOBinarySensorEntityDescription(
+        key="charging",
+        name="充电状态 Charging",
+        path="soc.charging",
+        device_class=BinarySensorDeviceClass.BATTERY_CHARGING,
+    ),
+    *(
+        NIOBinarySensorEntityDescription(
+            key=f"window_{position}",
+            name=f"{name_zh}车窗 {name_en} Window",
+            path=f"window.window_ajar_{position}_status",
+            on_fn=is_open,
+            device_class=BinarySensorDeviceClass.WINDOW,
+        )
+        for position, (name_zh, name_en) in TYRE_POSITIONS.items()
+    ),
+    NIOBinarySensorEntityDescription(
+        key="sunroof",
+        name="天窗 Sunroof",
+        path="window.sun_roof_ajar_status",
+        on_fn=is_open,
+        device_class=BinarySensorDeviceClass.WINDOW,
+    ),
+    NIOBinarySensorEntityDescription(
+        key="air_conditioning",
+        name="空调 Air Conditioning",
+        path="hvac.air_con_on",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        icon="mdi:air-conditioner",
+    ),
+    NIOBinarySensorEntityDescription(
+        key="steering_wheel_heating",
+        name="方向盘加热 Steering Wheel Heating",
+        path="heating.steer_wheel_heat_sts",
+        device_class=BinarySensorDeviceClass.HEAT,
+    ),
+    NIOBinarySensorEntityDescription(
+        key="low_beam",
+        name="近光灯 Low Beam",
+        path="light.low_beam_on",
+        device_class=BinarySensorDeviceClass.LIGHT,
+    ),
+    NIOBinarySensorEntityDescription(
+        key="high_beam",
+        name="远光灯 High Beam",
+        path="light.high_beam_on",
+        device_class=BinarySensorDeviceClass.LIGHT,
+    ),
+    NIOBinarySensorEntityDescription(
+        key="tyre_leak",
+        name="轮胎慢漏气 Tyre Slow Leak",
+        value_fn=lambda c: bool(c.tyre_leaks.leaking),
+        attr_fn=lambda c: {"tyres": list(c.tyre_leaks.leaking)},
+        topics=(TOPIC_TYRE_LEAK,),
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        icon="mdi:car-tire-alert",
+    ),
+)
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the NIO Vehicle binary sensors."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    
-    sensors = [
-        NIODoorLockSensor(coordinator),
-        NIODoorSensor(coordinator, "front_left"),
-        NIODoorSensor(coordinator, "front_right"),
-        NIODoorSensor(coordinator, "rear_left"),
-        NIODoorSensor(coordinator, "rear_right"),
-        NIODoorSensor(coordinator, "trunk"),
-        NIOChargingPortSensor(coordinator),
-        NIOChargingSensor(coordinator),
-    ]
-    
-    async_add_entities(sensors)
-
-class NIODoorLockSensor(NIOVehicleEntity, BinarySensorEntity):
-    """Representation of NIO Vehicle Lock sensor."""
-
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "door_lock")
-        self.entity_id = f"binary_sensor.{self.entity_id_prefix}_lock"
-        self._attr_name = "车辆锁定状态 Door Lock"
-        self._attr_device_class = BinarySensorDeviceClass.LOCK
-
-    @property
-    def is_on(self):
-        """Return true if the vehicle is locked."""
-        # vehicle_lock_status: 1 表示锁定, 返回 True 表示已锁定
-        return self.coordinator.data["data"]["door_status"]["vehicle_lock_status"] != 1
 
-class NIODoorSensor(NIOVehicleEntity, BinarySensorEntity):
-    """Representation of NIO Door sensor."""
+    async_add_entities(
+        NIOBinarySensor(coordinator, description) for description in BINARY_SENSORS
+    )
 
-    def __init__(self, coordinator, position):
-        """Initialize the sensor."""
-        super().__init__(coordinator, f"door_{position}")
-        self.position = position
-        self.entity_id = f"binary_sensor.{self.entity_id_prefix}_door_{position}"
-        self._attr_name = f"Door {position.replace('_', ' ').title()}"
-        self._attr_device_class = BinarySensorDeviceClass.DOOR
-
-        # 映射位置到API字段名称
-        self._status_map = {
-            "front_left": "door_ajar_front_left_status",
-            "front_right": "door_ajar_front_right_status",
-            "rear_left": "door_ajar_rear_left_status",
-            "rear_right": "door_ajar_rear_right_status",
-            "trunk": "tailgate_ajar_status",
-        }
 
-    @property
-    def is_on(self):
-        """Return true if the door is open."""
-        # status: 1 表示关闭，所以需要反转状态
-        # 返回 True 表示开启状态
-        return self.coordinator.data["data"]["door_status"][self._status_map[self.position]] != 1
+class NIOBinarySensor(NIOVehicleEntity, BinarySensorEntity):
+    """Representation of a NIO Vehicle binary sensor."""
 
-class NIOChargingPortSensor(NIOVehicleEntity, BinarySensorEntity):
-    """Representation of NIO Charging Port sensor."""
+    entity_description: NIOBinarySensorEntityDescription
 
-    def __init__(self, coordinator):
+    def __init__(
+        self,
+        coordinator: NIOVehicleDataUpdateCoordinator,
+        description: NIOBinarySensorEntityDescription,
+    ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, "charging_port")
-        self.entity_id = f"binary_sensor.{self.entity_id_prefix}_charging_port"
-        self._attr_name = "充电口状态 Charging Port"
-        self._attr_device_class = BinarySensorDeviceClass.DOOR
+        fields = (description.path.split(".")[0],) if description.path else ()
+        super().__init__(coordinator, description.key, fields, description.topics)
+        self.entity_description = description
+        self._attr_device_class = description.device_class
+        self.entity_id = (
+            f"binary_sensor.{self.entity_id_prefix}_{description.object_id or description.key}"
+        )
+        self._accessor = compile_path(description.path) if description.path else None
 
     @property
     def is_on(self):
-        """Return true if the charging port is open."""
-        # second_charge_port_ajar_status: 1 表示关闭，需要反转状态
-        # 返回 True 表示开启状态
-        return self.coordinator.data["data"]["door_status"]["second_charge_port_ajar_status"] != 1
-
-class NIOChargingSensor(NIOVehicleEntity, BinarySensorEntity):
-    """Representation of NIO Charging Status sensor."""
-
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "charging")
-        self.entity_id = f"binary_sensor.{self.entity_id_prefix}_charging"
-        self._attr_name = "充电状态 Charging"
-        self._attr_device_class = BinarySensorDeviceClass.BATTERY_CHARGING
+        """Return true if the binary sensor is on."""
+        if self._accessor is None:
+            return self.entity_description.value_fn(self.coordinator)
+        return self.entity_description.on_fn(self._accessor(self.coordinator.data))
 
     @property
-    def is_on(self):
-        """Return true if the vehicle is charging."""
-        # charge_state: 1-4 表示正在充电的不同状态
-        return self.coordinator.data["data"]["soc_status"]["charge_state"] > 0
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes of the binary sensor."""
+        attributes = super().extra_state_attributes
+        if self.entity_description.attr_fn is None:
+            return attributes
+        return {
+            **(attributes or {}),
+            **(self.entity_description.attr_fn(self.coordinator) or {}),
+        } or None
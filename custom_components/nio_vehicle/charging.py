@@ -0,0 +1,162 @@
+"""Charging session tracking for NIO vehicles."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+from typing import Any
+
+from .const import CHARGE_MAX_SAMPLES, CHARGE_MIN_SAMPLES, CHARGE_RATE_HALF_LIFE
+from .model import VehicleSnapshot
+
+
+class ChargingSession:
+    """A single charging session.
+
+    The charge rate is fitted with an exponentially weighted least squares
+    regression of SOC over time, updated in constant time per sample, so
+    it follows the taper towards full charge. Samples are kept in a compact
+    array that is halved whenever it fills up.
+    """
+
+    __slots__ = (
+        "start",
+        "start_soc",
+        "end",
+        "end_soc",
+        "peak_rate",
+        "samples",
+        "_s0",
+        "_sx",
+        "_sy",
+        "_sxx",
+        "_sxy",
+        "_last_t",
+        "_decay",
+    )
+
+    def __init__(self, start: datetime, soc: float) -> None:
+        """Initialize the session."""
+        self.start = start
+        self.start_soc = soc
+        self.end = start
+        self.end_soc = soc
+        self.peak_rate = 0.0
+        # 交替存放 (距开始的分钟数, SOC)
+        self.samples = array("f")
+        self._s0 = self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._last_t = 0.0
+        self._decay = 0.5 ** (1 / CHARGE_RATE_HALF_LIFE)
+        self.add(start, soc)
+
+    def add(self, time: datetime, soc: float) -> None:
+        """Add a sample to the session."""
+        t = (time - self.start).total_seconds() / 60
+        weight = self._decay ** (t - self._last_t)
+        self._s0 = self._s0 * weight + 1
+        self._sx = self._sx * weight + t
+        self._sy = self._sy * weight + soc
+        self._sxx = self._sxx * weight + t * t
+        self._sxy = self._sxy * weight + t * soc
+        self._last_t = t
+        self.end = time
+        self.end_soc = soc
+
+        if len(self.samples) >= 2 * CHARGE_MAX_SAMPLES:
+            # 每隔一个样本保留一个，保证内存有界
+            samples = self.samples
+            self.samples = array(
+                "f", (v for i in range(0, len(samples), 4) for v in samples[i : i + 2])
+            )
+        self.samples.extend((t, soc))
+
+        if (rate := self.rate) is not None:
+            self.peak_rate = max(self.peak_rate, rate)
+
+    @property
+    def sample_count(self) -> int:
+        """Return the number of stored samples."""
+        return len(self.samples) // 2
+
+    @property
+    def rate(self) -> float | None:
+        """Return the current charge rate in %/min."""
+        if self.sample_count < CHARGE_MIN_SAMPLES:
+            return None
+        denominator = self._s0 * self._sxx - self._sx * self._sx
+        if denominator <= 0:
+            return None
+        return max((self._s0 * self._sxy - self._sx * self._sy) / denominator, 0.0)
+
+    @property
+    def duration(self) -> float:
+        """Return the duration in minutes."""
+        return (self.end - self.start).total_seconds() / 60
+
+    def summary(self, capacity: float) -> dict[str, Any]:
+        """Return a summary of the session."""
+        soc_added = self.end_soc - self.start_soc
+        return {
+            "start_time": self.start.isoformat(),
+            "end_time": self.end.isoformat(),
+            "duration": round(self.duration, 1),
+            "start_soc": self.start_soc,
+            "end_soc": self.end_soc,
+            "soc_added": round(soc_added, 1),
+            "energy_added": round(soc_added * capacity / 100, 2),
+            "average_rate": round(soc_added / self.duration, 3) if self.duration else None,
+            "peak_rate": round(self.peak_rate, 3),
+            "samples": self.sample_count,
+        }
+
+
+class ChargingTracker:
+    """Detect charging sessions and estimate the time to full."""
+
+    def __init__(self, capacity: float, target_soc: float) -> None:
+        """Initialize the tracker."""
+        self.capacity = capacity
+        self.target_soc = target_soc
+        self.current: ChargingSession | None = None
+        self.last_session: ChargingSession | None = None
+
+    def update(self, snapshot: VehicleSnapshot) -> bool:
+        """Process a snapshot and return True if the estimates changed."""
+        soc_status = snapshot.soc
+        if soc_status is None or soc_status.soc is None:
+            return False
+
+        if soc_status.charging:
+            if self.current is None:
+                self.current = ChargingSession(snapshot.fetched_at, soc_status.soc)
+            else:
+                self.current.add(snapshot.fetched_at, soc_status.soc)
+            return True
+
+        if self.current is None:
+            return False
+        self.last_session, self.current = self.current, None
+        return True
+
+    @property
+    def rate(self) -> float | None:
+        """Return the current charge rate in %/min."""
+        return self.current.rate if self.current else None
+
+    @property
+    def power(self) -> float | None:
+        """Return the estimated charging power in kW."""
+        if (rate := self.rate) is None:
+            return None
+        return round(rate * 60 * self.capacity / 100, 1)
+
+    def minutes_to(self, soc: float) -> float | None:
+        """Return the estimated minutes until the given SOC is reached."""
+        if (rate := self.rate) is None or rate <= 0 or self.current is None:
+            return None
+        return round(max(soc - self.current.end_soc, 0.0) / rate, 0)
+
+    def last_summary(self) -> dict[str, Any] | None:
+        """Return the summary of the last finished session."""
+        if self.last_session is None:
+            return None
+        return self.last_session.summary(self.capacity)
@@ -0,0 +1,209 @@
+"""Remote command queue for NIO vehicles.
+
+Commands are queued per vehicle and keyed by what they control, so a
+repeated command joins the pending one and a contradictory command (e.g.
+unlock after lock) replaces it before it is sent. Sending holds a fleet
+request slot, so the fleet-wide concurrency limit also applies to
+commands.
+
+Completion is tracked with a short burst of polls that only request the
+field groups the sent commands affect, until every command reached its
+target state or the burst is over. Regular polling is not touched.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .api import NIOApiError
+from .const import (
+    COMMAND_DONE,
+    COMMAND_POLL_DELAYS,
+    COMMAND_SUPERSEDED,
+    COMMAND_TIMEOUT,
+    DOMAIN,
+    STATUS_FIELDS,
+)
+from .model import VehicleSnapshot
+
+if TYPE_CHECKING:
+    from . import NIOVehicleDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CommandSpec:
+    """A remote command and how to recognize its completion."""
+
+    # 同一 target 的命令相互合并或替换
+    target: str
+    fields: tuple[str, ...]
+    done_fn: Callable[[VehicleSnapshot], bool]
+
+
+def _locked(snapshot: VehicleSnapshot) -> bool | None:
+    return snapshot.door.locked if snapshot.door else None
+
+
+def _air_con(snapshot: VehicleSnapshot) -> int | None:
+    return snapshot.hvac.air_con_on if snapshot.hvac else None
+
+
+def _charge_port_open(snapshot: VehicleSnapshot) -> bool | None:
+    return snapshot.door.charge_port_open if snapshot.door else None
+
+
+COMMANDS: dict[str, CommandSpec] = {
+    "lock": CommandSpec("lock", ("door",), lambda s: _locked(s) is True),
+    "unlock": CommandSpec("lock", ("door",), lambda s: _locked(s) is False),
+    "hvac_on": CommandSpec("hvac", ("hvac",), lambda s: _air_con(s) == 1),
+    "hvac_off": CommandSpec("hvac", ("hvac",), lambda s: _air_con(s) == 0),
+    "charge_port_open": CommandSpec(
+        "charge_port", ("door",), lambda s: _charge_port_open(s) is True
+    ),
+    "charge_port_close": CommandSpec(
+        "charge_port", ("door",), lambda s: _charge_port_open(s) is False
+    ),
+}
+
+
+@dataclass(slots=True)
+class PendingCommand:
+    """A queued or sent command and the callers waiting for it."""
+
+    command: str
+    params: Mapping[str, Any]
+    future: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+    @property
+    def spec(self) -> CommandSpec:
+        """Return the spec of the command."""
+        return COMMANDS[self.command]
+
+    def resolve(self, result: str) -> None:
+        """Complete the command for all waiting callers."""
+        if not self.future.done():
+            self.future.set_result(result)
+
+
+class CommandQueue:
+    """Per vehicle queue of remote commands."""
+
+    def __init__(self, coordinator: NIOVehicleDataUpdateCoordinator) -> None:
+        """Initialize the queue."""
+        self.coordinator = coordinator
+        self._pending: dict[str, PendingCommand] = {}
+        self._sent: dict[str, PendingCommand] = {}
+        self._task: asyncio.Task | None = None
+        self.sent = 0
+        self.coalesced = 0
+
+    async def async_send(
+        self, command: str, params: Mapping[str, Any] | None = None
+    ) -> str:
+        """Queue a command and wait until it is done, superseded or timed out."""
+        params = params or {}
+        target = COMMANDS[command].target
+        for queued in (self._pending.get(target), self._sent.get(target)):
+            if queued is not None and (queued.command, queued.params) == (
+                command,
+                params,
+            ):
+                # 相同的命令已在队列中或已发出，共用结果
+                self.coalesced += 1
+                return await asyncio.shield(queued.future)
+
+        if (replaced := self._pending.get(target)) is not None:
+            self.coalesced += 1
+            replaced.resolve(COMMAND_SUPERSEDED)
+        pending = self._pending[target] = PendingCommand(command, params)
+        if self._task is None:
+            self._task = self.coordinator.config_entry.async_create_background_task(
+                self.coordinator.hass,
+                self._async_run(),
+                f"{DOMAIN}_commands_{self.coordinator.vehicle_id}",
+            )
+        return await asyncio.shield(pending.future)
+
+    async def _async_run(self) -> None:
+        """Send the queued commands in batches and track their completion."""
+        try:
+            while self._pending:
+                batch = list(self._pending.values())
+                self._pending.clear()
+                for pending in batch:
+                    try:
+                        await self.coordinator.async_send_command(
+                            pending.command, pending.params
+                        )
+                    except NIOApiError as err:
+                        if not pending.future.done():
+                            pending.future.set_exception(err)
+                        continue
+                    self.sent += 1
+                    target = pending.spec.target
+                    if (previous := self._sent.get(target)) is not None:
+                        previous.resolve(COMMAND_SUPERSEDED)
+                    self._sent[target] = pending
+                await self._async_track()
+        finally:
+            for pending in (*self._pending.values(), *self._sent.values()):
+                pending.future.cancel()
+            self._pending.clear()
+            self._sent.clear()
+            self._task = None
+
+    async def _async_track(self) -> None:
+        """Poll the affected field groups until the sent commands are done.
+
+        Returns early when new commands were queued, so they are sent right
+        away; the unfinished commands are tracked together with them.
+        """
+        for delay in COMMAND_POLL_DELAYS:
+            if not self._sent or self._pending:
+                return
+            await asyncio.sleep(delay)
+            needed = {
+                name for pending in self._sent.values() for name in pending.spec.fields
+            }
+            try:
+                snapshot = await self.coordinator.async_poll_fields(
+                    [name for name in STATUS_FIELDS if name in needed]
+                )
+            except NIOApiError as err:
+                _LOGGER.debug(
+                    "Polling %s for command completion failed: %s",
+                    self.coordinator.vehicle_id,
+                    err,
+                )
+                continue
+            if snapshot is None:
+                continue
+            for target, pending in list(self._sent.items()):
+                if pending.spec.done_fn(snapshot):
+                    pending.resolve(COMMAND_DONE)
+                    del self._sent[target]
+
+        for pending in self._sent.values():
+            _LOGGER.debug(
+                "Command %s of %s not confirmed in time",
+                pending.command,
+                self.coordinator.vehicle_id,
+            )
+            pending.resolve(COMMAND_TIMEOUT)
+        self._sent.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics for diagnostics."""
+        return {
+            "pending": sorted(pending.command for pending in self._pending.values()),
+            "in_progress": sorted(pending.command for pending in self._sent.values()),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+        }
@@ -2,16 +2,17 @@
 from __future__ import annotations
 
 import logging
+import os
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
-import aiohttp
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
     DOMAIN,
@@ -21,13 +22,34 @@ from .const import (
     CONF_DEVICE_ID,
     CONF_SIGN,
     CONF_TIMESTAMP,
-    API_HEADERS,
-    API_BASE_URL,
-    DEFAULT_APP_ID,
-    DEFAULT_APP_VERSION,
-    DEFAULT_LANGUAGE,
-    DEFAULT_REGION,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_BATTERY_CAPACITY,
+    CONF_CHARGE_TARGET,
+    CONF_ENABLE_METRICS,
+    CONF_ENABLE_ARCHIVE,
+    CONF_ENABLE_COMMANDS,
+    CONF_ENABLE_EXPORTER,
+    CONF_PLACES_FILE,
+    CONF_RECORD_TRAFFIC,
+    CONF_REPLAY_SPEED,
+    CONF_PUSH_TRANSPORT,
+    CONF_PUSH_TOPIC,
+    CONF_PUSH_URL,
+    CONF_REPLAY_PATH,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_CHARGE_TARGET,
+    DEFAULT_PUSH_TOPIC,
+    DEFAULT_REPLAY_SPEED,
+    PUSH_NONE,
+    PUSH_REPLAY,
+    PUSH_STREAM,
+    PUSH_TRANSPORTS,
 )
+from .api import NIOApiAuthError, NIOApiError, async_get_client
+from .resilience import async_get_circuit_breaker
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +58,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    _reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -73,55 +105,186 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle rejected or expiring credentials."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for a newly captured token and signature."""
+        assert self._reauth_entry is not None
+        errors = {}
+
+        if user_input is not None:
+            data = {**self._reauth_entry.data, **user_input}
+            try:
+                await self._validate_input(data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                self.hass.config_entries.async_update_entry(
+                    self._reauth_entry, data=data
+                )
+                if self._reauth_entry.state is not ConfigEntryState.LOADED:
+                    # 加载的条目由更新监听器重新加载；首次刷新就认证失败的
+                    # 条目没有注册监听器，需要在这里重新加载
+                    self.hass.async_create_task(
+                        self.hass.config_entries.async_reload(
+                            self._reauth_entry.entry_id
+                        )
+                    )
+                return self.async_abort(reason="reauth_successful")
+
+        data_schema = vol.Schema({
+            vol.Required(CONF_ACCESS_TOKEN): str,
+            vol.Required(CONF_SIGN): str,
+            vol.Required(CONF_TIMESTAMP): str,
+            vol.Required(
+                CONF_DEVICE_ID, default=self._reauth_entry.data[CONF_DEVICE_ID]
+            ): str,
+            vol.Required(
+                CONF_APP_VERSION,
+                default=self._reauth_entry.data.get(CONF_APP_VERSION, ""),
+            ): str,
+        })
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={
+                "vehicle_id": self._reauth_entry.data[CONF_VEHICLE_ID]
+            },
+        )
+
     async def _validate_input(self, data: dict) -> dict:
         """Validate the user input allows us to connect."""
-        headers = API_HEADERS.copy()
-        headers["Authorization"] = f"Bearer {data[CONF_ACCESS_TOKEN]}"
-        headers["User-Agent"] = headers["User-Agent"].replace(DEFAULT_APP_VERSION, data[CONF_APP_VERSION])
-
-        url = f"{API_BASE_URL}/{data[CONF_VEHICLE_ID]}/status"
-        
-        params = {
-            "field": [
-                "soc", "door", "position", "connection", "exterior",
-                "hvac", "window", "tyre", "maintain", "special",
-                "fota", "heating", "offcar_mode_status", "light",
-                "mix_auth", "remote_operate_status", "frdg",
-                "nearby_car_ctrl", "trip_share_status",
-                "offcar_power_swap_status"
-            ],
-            "timestamp": data[CONF_TIMESTAMP],
-            "device_id": data[CONF_DEVICE_ID],
-            "app_id": DEFAULT_APP_ID,
-            "app_ver": data[CONF_APP_VERSION],
-            "lang": DEFAULT_LANGUAGE,
-            "region": DEFAULT_REGION,
-            "sign": data[CONF_SIGN]
-        }
+        client = async_get_client(self.hass)
 
         try:
-            session = async_get_clientsession(self.hass)
-            
-            # 构建完整的URL用于日志
-            from urllib.parse import urlencode
-            query_string = urlencode(params, doseq=True)
-            full_url = f"{url}?{query_string}"
-            _LOGGER.debug("Validation request URL: %s", full_url)
-            
-            async with session.get(url, headers=headers, params=params) as response:
-                if response.status != 200:
-                    raise CannotConnect
-                response_data = await response.json()
-                if response_data.get("result_code") != "success":
-                    raise InvalidAuth
-                
-                return {"title": f"NIO Vehicle ({data[CONF_VEHICLE_ID]})"}
-        except aiohttp.ClientError:
-            raise CannotConnect
-        except Exception as ex:
+            # 只请求一个字段组即可验证凭据
+            await client.async_get_status(client.vehicle_request(data), ("soc",))
+        except NIOApiAuthError as ex:
+            raise InvalidAuth from ex
+        except NIOApiError as ex:
             _LOGGER.error("Validation error: %s", ex)
             raise CannotConnect from ex
 
+        # 凭据已验证有效，解除该车辆此前记录的认证失败
+        async_get_circuit_breaker(self.hass, data).record_success()
+
+        return {"title": f"NIO Vehicle ({data[CONF_VEHICLE_ID]})"}
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle NIO Vehicle options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling and charging options."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            elif user_input[CONF_PUSH_TRANSPORT] == PUSH_STREAM and not user_input.get(
+                CONF_PUSH_URL
+            ):
+                errors[CONF_PUSH_URL] = "push_url_required"
+            elif user_input[CONF_PUSH_TRANSPORT] == PUSH_REPLAY and not (
+                await self.hass.async_add_executor_job(
+                    os.path.isfile,
+                    self.hass.config.path(user_input.get(CONF_REPLAY_PATH, "")),
+                )
+            ):
+                errors[CONF_REPLAY_PATH] = "replay_path_not_found"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self.config_entry.options
+        data_schema = vol.Schema({
+            vol.Required(
+                CONF_MIN_SCAN_INTERVAL,
+                default=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+            vol.Required(
+                CONF_MAX_SCAN_INTERVAL,
+                default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+            vol.Required(
+                CONF_BATTERY_CAPACITY,
+                default=options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY),
+            ): vol.All(vol.Coerce(float), vol.Range(min=1, max=500)),
+            vol.Required(
+                CONF_CHARGE_TARGET,
+                default=options.get(CONF_CHARGE_TARGET, DEFAULT_CHARGE_TARGET),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+            vol.Required(
+                CONF_ENABLE_METRICS,
+                default=options.get(CONF_ENABLE_METRICS, False),
+            ): bool,
+            vol.Required(
+                CONF_ENABLE_ARCHIVE,
+                default=options.get(CONF_ENABLE_ARCHIVE, False),
+            ): bool,
+            vol.Required(
+                CONF_ENABLE_EXPORTER,
+                default=options.get(CONF_ENABLE_EXPORTER, False),
+            ): bool,
+            vol.Optional(
+                CONF_PLACES_FILE,
+                default=options.get(CONF_PLACES_FILE, ""),
+            ): str,
+            vol.Required(
+                CONF_PUSH_TRANSPORT,
+                default=options.get(CONF_PUSH_TRANSPORT, PUSH_NONE),
+            ): vol.In(PUSH_TRANSPORTS),
+            vol.Optional(
+                CONF_PUSH_TOPIC,
+                default=options.get(CONF_PUSH_TOPIC, DEFAULT_PUSH_TOPIC),
+            ): str,
+            vol.Optional(
+                CONF_PUSH_URL,
+                default=options.get(CONF_PUSH_URL, ""),
+            ): str,
+            vol.Optional(
+                CONF_REPLAY_PATH,
+                default=options.get(CONF_REPLAY_PATH, ""),
+            ): str,
+            vol.Required(
+                CONF_REPLAY_SPEED,
+                default=options.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100000)),
+            vol.Required(
+                CONF_RECORD_TRAFFIC,
+                default=options.get(CONF_RECORD_TRAFFIC, False),
+            ): bool,
+            vol.Required(
+                CONF_ENABLE_COMMANDS,
+                default=options.get(CONF_ENABLE_COMMANDS, False),
+            ): bool,
+        })
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
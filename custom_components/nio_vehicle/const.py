@@ -2,6 +2,11 @@
 from datetime import timedelta
 
 DOMAIN = "nio_vehicle"
+DATA_FLEET = f"{DOMAIN}_fleet"
+DATA_CLIENT = f"{DOMAIN}_client"
+DATA_BREAKERS = f"{DOMAIN}_breakers"
+DATA_GEOCODERS = f"{DOMAIN}_geocoders"
+DATA_EXPORTER = f"{DOMAIN}_exporter"
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=60)
 
 # Configuration
@@ -12,6 +17,184 @@ CONF_DEVICE_ID = "device_id"
 CONF_SIGN = "sign"
 CONF_TIMESTAMP = "timestamp"
 
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# 每次轮询间隔的随机抖动比例 (±)
+FLEET_JITTER_RATIO = 0.1
+
+# 缓存快照写入磁盘的最短间隔（秒）
+CACHE_SAVE_DELAY = 300
+# 首次轮询成功前，缓存快照在此时长内保持可用
+CACHE_MAX_AGE = timedelta(hours=24)
+ATTR_CACHED_AT = "cached_at"
+
+# 位置轨迹：最多保留的点数、停车去重距离和简化容差（米）
+TRAIL_MAX_POINTS = 2000
+TRAIL_MAX_CANDIDATES = 100
+TRAIL_MIN_DISTANCE_M = 15
+TRAIL_TOLERANCE_M = 25
+
+# 行程识别：静止多久后结束行程、锁车后至少静止多久才结束行程（行驶中
+# 自动落锁的车辆在等红灯时不会被拆分）、最短行程（公里）和保留的行程数
+TRIP_END_IDLE = timedelta(minutes=10)
+TRIP_LOCKED_DWELL = timedelta(minutes=3)
+TRIP_MIN_DISTANCE = 0.5
+TRIP_LOG_SIZE = 50
+
+# 充电会话：最多保留的样本数、拟合所需最少样本数和充电速率半衰期（分钟）
+CHARGE_MAX_SAMPLES = 256
+CHARGE_MIN_SAMPLES = 3
+CHARGE_RATE_HALF_LIFE = 15
+
+# 远程命令：发送后确认完成的轮询间隔（秒）及命令结果
+COMMAND_POLL_DELAYS = (3, 5, 10, 15, 30)
+COMMAND_DONE = "done"
+COMMAND_TIMEOUT = "timeout"
+COMMAND_SUPERSEDED = "superseded"
+
+# 轮胎慢漏气检测：漏气速率拟合和正常压差基线的半衰期（天）、拟合所需的最短时间
+# 跨度（天）、判定漏气的压差（bar）、速率（bar/天）和标准差倍数
+TYRE_LEAK_HALF_LIFE = 1.0
+TYRE_BASELINE_HALF_LIFE = 7.0
+TYRE_LEAK_MIN_SPAN = 0.1
+TYRE_LEAK_MIN_DROP = 0.15
+TYRE_LEAK_RATE = 0.05
+TYRE_LEAK_Z = 4.0
+
+# 接口流量录制：目录、缓冲写入条件、单个文件的大小上限以及从数据中移除的标识字段
+TRAFFIC_DIR = f"{DOMAIN}_traffic"
+TRAFFIC_FLUSH_RECORDS = 100
+TRAFFIC_FLUSH_INTERVAL = timedelta(minutes=5)
+TRAFFIC_MAX_BYTES = 64 * 1024 * 1024
+TRAFFIC_REDACT = frozenset(
+    {"vin", "vehicle_id", "license_plate", "plate_no", "user_id", "account_id", "phone"}
+)
+
+# 能耗统计：窗口样本数、采样的最小里程间隔（公里）、发布统计所需的最少行驶里程
+# （公里）以及车外温度分桶宽度（°C）
+EFFICIENCY_WINDOW_SIZE = 4096
+EFFICIENCY_SAMPLE_DISTANCE = 1.0
+EFFICIENCY_MIN_DISTANCE = 20.0
+EFFICIENCY_TEMPERATURE_STEP = 10
+
+# 轮询性能统计保留的最近样本数
+METRICS_WINDOW = 200
+
+# 遥测归档：目录、两行之间的最短间隔（秒）、缓冲写入条件及分段轮转条件
+ARCHIVE_DIR = f"{DOMAIN}_archive"
+ARCHIVE_MIN_INTERVAL = 10
+ARCHIVE_FLUSH_ROWS = 60
+ARCHIVE_FLUSH_INTERVAL = timedelta(minutes=5)
+ARCHIVE_SEGMENT_SPAN = timedelta(days=1)
+ARCHIVE_SEGMENT_ROWS = 20000
+
+# 状态写入过滤：按设备类别的默认死区、回差（原生单位）及最短发布间隔、心跳（秒）
+ATTR_DEADBAND = "deadband"
+ATTR_HYSTERESIS = "hysteresis"
+ATTR_MIN_INTERVAL = "min_interval"
+ATTR_HEARTBEAT = "heartbeat"
+FILTER_HEARTBEAT = 3600
+FILTER_DEFAULTS = {
+    "pressure": {
+        ATTR_DEADBAND: 0.05,
+        ATTR_HYSTERESIS: 0.02,
+        ATTR_MIN_INTERVAL: 300,
+        ATTR_HEARTBEAT: FILTER_HEARTBEAT,
+    },
+    "temperature": {
+        ATTR_DEADBAND: 1.0,
+        ATTR_HYSTERESIS: 0.5,
+        ATTR_MIN_INTERVAL: 300,
+        ATTR_HEARTBEAT: FILTER_HEARTBEAT,
+    },
+}
+
+# 离线逆地理编码：地点和围栏索引的 geohash 精度、最近地点的搜索半径（米）
+# 以及按 geohash 前缀（约 150 米见方）缓存的查询结果数
+GEOCODE_PLACE_PRECISION = 5
+GEOCODE_FENCE_PRECISION = 6
+GEOCODE_MAX_DISTANCE_M = 3000
+GEOCODE_CACHE_PRECISION = 7
+GEOCODE_CACHE_SIZE = 1024
+
+# OpenMetrics 导出端点
+EXPORTER_URL = "/api/nio_vehicle/metrics"
+EXPORTER_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 协调器派生数据的更新主题，与字段组一起作为监听者的 context
+TOPIC_TRIP = "trip"
+TOPIC_CHARGING = "charging"
+TOPIC_PLACE = "place"
+TOPIC_EFFICIENCY = "efficiency"
+TOPIC_TYRE_LEAK = "tyre_leak"
+
+# Services
+SERVICE_GET_TRAIL = "get_trail"
+SERVICE_GET_TRIPS = "get_trips"
+SERVICE_GET_TELEMETRY = "get_telemetry"
+SERVICE_SET_FILTER = "set_filter"
+SERVICE_REFRESH = "refresh"
+SERVICE_SEND_COMMAND = "send_command"
+ATTR_COMMAND = "command"
+ATTR_SINCE = "since"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FIELDS = "fields"
+ATTR_MAX_AGE = "max_age"
+# 按需刷新时，不早于该时长的快照视为足够新
+DEFAULT_REFRESH_MAX_AGE = timedelta(seconds=30)
+
+# Options
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = 15
+DEFAULT_MAX_SCAN_INTERVAL = 1800
+CONF_ENABLE_METRICS = "enable_metrics"
+CONF_ENABLE_ARCHIVE = "enable_archive"
+CONF_PLACES_FILE = "places_file"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_ENABLE_EXPORTER = "enable_exporter"
+# 远程命令接口未经真实云端验证，需要用户显式启用
+CONF_ENABLE_COMMANDS = "enable_commands"
+CONF_REPLAY_PATH = "replay_path"
+CONF_REPLAY_SPEED = "replay_speed"
+DEFAULT_REPLAY_SPEED = 1.0
+CONF_BATTERY_CAPACITY = "battery_capacity"
+CONF_CHARGE_TARGET = "charge_target"
+DEFAULT_BATTERY_CAPACITY = 75
+DEFAULT_CHARGE_TARGET = 90
+
+CONF_PUSH_TRANSPORT = "push_transport"
+CONF_PUSH_TOPIC = "push_topic"
+CONF_PUSH_URL = "push_url"
+# 推送来源：不使用、MQTT 桥接、WebSocket/SSE 流
+PUSH_NONE = "none"
+PUSH_MQTT = "mqtt"
+PUSH_STREAM = "stream"
+PUSH_REPLAY = "replay"
+PUSH_TRANSPORTS = (PUSH_NONE, PUSH_MQTT, PUSH_STREAM, PUSH_REPLAY)
+DEFAULT_PUSH_TOPIC = "nio_vehicle/{vehicle_id}/status"
+
+# 推送连接正常时，轮询只用于对账
+PUSH_RECONCILE_INTERVAL = timedelta(minutes=15)
+# 推送流断开后的重连退避范围及心跳间隔（秒）
+PUSH_RECONNECT_MIN = 1
+PUSH_RECONNECT_MAX = 300
+PUSH_HEARTBEAT = 30
+
+# Adaptive polling intervals
+INTERVAL_DRIVING = timedelta(seconds=15)
+INTERVAL_FAST_CHARGING = timedelta(seconds=30)
+INTERVAL_CHARGING = timedelta(seconds=120)
+INTERVAL_AWAKE = DEFAULT_SCAN_INTERVAL
+INTERVAL_PARKED = timedelta(minutes=5)
+INTERVAL_ASLEEP = timedelta(minutes=30)
+IDLE_SLEEP_AFTER = timedelta(minutes=30)
+MOVE_THRESHOLD_M = 50
+# SOC 上升速度超过该值 (%/min) 视为快充
+FAST_CHARGE_SOC_RATE = 0.5
+CONNECTION_ONLINE = 1
+
 # API Constants
 API_BASE_URL = "https://icar.nio.com/api/2/rvs/vehicle"
 API_HEADERS = {
@@ -23,6 +206,61 @@ API_HEADERS = {
     "Accept-Encoding": "br;q=1.0, gzip;q=0.9, deflate;q=0.8"
 }
 
+# 状态接口支持的全部字段组
+STATUS_FIELDS = (
+    "soc", "door", "position", "connection", "exterior",
+    "hvac", "window", "tyre", "maintain", "special",
+    "fota", "heating", "offcar_mode_status", "light",
+    "mix_auth", "remote_operate_status", "frdg",
+    "nearby_car_ctrl", "trip_share_status",
+    "offcar_power_swap_status",
+)
+# 自适应轮询始终需要的字段组
+SCHEDULER_FIELDS = frozenset({"soc", "door", "position", "connection", "exterior"})
+# 很少变化的字段组，按较慢的周期获取
+SLOW_FIELDS = frozenset({"maintain", "fota"})
+SLOW_FIELDS_INTERVAL = timedelta(hours=1)
+
+# 轮胎和车门位置：(中文名, 英文名)
+TYRE_POSITIONS = {
+    "front_left": ("前左", "Front Left"),
+    "front_right": ("前右", "Front Right"),
+    "rear_left": ("后左", "Rear Left"),
+    "rear_right": ("后右", "Rear Right"),
+}
+
+
+def status_key(field: str) -> str:
+    """Return the response key of a requested status field group."""
+    return field if field.endswith("_status") else f"{field}_status"
+
+
+API_TIMEOUT = 10
+API_LIMIT_PER_HOST = 8
+API_KEEPALIVE_TIMEOUT = 75
+# 临时错误的重试次数及首次重试延迟（秒）
+API_RETRIES = 2
+API_RETRY_DELAY = 1.0
+# 连续失败多少次后熔断，以及熔断退避时间范围（秒）
+BREAKER_THRESHOLD = 3
+BREAKER_BASE_BACKOFF = 60
+BREAKER_MAX_BACKOFF = 3600
+
+# 表示令牌或签名被拒绝的接口结果码
+AUTH_RESULT_CODES = frozenset(
+    {
+        "auth_failed",
+        "unauthorized",
+        "invalid_token",
+        "token_expired",
+        "invalid_sign",
+        "sign_error",
+        "timestamp_expired",
+    }
+)
+# 令牌到期前多久提示重新认证
+CREDENTIAL_RENEW_AHEAD = timedelta(days=3)
+
 # Device Info
 MANUFACTURER = "NIO"
 MODEL = "Electric Vehicle"
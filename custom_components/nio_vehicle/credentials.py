@@ -0,0 +1,88 @@
+"""Credential lifecycle of NIO Vehicle config entries."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_ACCESS_TOKEN, CONF_TIMESTAMP
+
+
+def _jwt_claims(token: str) -> dict[str, Any] | None:
+    """Return the claims of a JWT access token, or None if it is opaque."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def _from_timestamp(value: Any) -> datetime | None:
+    """Parse a Unix timestamp given in seconds or milliseconds."""
+    try:
+        timestamp = float(value)
+    except (TypeError, ValueError):
+        return None
+    if timestamp > 1e11:
+        timestamp /= 1000
+    try:
+        return dt_util.utc_from_timestamp(timestamp)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class CredentialInfo:
+    """What is known about the age and expiry of the credentials.
+
+    The signature is computed by the app when the request is captured, so
+    the signed timestamp tells how old the credentials are. The expiry is
+    only known for access tokens that are JWTs with an "exp" claim.
+    """
+
+    signed_at: datetime | None = None
+    expires_at: datetime | None = None
+
+    @classmethod
+    def from_data(cls, data: Mapping[str, Any]) -> CredentialInfo:
+        """Read the credential info of a config entry."""
+        claims = _jwt_claims(data.get(CONF_ACCESS_TOKEN, "")) or {}
+        return cls(
+            signed_at=_from_timestamp(data.get(CONF_TIMESTAMP)),
+            expires_at=_from_timestamp(claims.get("exp")),
+        )
+
+    def age(self, now: datetime) -> timedelta | None:
+        """Return the age of the signature."""
+        return now - self.signed_at if self.signed_at else None
+
+    def expires_in(self, now: datetime) -> timedelta | None:
+        """Return the time until the access token expires."""
+        return self.expires_at - now if self.expires_at else None
+
+    def as_dict(self, now: datetime) -> dict[str, Any]:
+        """Return the credential info for diagnostics."""
+        age = self.age(now)
+        expires_in = self.expires_in(now)
+        return {
+            "signed_at": self.signed_at.isoformat() if self.signed_at else None,
+            "age_days": (
+                round(age / timedelta(days=1), 1) if age is not None else None
+            ),
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "expires_in_days": (
+                round(expires_in / timedelta(days=1), 1)
+                if expires_in is not None
+                else None
+            ),
+        }
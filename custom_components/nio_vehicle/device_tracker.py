@@ -1,6 +1,8 @@
 """Support for tracking NIO vehicles."""
 from __future__ import annotations
 
+from typing import Any
+
 from homeassistant.components.device_tracker import (
     SourceType,
     TrackerEntity,
@@ -10,7 +12,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import DOMAIN, NIOVehicleEntity
-from .const import CONF_VEHICLE_ID
+from .const import CONF_VEHICLE_ID, TOPIC_PLACE
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -26,7 +28,7 @@ class NIODeviceTracker(NIOVehicleEntity, TrackerEntity):
 
     def __init__(self, coordinator):
         """Initialize the tracker."""
-        super().__init__(coordinator, "location")
+        super().__init__(coordinator, "location", ("position",), (TOPIC_PLACE,))
         self.entity_id = f"device_tracker.{self.entity_id_prefix}_location"
         self._attr_name = "位置 Location"
         self._attr_unique_id = f"{coordinator.config_entry.data[CONF_VEHICLE_ID]}_location"
@@ -39,15 +41,26 @@ class NIODeviceTracker(NIOVehicleEntity, TrackerEntity):
     @property
     def latitude(self) -> float | None:
         """Return latitude value of the device."""
-        try:
-            return self.coordinator.data["data"]["position_status"]["latitude"]
-        except KeyError:
-            return None
+        position = self.coordinator.data.position
+        return position.latitude if position else None
 
     @property
     def longitude(self) -> float | None:
         """Return longitude value of the device."""
-        try:
-            return self.coordinator.data["data"]["position_status"]["longitude"]
-        except KeyError:
-            return None
+        position = self.coordinator.data.position
+        return position.longitude if position else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the reverse geocoded place of the vehicle."""
+        attributes = dict(super().extra_state_attributes or {})
+        if (place := self.coordinator.place) is not None:
+            attributes.update(
+                {
+                    "place": place.place,
+                    "place_category": place.category,
+                    "place_distance": place.distance,
+                    "geofences": list(place.geofences),
+                }
+            )
+        return attributes or None
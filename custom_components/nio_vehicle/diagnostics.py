@@ -0,0 +1,79 @@
+"""Diagnostics support for NIO Vehicle."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ACCESS_TOKEN,
+    CONF_DEVICE_ID,
+    CONF_SIGN,
+    CONF_VEHICLE_ID,
+    DATA_EXPORTER,
+    DOMAIN,
+)
+
+TO_REDACT = {
+    CONF_ACCESS_TOKEN,
+    CONF_DEVICE_ID,
+    CONF_SIGN,
+    CONF_VEHICLE_ID,
+    "latitude",
+    "longitude",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    snapshot = coordinator.data
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "vehicle_state": coordinator.scheduler.state,
+            "requested_fields": sorted(coordinator.requested_fields),
+            "queue": coordinator.fleet.stats(coordinator.vehicle_id),
+            "circuit_breaker": coordinator.breaker.as_dict(),
+            "push": coordinator.push.as_dict() if coordinator.push else None,
+            "commands": (
+                coordinator.commands.as_dict() if coordinator.commands else None
+            ),
+            "traffic": coordinator.traffic.as_dict() if coordinator.traffic else None,
+            "credentials": coordinator.credentials.as_dict(dt_util.utcnow()),
+            "geocoder": (
+                coordinator.geocoder.as_dict() if coordinator.geocoder else None
+            ),
+            "exporter": (
+                exporter.as_dict()
+                if (exporter := hass.data.get(DATA_EXPORTER))
+                else None
+            ),
+        },
+        "metrics": coordinator.metrics.as_dict() if coordinator.metrics else None,
+        "snapshot": (
+            async_redact_data(snapshot.as_dict(), TO_REDACT) if snapshot else None
+        ),
+        "trail_points": len(coordinator.trail),
+        "trips": len(coordinator.trips.trips),
+        "tyre_leaks": coordinator.tyre_leaks.as_dict(),
+        "efficiency": {
+            "samples": len(coordinator.efficiency),
+            "stats": (
+                coordinator.efficiency_stats.as_dict()
+                if coordinator.efficiency_stats
+                else None
+            ),
+        },
+    }
@@ -0,0 +1,180 @@
+"""Rolling energy efficiency statistics for NIO vehicles.
+
+Samples are kept in a fixed-size ring buffer, so the memory and the cost
+of a statistics run are bounded no matter how long the vehicle has been
+tracked. A sample is only added when the odometer advanced or the charging
+state changed; the statistics are then recomputed over the whole window
+with vectorized NumPy operations in the executor.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .const import (
+    EFFICIENCY_MIN_DISTANCE,
+    EFFICIENCY_SAMPLE_DISTANCE,
+    EFFICIENCY_TEMPERATURE_STEP,
+    EFFICIENCY_WINDOW_SIZE,
+)
+from .model import VehicleSnapshot
+
+# 样本列
+TIME, MILEAGE, SOC, TEMPERATURE, RANGE, ACTUAL_RANGE, CHARGING = range(7)
+_COLUMNS = 7
+
+
+@dataclass(frozen=True, slots=True)
+class EfficiencyStats:
+    """Efficiency statistics of the sample window."""
+
+    # 每百公里消耗的电量百分比
+    consumption: float | None
+    # 每 1% 电量行驶的公里数
+    distance_per_soc: float | None
+    # 表显续航与实际续航之比
+    range_ratio: float | None
+    distance: float
+    samples: int
+    by_temperature: dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dictionary."""
+        return {
+            "consumption": self.consumption,
+            "distance_per_soc": self.distance_per_soc,
+            "range_ratio": self.range_ratio,
+            "distance": self.distance,
+            "samples": self.samples,
+            "by_temperature": self.by_temperature,
+        }
+
+
+class EfficiencyWindow:
+    """Fixed-size ring buffer of efficiency samples."""
+
+    def __init__(self, size: int = EFFICIENCY_WINDOW_SIZE) -> None:
+        """Initialize the window."""
+        self._data = np.full((size, _COLUMNS), np.nan)
+        self._next = 0
+        self._count = 0
+        # 累计加入的样本数，用于判断窗口在计算期间是否前进
+        self.added = 0
+        self._last_mileage: float | None = None
+        self._last_charging: bool | None = None
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return self._count
+
+    def add(self, snapshot: VehicleSnapshot) -> bool:
+        """Add a sample if the vehicle moved or (stopped) charging.
+
+        Returns True if the window advanced.
+        """
+        soc = snapshot.soc
+        exterior = snapshot.exterior
+        if soc is None or soc.soc is None or exterior is None or exterior.mileage is None:
+            return False
+        # 未知的充电状态视为未充电
+        charging = bool(soc.charging)
+        if (
+            self._last_mileage is not None
+            and exterior.mileage - self._last_mileage < EFFICIENCY_SAMPLE_DISTANCE
+            and charging == self._last_charging
+        ):
+            return False
+        self._last_mileage = exterior.mileage
+        self._last_charging = charging
+
+        hvac = snapshot.hvac
+        self._data[self._next] = (
+            snapshot.fetched_at.timestamp(),
+            exterior.mileage,
+            soc.soc,
+            _nan(hvac.outside_temperature if hvac else None),
+            _nan(soc.remaining_range),
+            _nan(soc.remaining_actual_range),
+            float(charging),
+        )
+        self._next = (self._next + 1) % len(self._data)
+        self._count = min(self._count + 1, len(self._data))
+        self.added += 1
+        return True
+
+    def samples(self) -> np.ndarray:
+        """Return a copy of the samples, oldest first."""
+        if self._count < len(self._data):
+            return self._data[: self._count].copy()
+        return np.concatenate((self._data[self._next :], self._data[: self._next]))
+
+
+def _nan(value: float | None) -> float:
+    return np.nan if value is None else value
+
+
+def _round(value: float, digits: int) -> float | None:
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def compute_efficiency(samples: np.ndarray) -> EfficiencyStats | None:
+    """Compute the efficiency statistics of a sample window (blocking)."""
+    if len(samples) < 2:
+        return None
+    distance = np.diff(samples[:, MILEAGE])
+    soc_used = -np.diff(samples[:, SOC])
+    charging = samples[:, CHARGING]
+    # 只统计两端都未充电、里程增加且电量未上升的区间
+    driving = (
+        (distance > 0)
+        & (soc_used >= 0)
+        & (charging[:-1] == 0)
+        & (charging[1:] == 0)
+    )
+    distance = distance[driving]
+    soc_used = soc_used[driving]
+    total_distance = float(distance.sum())
+    total_soc = float(soc_used.sum())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = samples[:, RANGE] / samples[:, ACTUAL_RANGE]
+    ratios = ratios[np.isfinite(ratios) & (ratios > 0)]
+    range_ratio = _round(np.median(ratios), 3) if len(ratios) else None
+
+    if total_distance < EFFICIENCY_MIN_DISTANCE:
+        return EfficiencyStats(
+            None, None, range_ratio, round(total_distance, 1), len(samples)
+        )
+
+    # 按区间平均车外温度分桶
+    temperature = (samples[:-1, TEMPERATURE] + samples[1:, TEMPERATURE])[driving] / 2
+    known = np.isfinite(temperature)
+    buckets = (
+        np.floor(temperature[known] / EFFICIENCY_TEMPERATURE_STEP).astype(int)
+        * EFFICIENCY_TEMPERATURE_STEP
+    )
+    by_temperature = {}
+    if len(buckets):
+        lows, inverse = np.unique(buckets, return_inverse=True)
+        bucket_distance = np.bincount(inverse, weights=distance[known])
+        bucket_soc = np.bincount(inverse, weights=soc_used[known])
+        by_temperature = {
+            f"{low}..{low + EFFICIENCY_TEMPERATURE_STEP}": round(
+                float(used / driven * 100), 2
+            )
+            for low, driven, used in zip(lows, bucket_distance, bucket_soc)
+            if driven >= EFFICIENCY_MIN_DISTANCE
+        }
+
+    return EfficiencyStats(
+        consumption=round(total_soc / total_distance * 100, 2),
+        distance_per_soc=(
+            round(total_distance / total_soc, 2) if total_soc > 0 else None
+        ),
+        range_ratio=range_ratio,
+        distance=round(total_distance, 1),
+        samples=len(samples),
+        by_temperature=by_temperature,
+    )
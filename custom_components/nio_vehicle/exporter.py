@@ -0,0 +1,337 @@
+"""OpenMetrics exporter for NIO vehicles.
+
+Serves the latest status snapshot of every vehicle whose config entry
+enabled the exporter at /api/nio_vehicle/metrics, e.g. for Prometheus:
+
+    - job_name: nio_vehicle
+      metrics_path: /api/nio_vehicle/metrics
+      bearer_token: <long-lived access token>
+      static_configs:
+        - targets: ["homeassistant.local:8123"]
+
+The values are read from the coordinators, not from the state machine or
+the recorder, so a scrape does not depend on the size of the history.
+Label sets are built once per vehicle, and the samples of a vehicle are
+only rendered again when its snapshot or poll health changed; scrapes in
+between return the cached response body.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DATA_EXPORTER, EXPORTER_CONTENT_TYPE, EXPORTER_URL, TYRE_POSITIONS
+from .model import VehicleSnapshot, compile_path, is_open
+
+if TYPE_CHECKING:
+    from . import NIOVehicleDataUpdateCoordinator
+
+PREFIX = "nio_vehicle"
+
+
+@dataclass(frozen=True, slots=True)
+class MetricSample:
+    """A sample of a metric family read from the snapshot."""
+
+    path: str
+    # 额外的标签，如轮胎或车门位置
+    labels: tuple[tuple[str, str], ...] = ()
+    transform: Callable[[Any], float | int] = float
+
+
+@dataclass(frozen=True, slots=True)
+class MetricFamily:
+    """An exported gauge."""
+
+    name: str
+    help: str
+    unit: str = ""
+    samples: tuple[MetricSample, ...] = ()
+
+    @property
+    def header(self) -> str:
+        """Return the metadata lines of the family."""
+        lines = [f"# TYPE {self.name} gauge\n"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}\n")
+        lines.append(f"# HELP {self.name} {self.help}\n")
+        return "".join(lines)
+
+
+_DOORS = {
+    **{position: f"door.door_ajar_{position}_status" for position in TYRE_POSITIONS},
+    "trunk": "door.tailgate_ajar_status",
+}
+
+SNAPSHOT_FAMILIES: tuple[MetricFamily, ...] = (
+    MetricFamily(
+        f"{PREFIX}_soc_percent", "State of charge.", "percent", (MetricSample("soc.soc"),)
+    ),
+    MetricFamily(
+        f"{PREFIX}_range_kilometers",
+        "Remaining range shown by the vehicle.",
+        "kilometers",
+        (MetricSample("soc.remaining_range"),),
+    ),
+    MetricFamily(
+        f"{PREFIX}_actual_range_kilometers",
+        "Remaining range estimated from recent driving.",
+        "kilometers",
+        (MetricSample("soc.remaining_actual_range"),),
+    ),
+    MetricFamily(
+        f"{PREFIX}_mileage_kilometers",
+        "Odometer reading.",
+        "kilometers",
+        (MetricSample("exterior.mileage"),),
+    ),
+    MetricFamily(
+        f"{PREFIX}_tyre_pressure_bar",
+        "Tyre pressure.",
+        "bar",
+        tuple(
+            MetricSample(f"tyre.{position}_wheel_press_bar", (("position", position),))
+            for position in TYRE_POSITIONS
+        ),
+    ),
+    MetricFamily(
+        f"{PREFIX}_outside_temperature_celsius",
+        "Outside temperature.",
+        "celsius",
+        (MetricSample("hvac.outside_temperature"),),
+    ),
+    MetricFamily(
+        f"{PREFIX}_locked",
+        "1 if the vehicle is locked.",
+        samples=(MetricSample("door.locked", transform=int),),
+    ),
+    MetricFamily(
+        f"{PREFIX}_door_open",
+        "1 if the door, trunk or charge port is open.",
+        samples=(
+            *(
+                MetricSample(
+                    path, (("door", door),), lambda value: int(is_open(value))
+                )
+                for door, path in _DOORS.items()
+            ),
+            MetricSample("door.charge_port_open", (("door", "charge_port"),), int),
+        ),
+    ),
+    MetricFamily(
+        f"{PREFIX}_charging",
+        "1 if the vehicle is charging.",
+        samples=(MetricSample("soc.charging", transform=int),),
+    ),
+)
+
+# 轮询健康状况，不来自快照
+UP = MetricFamily(f"{PREFIX}_up", "1 if the last poll of the vehicle succeeded.")
+SNAPSHOT_TIME = MetricFamily(
+    f"{PREFIX}_snapshot_timestamp_seconds",
+    "Time the status snapshot was fetched.",
+    "seconds",
+)
+UPDATE_INTERVAL = MetricFamily(
+    f"{PREFIX}_update_interval_seconds", "Current polling interval.", "seconds"
+)
+FAILURES = MetricFamily(
+    f"{PREFIX}_consecutive_failures",
+    "Consecutive failed requests of the vehicle.",
+)
+
+# 导出需要的字段组，即使对应的实体被禁用也要轮询
+EXPORTED_FIELDS = frozenset(
+    sample.path.split(".")[0]
+    for family in SNAPSHOT_FAMILIES
+    for sample in family.samples
+)
+
+FAMILIES: tuple[MetricFamily, ...] = (
+    *SNAPSHOT_FAMILIES,
+    UP,
+    SNAPSHOT_TIME,
+    UPDATE_INTERVAL,
+    FAILURES,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(vehicle_id: str, labels: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = (("vehicle", vehicle_id), *labels)
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format(value: float | int) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class VehicleMetrics:
+    """Rendered samples of one vehicle."""
+
+    def __init__(self, coordinator: NIOVehicleDataUpdateCoordinator) -> None:
+        """Initialize the vehicle and build its label sets."""
+        self.coordinator = coordinator
+        vehicle_id = coordinator.vehicle_id
+        # 预先拼好 "名称{标签} " 前缀，渲染时只需追加数值
+        self._prefixes = [
+            [
+                (
+                    f"{family.name}{_labels(vehicle_id, sample.labels)} ",
+                    compile_path(sample.path),
+                    sample.transform,
+                )
+                for sample in family.samples
+            ]
+            for family in SNAPSHOT_FAMILIES
+        ]
+        labels = _labels(vehicle_id)
+        self._up = f"{UP.name}{labels} "
+        self._snapshot_time = f"{SNAPSHOT_TIME.name}{labels} "
+        self._update_interval = f"{UPDATE_INTERVAL.name}{labels} "
+        self._failures = f"{FAILURES.name}{labels} "
+        self._snapshot: VehicleSnapshot | None = None
+        self._health: tuple | None = None
+        # 按 FAMILIES 顺序，每个指标族一段文本
+        self.blocks: list[str] = [""] * len(FAMILIES)
+
+    def _poll_health(self) -> tuple:
+        coordinator = self.coordinator
+        return (
+            coordinator.last_update_success,
+            coordinator.update_interval,
+            coordinator.breaker.failures,
+        )
+
+    def update(self) -> bool:
+        """Render the samples again if they are stale. Returns True if so."""
+        coordinator = self.coordinator
+        snapshot: VehicleSnapshot | None = coordinator.data
+        health = self._poll_health()
+        # 快照是不可变的（frozen），每次更新都会换成新的对象，比较同一性即可
+        if snapshot is self._snapshot and health == self._health:
+            return False
+        self._snapshot = snapshot
+        self._health = health
+        blocks = []
+        for samples in self._prefixes:
+            lines = []
+            if snapshot is not None:
+                for prefix, accessor, transform in samples:
+                    if (value := accessor(snapshot)) is not None:
+                        lines.append(f"{prefix}{_format(transform(value))}\n")
+            blocks.append("".join(lines))
+
+        blocks.append(f"{self._up}{int(coordinator.last_update_success)}\n")
+        blocks.append(
+            f"{self._snapshot_time}{_format(snapshot.fetched_at.timestamp())}\n"
+            if snapshot is not None
+            else ""
+        )
+        interval = coordinator.update_interval
+        blocks.append(
+            f"{self._update_interval}{_format(interval.total_seconds())}\n"
+            if interval is not None
+            else ""
+        )
+        blocks.append(f"{self._failures}{coordinator.breaker.failures}\n")
+        self.blocks = blocks
+        return True
+
+
+class MetricsExporter:
+    """Renders the samples of all exported vehicles."""
+
+    def __init__(self) -> None:
+        """Initialize the exporter."""
+        self._vehicles: dict[str, VehicleMetrics] = {}
+        self._body: bytes | None = None
+        self.scrapes = 0
+        self.renders = 0
+
+    @callback
+    def async_register(
+        self, coordinator: NIOVehicleDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """Export a vehicle until the returned callback is called."""
+        entry_id = coordinator.config_entry.entry_id
+        self._vehicles[entry_id] = VehicleMetrics(coordinator)
+        self._body = None
+        # 渲染时才读取快照，监听只用于请求导出的字段组
+        remove_listener = coordinator.async_add_listener(
+            lambda: None, EXPORTED_FIELDS
+        )
+
+        @callback
+        def _async_unregister() -> None:
+            remove_listener()
+            self._vehicles.pop(entry_id, None)
+            self._body = None
+
+        return _async_unregister
+
+    @callback
+    def async_render(self) -> bytes:
+        """Return the OpenMetrics text of all vehicles."""
+        self.scrapes += 1
+        # 逐个检查车辆缓存，只有数据变化时才重新拼接
+        changed = [vehicle.update() for vehicle in self._vehicles.values()]
+        if self._body is None or any(changed):
+            self.renders += 1
+            vehicles = list(self._vehicles.values())
+            self._body = "".join(
+                [
+                    *(
+                        family.header
+                        + "".join(vehicle.blocks[index] for vehicle in vehicles)
+                        for index, family in enumerate(FAMILIES)
+                    ),
+                    "# EOF\n",
+                ]
+            ).encode()
+        return self._body
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics for diagnostics."""
+        return {
+            "vehicles": len(self._vehicles),
+            "scrapes": self.scrapes,
+            "renders": self.renders,
+        }
+
+
+class NIOMetricsView(HomeAssistantView):
+    """OpenMetrics endpoint of the exported vehicles."""
+
+    url = EXPORTER_URL
+    name = "api:nio_vehicle:metrics"
+
+    def __init__(self, exporter: MetricsExporter) -> None:
+        """Initialize the view."""
+        self.exporter = exporter
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics."""
+        return web.Response(
+            body=self.exporter.async_render(),
+            headers={"Content-Type": EXPORTER_CONTENT_TYPE},
+        )
+
+
+@callback
+def async_get_exporter(hass: HomeAssistant) -> MetricsExporter:
+    """Return the exporter, registering its endpoint on first use."""
+    if (exporter := hass.data.get(DATA_EXPORTER)) is None:
+        exporter = hass.data[DATA_EXPORTER] = MetricsExporter()
+        # 视图无法注销，车辆卸载后仍返回空结果
+        hass.http.register_view(NIOMetricsView(exporter))
+    return exporter
@@ -0,0 +1,56 @@
+"""State publish filtering for noisy NIO Vehicle sensors."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class PublishFilter:
+    """Decide when a changed sensor value is worth a state write.
+
+    A value is published when it moves at least the deadband away from the
+    last published value. Reversing the direction of the last published
+    change additionally requires the hysteresis, so a value oscillating at
+    the edge of the band does not flap. Changes are published at most once
+    per minimum interval, and the current value is republished after the
+    heartbeat even if it stayed inside the band.
+    """
+
+    deadband: float = 0.0
+    hysteresis: float = 0.0
+    # 以下时间单位均为秒
+    min_interval: float = 0.0
+    heartbeat: float = 3600.0
+    value: float | None = None
+    published_at: float | None = None
+    direction: int = 0
+
+    def delay(self, value: float | None, now: float) -> float | None:
+        """Return the seconds until the value should be published.
+
+        Returns None if the value does not need to be published at all.
+        """
+        if self.published_at is None or self.heartbeat_delay(now) == 0:
+            return 0.0
+        if value == self.value:
+            return None
+        if value is not None and self.value is not None:
+            change = value - self.value
+            band = self.deadband
+            if change * self.direction < 0:
+                band += self.hysteresis
+            if abs(change) < band:
+                return self.heartbeat_delay(now)
+        return max(self.published_at + self.min_interval - now, 0.0)
+
+    def heartbeat_delay(self, now: float) -> float:
+        """Return the seconds until the heartbeat is due."""
+        assert self.published_at is not None
+        return max(self.published_at + self.heartbeat - now, 0.0)
+
+    def publish(self, value: float | None, now: float) -> None:
+        """Record a published value."""
+        if value is not None and self.value is not None and value != self.value:
+            self.direction = 1 if value > self.value else -1
+        self.value = value
+        self.published_at = now
@@ -0,0 +1,120 @@
+"""Fleet-wide request scheduling for NIO Vehicle."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import zlib
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from .const import FLEET_JITTER_RATIO
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _fraction(key: str) -> float:
+    """Map a key to a stable value in [0, 1)."""
+    return zlib.crc32(key.encode()) / 0x100000000
+
+
+class VehicleQueueStats:
+    """Queue statistics for a single vehicle."""
+
+    __slots__ = ("polls", "last_delay", "max_delay", "avg_delay")
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.polls = 0
+        self.last_delay = 0.0
+        self.max_delay = 0.0
+        self.avg_delay = 0.0
+
+    def record(self, delay: float) -> None:
+        """Record the time a poll spent waiting for a request slot."""
+        self.polls += 1
+        self.last_delay = delay
+        self.max_delay = max(self.max_delay, delay)
+        # 指数加权平均，避免保存历史样本
+        self.avg_delay += (delay - self.avg_delay) / min(self.polls, 20)
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Return the statistics as a dictionary."""
+        return {
+            "polls": self.polls,
+            "last_queue_delay": round(self.last_delay, 3),
+            "max_queue_delay": round(self.max_delay, 3),
+            "avg_queue_delay": round(self.avg_delay, 3),
+        }
+
+
+class FleetScheduler:
+    """Spread polls of all configured vehicles and cap concurrent requests.
+
+    Every vehicle gets a stable phase offset derived from its ID, so polls
+    started together after a restart drift apart instead of firing on the
+    same tick, and a semaphore limits how many requests are in flight.
+    """
+
+    def __init__(self, max_concurrent: int) -> None:
+        """Initialize the fleet scheduler."""
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._stats: dict[str, VehicleQueueStats] = {}
+        self.in_flight = 0
+
+    def async_register(self, vehicle_id: str) -> Callable[[], None]:
+        """Register a vehicle and return a callback that unregisters it."""
+        self._stats[vehicle_id] = VehicleQueueStats()
+
+        def _unregister() -> None:
+            self._stats.pop(vehicle_id, None)
+
+        return _unregister
+
+    def next_interval(
+        self,
+        vehicle_id: str,
+        interval: timedelta,
+        min_interval: timedelta,
+        max_interval: timedelta,
+    ) -> timedelta:
+        """Return the interval with the vehicle's deterministic jitter applied.
+
+        The jittered interval is clamped to [min_interval, max_interval].
+        """
+        stats = self._stats.get(vehicle_id)
+        if stats is None:
+            jittered = interval
+        elif stats.polls <= 1:
+            # 首次轮询后用固定相位把车辆分布到 0.5 到 1.5 个周期之间
+            jittered = interval * (0.5 + _fraction(vehicle_id))
+        else:
+            offset = 2 * _fraction(f"{vehicle_id}:{stats.polls}") - 1
+            jittered = interval * (1 + FLEET_JITTER_RATIO * offset)
+        return min(max(jittered, min_interval), max_interval)
+
+    @asynccontextmanager
+    async def slot(self, vehicle_id: str) -> AsyncIterator[None]:
+        """Wait for a free request slot and hold it for the duration."""
+        queued = time.monotonic()
+        async with self._semaphore:
+            delay = time.monotonic() - queued
+            if (stats := self._stats.get(vehicle_id)) is not None:
+                stats.record(delay)
+            if delay > 1:
+                _LOGGER.debug(
+                    "Vehicle %s waited %.1fs for a request slot", vehicle_id, delay
+                )
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def stats(self, vehicle_id: str) -> dict[str, float | int]:
+        """Return the queue statistics of a vehicle."""
+        if (stats := self._stats.get(vehicle_id)) is None:
+            return {}
+        return stats.as_dict()
@@ -0,0 +1,265 @@
+"""Offline reverse geocoding and geofences for NIO Vehicle.
+
+Places are read from a user-supplied file in the config directory:
+
+- A CSV file with a header containing name, latitude and longitude, and
+  optionally category and radius (in metres).
+- A GeoNames dump (e.g. cities500.txt), tab separated.
+
+Every place is a candidate for the nearest place lookup. Places with a
+radius are also geofences, e.g. depots. Both are indexed on a geohash
+grid, so a lookup only looks at the cells around the vehicle.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_GEOCODERS,
+    GEOCODE_CACHE_PRECISION,
+    GEOCODE_CACHE_SIZE,
+    GEOCODE_FENCE_PRECISION,
+    GEOCODE_MAX_DISTANCE_M,
+    GEOCODE_PLACE_PRECISION,
+)
+from .util import distance_m
+
+_LOGGER = logging.getLogger(__name__)
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# 纬度方向每度约 111 km
+_METRES_PER_DEGREE = 111_320
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int) -> str:
+    """Return the geohash of a coordinate."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                value = value * 2 + 1
+                lon_range[0] = mid
+            else:
+                value *= 2
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                value = value * 2 + 1
+                lat_range[0] = mid
+            else:
+                value *= 2
+                lat_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Return the height and width in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180 / 2**lat_bits, 360 / 2**lon_bits
+
+
+def covering_cells(
+    latitude: float, longitude: float, radius_m: float, precision: int
+) -> set[str]:
+    """Return the geohash cells that intersect a circle's bounding box."""
+    height, width = cell_size(precision)
+    dlat = radius_m / _METRES_PER_DEGREE
+    dlon = dlat / max(math.cos(math.radians(latitude)), 0.01)
+    rows = int(dlat / height) + 1
+    cols = int(dlon / width) + 1
+    return {
+        encode_geohash(
+            min(max(latitude + row * height, -90.0), 90.0),
+            (longitude + col * width + 180) % 360 - 180,
+            precision,
+        )
+        for row in range(-rows, rows + 1)
+        for col in range(-cols, cols + 1)
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class Place:
+    """A named place of the dataset."""
+
+    name: str
+    latitude: float
+    longitude: float
+    category: str | None = None
+    radius: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class PlaceMatch:
+    """Result of a reverse geocoding lookup."""
+
+    place: str | None
+    category: str | None
+    distance: float | None
+    geofences: tuple[str, ...]
+
+
+class Geocoder:
+    """Nearest place and geofence lookups on geohash grids."""
+
+    def __init__(self, places: list[Place]) -> None:
+        """Initialize the geocoder and build its indexes."""
+        self._places: dict[str, list[Place]] = {}
+        self._fences: dict[str, list[Place]] = {}
+        for place in places:
+            cell = encode_geohash(
+                place.latitude, place.longitude, GEOCODE_PLACE_PRECISION
+            )
+            self._places.setdefault(cell, []).append(place)
+            if place.radius > 0:
+                for cell in covering_cells(
+                    place.latitude,
+                    place.longitude,
+                    place.radius,
+                    GEOCODE_FENCE_PRECISION,
+                ):
+                    self._fences.setdefault(cell, []).append(place)
+        self._cache: OrderedDict[str, tuple[Place | None, float | None]] = OrderedDict()
+        self.size = len(places)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, latitude: float, longitude: float) -> PlaceMatch:
+        """Return the nearest place and the geofences containing a point."""
+        place, distance = self._nearest_cached(latitude, longitude)
+        # 围栏边界需要精确判断，不使用缓存
+        fences = tuple(
+            fence.name
+            for fence in self._fences.get(
+                encode_geohash(latitude, longitude, GEOCODE_FENCE_PRECISION), ()
+            )
+            if distance_m(latitude, longitude, fence.latitude, fence.longitude)
+            <= fence.radius
+        )
+        return PlaceMatch(
+            place=place.name if place else None,
+            category=place.category if place else None,
+            distance=round(distance) if distance is not None else None,
+            geofences=fences,
+        )
+
+    def _nearest_cached(
+        self, latitude: float, longitude: float
+    ) -> tuple[Place | None, float | None]:
+        """Return the nearest place, cached per small geohash cell."""
+        key = encode_geohash(latitude, longitude, GEOCODE_CACHE_PRECISION)
+        if (cached := self._cache.get(key)) is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = self._nearest(latitude, longitude)
+        self._cache[key] = result
+        if len(self._cache) > GEOCODE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def _nearest(
+        self, latitude: float, longitude: float
+    ) -> tuple[Place | None, float | None]:
+        """Search the cells around a point for the nearest place."""
+        best: Place | None = None
+        best_distance = GEOCODE_MAX_DISTANCE_M
+        for cell in covering_cells(
+            latitude, longitude, GEOCODE_MAX_DISTANCE_M, GEOCODE_PLACE_PRECISION
+        ):
+            for place in self._places.get(cell, ()):
+                distance = distance_m(latitude, longitude, place.latitude, place.longitude)
+                if distance <= best_distance:
+                    best, best_distance = place, distance
+        return (best, best_distance) if best else (None, None)
+
+    def as_dict(self) -> dict[str, int]:
+        """Return statistics for diagnostics."""
+        return {
+            "places": self.size,
+            "cached_cells": len(self._cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+def _read_csv(path: Path) -> list[Place]:
+    places = []
+    with path.open(newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            try:
+                places.append(
+                    Place(
+                        name=row["name"],
+                        latitude=float(row["latitude"]),
+                        longitude=float(row["longitude"]),
+                        category=row.get("category") or None,
+                        radius=float(row.get("radius") or 0),
+                    )
+                )
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.debug("Skipping invalid place in %s: %s", path, row)
+    return places
+
+
+def _read_geonames(path: Path) -> list[Place]:
+    places = []
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            columns = line.rstrip("\n").split("\t")
+            try:
+                places.append(
+                    Place(
+                        name=columns[1],
+                        latitude=float(columns[4]),
+                        longitude=float(columns[5]),
+                        # GeoNames 要素代码，如 PPL（居民点）、PPLX（城区）
+                        category=columns[7] or None,
+                    )
+                )
+            except (IndexError, ValueError):
+                continue
+    return places
+
+
+def load_geocoder(path: Path) -> Geocoder:
+    """Load a places file and index it (blocking)."""
+    places = _read_csv(path) if path.suffix.lower() == ".csv" else _read_geonames(path)
+    _LOGGER.debug("Loaded %d places from %s", len(places), path)
+    return Geocoder(places)
+
+
+async def async_get_geocoder(hass: HomeAssistant, filename: str) -> Geocoder | None:
+    """Return the shared geocoder of a places file, loading it if needed."""
+    path = Path(hass.config.path(filename))
+    geocoders: dict[Path, Geocoder] = hass.data.setdefault(DATA_GEOCODERS, {})
+    if (geocoder := geocoders.get(path)) is None:
+        try:
+            geocoder = await hass.async_add_executor_job(load_geocoder, path)
+        except OSError as err:
+            _LOGGER.warning("Cannot read places file %s: %s", path, err)
+            return None
+        geocoders[path] = geocoder
+    return geocoder
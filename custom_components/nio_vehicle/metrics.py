@@ -0,0 +1,170 @@
+"""Poll timing instrumentation for NIO Vehicle."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from statistics import quantiles
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from .const import METRICS_WINDOW
+
+PHASES = ("connect", "ttfb", "read", "decode", "dispatch", "total")
+
+
+class RequestTiming:
+    """Timings of a single status request, filled in by the trace hooks."""
+
+    __slots__ = ("start", "connect", "ttfb", "read", "decode", "size")
+
+    def __init__(self) -> None:
+        """Initialize the timing."""
+        self.start = time.perf_counter()
+        self.connect = 0.0
+        self.ttfb: float | None = None
+        self.read: float | None = None
+        self.decode: float | None = None
+        self.size: int | None = None
+
+
+async def _on_request_start(
+    session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+) -> None:
+    if (timing := ctx.trace_request_ctx) is not None:
+        timing.start = time.perf_counter()
+
+
+async def _on_connection_create_start(
+    session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+) -> None:
+    if ctx.trace_request_ctx is not None:
+        ctx.connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(
+    session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+) -> None:
+    if (timing := ctx.trace_request_ctx) is not None:
+        timing.connect = time.perf_counter() - ctx.connect_start
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+) -> None:
+    # 响应头到达时触发，近似首字节时间
+    if (timing := ctx.trace_request_ctx) is not None:
+        timing.ttfb = time.perf_counter() - timing.start - timing.connect
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Return the trace config that fills in RequestTiming objects.
+
+    The hooks return immediately for requests made without a timing
+    object, so tracing costs next to nothing while metrics are disabled.
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+class RollingHistogram:
+    """Fixed-size window of the most recent values."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._values: deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        """Add a value."""
+        self._values.append(value)
+
+    def _cuts(self) -> list[float]:
+        """Return the 99 percentile cut points of a non-empty window."""
+        if len(self._values) == 1:
+            return [self._values[0]] * 99
+        # inclusive：窗口视为全部样本，分位数不会超出最小/最大值
+        return quantiles(self._values, n=100, method="inclusive")
+
+    def percentile(self, percent: int) -> float | None:
+        """Return a percentile of the window."""
+        if not self._values:
+            return None
+        return self._cuts()[percent - 1]
+
+    def as_dict(self, scale: float = 1.0) -> dict[str, float | int | None]:
+        """Return a summary of the window."""
+        if not self._values:
+            return {"count": 0}
+        cuts = self._cuts()
+        return {
+            "count": len(self._values),
+            "p50": round(cuts[49] * scale, 2),
+            "p95": round(cuts[94] * scale, 2),
+            "max": round(max(self._values) * scale, 2),
+        }
+
+
+class PollMetrics:
+    """Rolling statistics of the polls of one vehicle."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.phases = {phase: RollingHistogram() for phase in PHASES}
+        self.payload = RollingHistogram()
+        self.requests = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+
+    def record_request(self, timing: RequestTiming, attempt: int) -> None:
+        """Record the timings of one request."""
+        self.requests += 1
+        if attempt:
+            self.retries += 1
+        self.phases["connect"].add(timing.connect)
+        for phase in ("ttfb", "read", "decode"):
+            if (value := getattr(timing, phase)) is not None:
+                self.phases[phase].add(value)
+        if timing.size is not None:
+            self.payload.add(timing.size)
+
+    def record_poll(self, duration: float, success: bool) -> None:
+        """Record the outcome of one poll including retries."""
+        self.phases["total"].add(duration)
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+
+    def record_dispatch(self, duration: float) -> None:
+        """Record the time spent notifying entities."""
+        self.phases["dispatch"].add(duration)
+
+    @property
+    def success_ratio(self) -> float | None:
+        """Return the share of successful polls in percent."""
+        if not (polls := self.successes + self.failures):
+            return None
+        return round(self.successes / polls * 100, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary, with durations in ms."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_ratio": self.success_ratio,
+            "payload_bytes": self.payload.as_dict(),
+            "phases_ms": {
+                phase: histogram.as_dict(1000)
+                for phase, histogram in self.phases.items()
+            },
+        }
@@ -0,0 +1,271 @@
+"""Parsed vehicle status snapshots for NIO Vehicle."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, fields
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any
+
+from .const import status_key
+
+
+def is_closed(value: int | None) -> bool | None:
+    """Return True if a lock or *_ajar status means locked or closed."""
+    # vehicle_lock_status 和 *_ajar_status：1 表示锁定/关闭
+    return None if value is None else value == 1
+
+
+def is_open(value: int | None) -> bool | None:
+    """Return True if a lock or *_ajar status means unlocked or open."""
+    return None if value is None else value != 1
+
+
+def is_charging(value: int | None) -> bool | None:
+    """Return True if a charge_state means the vehicle is charging."""
+    # charge_state: 0 表示未充电，1-4 表示正在充电的不同状态
+    return None if value is None else value > 0
+
+
+@dataclass(slots=True, frozen=True)
+class SocStatus:
+    """Battery and charging status."""
+
+    soc: float | None = None
+    remaining_range: float | None = None
+    remaining_actual_range: float | None = None
+    charge_state: int | None = None
+
+    @property
+    def charging(self) -> bool | None:
+        """Return True if the vehicle is charging, None if unknown."""
+        return is_charging(self.charge_state)
+
+
+@dataclass(slots=True, frozen=True)
+class DoorStatus:
+    """Door, lock and charge port status."""
+
+    # 1 表示锁定/关闭
+    vehicle_lock_status: int | None = None
+    door_ajar_front_left_status: int | None = None
+    door_ajar_front_right_status: int | None = None
+    door_ajar_rear_left_status: int | None = None
+    door_ajar_rear_right_status: int | None = None
+    tailgate_ajar_status: int | None = None
+    second_charge_port_ajar_status: int | None = None
+
+    @property
+    def locked(self) -> bool | None:
+        """Return True if the vehicle is locked, None if unknown."""
+        return is_closed(self.vehicle_lock_status)
+
+    @property
+    def charge_port_open(self) -> bool | None:
+        """Return True if the charge port is open, None if unknown."""
+        return is_open(self.second_charge_port_ajar_status)
+
+
+@dataclass(slots=True, frozen=True)
+class TyreStatus:
+    """Tyre pressures in bar."""
+
+    front_left_wheel_press_bar: float | None = None
+    front_right_wheel_press_bar: float | None = None
+    rear_left_wheel_press_bar: float | None = None
+    rear_right_wheel_press_bar: float | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class HvacStatus:
+    """Climate status."""
+
+    outside_temperature: float | None = None
+    inside_temperature: float | None = None
+    # 1 表示开启
+    air_con_on: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class WindowStatus:
+    """Window and sunroof status."""
+
+    # 1 表示关闭
+    window_ajar_front_left_status: int | None = None
+    window_ajar_front_right_status: int | None = None
+    window_ajar_rear_left_status: int | None = None
+    window_ajar_rear_right_status: int | None = None
+    sun_roof_ajar_status: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class LightStatus:
+    """Exterior light status."""
+
+    # 1 表示开启
+    low_beam_on: int | None = None
+    high_beam_on: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class HeatingStatus:
+    """Seat and steering wheel heating status."""
+
+    # 1 表示开启
+    steer_wheel_heat_sts: int | None = None
+    # 加热档位，0 表示关闭
+    front_left_seat_heat_level: int | None = None
+    front_right_seat_heat_level: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class MaintainStatus:
+    """Maintenance schedule."""
+
+    remaining_mileage: float | None = None
+    remaining_days: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class ExteriorStatus:
+    """Exterior status."""
+
+    mileage: float | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class PositionStatus:
+    """GPS position."""
+
+    latitude: float | None = None
+    longitude: float | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class ConnectionStatus:
+    """Vehicle connectivity."""
+
+    connection: int | None = None
+
+
+# 请求字段组 -> 解析模型，未列出的字段组不会保留
+GROUP_MODELS: dict[str, type] = {
+    "soc": SocStatus,
+    "door": DoorStatus,
+    "tyre": TyreStatus,
+    "hvac": HvacStatus,
+    "exterior": ExteriorStatus,
+    "position": PositionStatus,
+    "connection": ConnectionStatus,
+    "window": WindowStatus,
+    "light": LightStatus,
+    "heating": HeatingStatus,
+    "maintain": MaintainStatus,
+}
+
+_MODEL_FIELDS = {
+    field: (model, status_key(field), tuple(f.name for f in fields(model)))
+    for field, model in GROUP_MODELS.items()
+}
+
+
+@dataclass(slots=True, frozen=True)
+class VehicleSnapshot:
+    """Status of a vehicle as returned by one status request.
+
+    Each attribute named after a field group holds the parsed group, or
+    None if the group was not part of the response. Snapshots are
+    immutable: every update builds a new one, so consumers can detect
+    changes by identity.
+    """
+
+    fetched_at: datetime
+    # True 表示快照来自本地缓存，而非本次运行中的实时请求
+    restored: bool = False
+    soc: SocStatus | None = None
+    door: DoorStatus | None = None
+    tyre: TyreStatus | None = None
+    hvac: HvacStatus | None = None
+    exterior: ExteriorStatus | None = None
+    position: PositionStatus | None = None
+    connection: ConnectionStatus | None = None
+    window: WindowStatus | None = None
+    light: LightStatus | None = None
+    heating: HeatingStatus | None = None
+    maintain: MaintainStatus | None = None
+
+    @classmethod
+    def from_status(cls, status: dict[str, Any], fetched_at: datetime) -> VehicleSnapshot:
+        """Build a snapshot from the "data" object of a status response."""
+        groups = {}
+        for field, (model, key, names) in _MODEL_FIELDS.items():
+            raw = status.get(key)
+            if isinstance(raw, dict):
+                groups[field] = model(*map(raw.get, names))
+        return cls(fetched_at, **groups)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> VehicleSnapshot:
+        """Restore a snapshot saved with as_dict."""
+        groups = {}
+        for field, (model, _, names) in _MODEL_FIELDS.items():
+            raw = data.get(field)
+            if isinstance(raw, dict):
+                groups[field] = model(*map(raw.get, names))
+        return cls(datetime.fromisoformat(data["fetched_at"]), restored=True, **groups)
+
+    def merge_status(
+        self, status: dict[str, Any], fetched_at: datetime
+    ) -> VehicleSnapshot:
+        """Return a copy of the snapshot updated with a partial status.
+
+        Used for pushed deltas: groups missing from the status are carried
+        over, and attributes missing from a group keep their current value.
+        """
+        groups = {}
+        for field, (model, key, names) in _MODEL_FIELDS.items():
+            current = getattr(self, field)
+            raw = status.get(key)
+            if isinstance(raw, dict):
+                current = model(
+                    *(raw.get(name, getattr(current, name, None)) for name in names)
+                )
+            groups[field] = current
+        return VehicleSnapshot(fetched_at, **groups)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation of the snapshot."""
+        data: dict[str, Any] = {"fetched_at": self.fetched_at.isoformat()}
+        for field, (_, _, names) in _MODEL_FIELDS.items():
+            if (group := getattr(self, field)) is not None:
+                data[field] = {name: getattr(group, name) for name in names}
+        return data
+
+    def group(self, field: str) -> Any:
+        """Return the parsed group of a field, or None if it is missing."""
+        return getattr(self, field, None) if field in GROUP_MODELS else None
+
+    def has_groups(self, groups: tuple[str, ...]) -> bool:
+        """Return True if all given field groups are present."""
+        return all(self.group(field) is not None for field in groups)
+
+
+@lru_cache(maxsize=None)
+def compile_path(path: str) -> Callable[[VehicleSnapshot], Any]:
+    """Compile a "group.attribute" path into an accessor of snapshots.
+
+    The accessor returns None if the group is missing. Accessors are cached,
+    so every vehicle shares one function per path.
+    """
+    field, attribute = path.split(".")
+    if field not in GROUP_MODELS:
+        raise ValueError(f"Unknown status group: {field}")
+    get_group = attrgetter(field)
+    get_attribute = attrgetter(attribute)
+
+    def accessor(snapshot: VehicleSnapshot) -> Any:
+        group = get_group(snapshot)
+        return None if group is None else get_attribute(group)
+
+    return accessor
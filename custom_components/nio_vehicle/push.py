@@ -0,0 +1,406 @@
+"""Push update transports for NIO Vehicle.
+
+A transport delivers status updates as soon as the vehicle reports them,
+in the shape of the "data" object of a status response. Messages may
+contain only the groups, or only the attributes, that changed. They can
+also be wrapped as {"vehicle_id": ..., "data": {...}} when several
+vehicles share one connection.
+
+The replay transport feeds a traffic recording into the coordinator
+instead, with the recorded times, at real or accelerated speed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    CONF_PUSH_TOPIC,
+    CONF_PUSH_TRANSPORT,
+    CONF_PUSH_URL,
+    CONF_REPLAY_PATH,
+    CONF_REPLAY_SPEED,
+    CONF_VEHICLE_ID,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_PUSH_TOPIC,
+    PUSH_HEARTBEAT,
+    PUSH_MQTT,
+    PUSH_NONE,
+    PUSH_RECONNECT_MAX,
+    PUSH_RECONNECT_MIN,
+    PUSH_REPLAY,
+    PUSH_STREAM,
+)
+from .traffic import TrafficRecord, read_recording
+
+_LOGGER = logging.getLogger(__name__)
+
+StatusCallback = Callable[[dict[str, Any], datetime | None], None]
+ConnectionCallback = Callable[[bool], None]
+
+
+def parse_message(payload: str | bytes, vehicle_id: str) -> dict[str, Any] | None:
+    """Return the status groups of a pushed message for a vehicle."""
+    try:
+        message = json_loads(payload)
+    except ValueError:
+        _LOGGER.debug("Ignoring invalid push message for %s: %s", vehicle_id, payload)
+        return None
+    if isinstance(message, dict) and "data" in message:
+        if message.get("vehicle_id", vehicle_id) != vehicle_id:
+            return None
+        message = message["data"]
+    return message if isinstance(message, dict) else None
+
+
+class PushTransport(ABC):
+    """Base class of push update sources."""
+
+    name: str
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        vehicle_id: str,
+        on_status: StatusCallback,
+        on_connection: ConnectionCallback,
+    ) -> None:
+        """Initialize the transport."""
+        self.hass = hass
+        self.vehicle_id = vehicle_id
+        self._on_status = on_status
+        self._on_connection = on_connection
+        self._stopped = False
+        self.connected = False
+        self.messages = 0
+        self.last_message_at: datetime | None = None
+
+    @abstractmethod
+    async def async_start(self) -> None:
+        """Start receiving updates."""
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop receiving updates."""
+        self._stopped = True
+        # 主动停止时不通知协调器，避免卸载期间触发轮询
+        self.connected = False
+
+    @callback
+    def _async_set_connected(self, connected: bool) -> None:
+        if connected == self.connected or self._stopped:
+            return
+        self.connected = connected
+        _LOGGER.debug(
+            "Push transport %s for %s %s",
+            self.name,
+            self.vehicle_id,
+            "connected" if connected else "disconnected",
+        )
+        self._on_connection(connected)
+
+    @callback
+    def _async_handle_payload(self, payload: str | bytes) -> None:
+        if self._stopped:
+            return
+        try:
+            if (status := parse_message(payload, self.vehicle_id)) is not None:
+                self._async_handle_status(status)
+        except (KeyError, TypeError, ValueError) as err:
+            # 单条畸形消息不应中断推送连接
+            _LOGGER.warning(
+                "Ignoring malformed push message for %s: %r", self.vehicle_id, err
+            )
+
+    @callback
+    def _async_handle_status(
+        self, status: dict[str, Any], fetched_at: datetime | None = None
+    ) -> None:
+        self.messages += 1
+        self.last_message_at = dt_util.utcnow()
+        self._on_status(status, fetched_at)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the transport for diagnostics."""
+        return {
+            "transport": self.name,
+            "connected": self.connected,
+            "messages": self.messages,
+            "last_message_at": (
+                self.last_message_at.isoformat() if self.last_message_at else None
+            ),
+        }
+
+
+class MQTTTransport(PushTransport):
+    """Receive updates from an MQTT bridge through the MQTT integration."""
+
+    name = PUSH_MQTT
+
+    def __init__(self, hass, vehicle_id, on_status, on_connection, topic: str) -> None:
+        """Initialize the transport."""
+        super().__init__(hass, vehicle_id, on_status, on_connection)
+        self.topic = topic
+        self._unsubscribers: list[CALLBACK_TYPE] = []
+
+    async def async_start(self) -> None:
+        """Subscribe to the status topic."""
+        # MQTT 集成是可选的，只有选择该推送方式时才导入
+        from homeassistant.components import mqtt
+        from homeassistant.components.mqtt.const import (
+            MQTT_CONNECTED,
+            MQTT_DISCONNECTED,
+        )
+
+        if not await mqtt.async_wait_for_mqtt_client(self.hass):
+            _LOGGER.warning(
+                "MQTT is not available, push updates for %s are disabled",
+                self.vehicle_id,
+            )
+            return
+        unsubscribe = await mqtt.async_subscribe(
+            self.hass, self.topic, self._async_message_received
+        )
+        if self._stopped:
+            unsubscribe()
+            return
+        self._unsubscribers = [
+            unsubscribe,
+            async_dispatcher_connect(
+                self.hass, MQTT_CONNECTED, self._async_broker_connected
+            ),
+            async_dispatcher_connect(
+                self.hass, MQTT_DISCONNECTED, self._async_broker_disconnected
+            ),
+        ]
+        self._async_set_connected(mqtt.is_connected(self.hass))
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe from the status topic."""
+        super().async_stop()
+        while self._unsubscribers:
+            self._unsubscribers.pop()()
+
+    @callback
+    def _async_broker_connected(self) -> None:
+        self._async_set_connected(True)
+
+    @callback
+    def _async_broker_disconnected(self) -> None:
+        self._async_set_connected(False)
+
+    @callback
+    def _async_message_received(self, msg: Any) -> None:
+        self._async_handle_payload(msg.payload)
+
+
+class StreamTransport(PushTransport):
+    """Receive updates from a websocket (ws://) or server-sent events stream."""
+
+    name = PUSH_STREAM
+
+    def __init__(self, hass, vehicle_id, on_status, on_connection, url: str) -> None:
+        """Initialize the transport."""
+        super().__init__(hass, vehicle_id, on_status, on_connection)
+        self.url = url
+        self._session = async_get_clientsession(hass)
+        self._task: asyncio.Task | None = None
+
+    async def async_start(self) -> None:
+        """Start the connection loop."""
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), f"nio_vehicle_push_{self.vehicle_id}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Close the stream."""
+        super().async_stop()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_run(self) -> None:
+        delay = PUSH_RECONNECT_MIN
+        while not self._stopped:
+            try:
+                if self.url.startswith(("ws://", "wss://")):
+                    await self._async_read_websocket()
+                else:
+                    await self._async_read_events()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Push stream for %s failed: %s", self.vehicle_id, err)
+            except Exception:  # pylint: disable=broad-except
+                # 未预料的错误也按断线处理并重连，否则推送会静默停止
+                _LOGGER.exception(
+                    "Unexpected error in push stream for %s", self.vehicle_id
+                )
+            if self.connected:
+                delay = PUSH_RECONNECT_MIN
+            self._async_set_connected(False)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, PUSH_RECONNECT_MAX)
+
+    async def _async_read_websocket(self) -> None:
+        async with self._session.ws_connect(self.url, heartbeat=PUSH_HEARTBEAT) as ws:
+            self._async_set_connected(True)
+            async for msg in ws:
+                if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    self._async_handle_payload(msg.data)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    break
+
+    async def _async_read_events(self) -> None:
+        async with self._session.get(
+            self.url,
+            headers={"Accept": "text/event-stream"},
+            # 服务器应定期发送注释行作为心跳
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=PUSH_HEARTBEAT * 3),
+        ) as response:
+            response.raise_for_status()
+            self._async_set_connected(True)
+            # None 表示当前事件含有无法解码的行，整条丢弃
+            data: list[str] | None = []
+            async for raw in response.content:
+                try:
+                    line = raw.decode().rstrip("\r\n")
+                except UnicodeDecodeError:
+                    _LOGGER.debug(
+                        "Ignoring undecodable push event for %s", self.vehicle_id
+                    )
+                    data = None
+                    continue
+                if not line:
+                    if data:
+                        self._async_handle_payload("\n".join(data))
+                    data = []
+                elif line.startswith("data:") and data is not None:
+                    data.append(line[6:] if line.startswith("data: ") else line[5:])
+
+
+class ReplayTransport(PushTransport):
+    """Feed a traffic recording into the coordinator.
+
+    A speed of 1 replays in real time, higher values accelerate and 0
+    replays as fast as possible. The recorded times are kept, so trips,
+    charging sessions and statistics come out as recorded.
+    """
+
+    name = PUSH_REPLAY
+
+    def __init__(
+        self, hass, vehicle_id, on_status, on_connection, path: Path, speed: float
+    ) -> None:
+        """Initialize the transport."""
+        super().__init__(hass, vehicle_id, on_status, on_connection)
+        self.path = path
+        self.speed = speed
+        self.records = 0
+        self.finished = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def async_start(self) -> None:
+        """Start the replay."""
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), f"nio_vehicle_replay_{self.vehicle_id}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the replay."""
+        super().async_stop()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_run(self) -> None:
+        try:
+            records: list[TrafficRecord] = await self.hass.async_add_executor_job(
+                lambda: list(read_recording(self.path))
+            )
+        except (OSError, EOFError, zlib.error) as err:
+            _LOGGER.warning("Cannot read recording %s: %s", self.path, err)
+            self.finished.set()
+            return
+        self.records = len(records)
+        _LOGGER.debug("Replaying %d records for %s", self.records, self.vehicle_id)
+        self._async_set_connected(True)
+        previous: float | None = None
+        for record in records:
+            if self.speed > 0 and previous is not None:
+                await asyncio.sleep(max(record.time - previous, 0) / self.speed)
+            else:
+                # 让出事件循环，使实体能处理每一条更新
+                await asyncio.sleep(0)
+            previous = record.time
+            if self._stopped:
+                return
+            self._async_handle_status(
+                record.data, dt_util.utc_from_timestamp(record.time)
+            )
+        self.finished.set()
+        # 回放结束后恢复正常轮询
+        self._async_set_connected(False)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the transport for diagnostics."""
+        return {
+            **super().as_dict(),
+            "records": self.records,
+            "finished": self.finished.is_set(),
+        }
+
+
+def async_create_transport(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    on_status: StatusCallback,
+    on_connection: ConnectionCallback,
+) -> PushTransport | None:
+    """Create the push transport selected in the options of an entry."""
+    vehicle_id = entry.data[CONF_VEHICLE_ID]
+    transport = entry.options.get(CONF_PUSH_TRANSPORT, PUSH_NONE)
+    if transport == PUSH_MQTT:
+        topic = entry.options.get(CONF_PUSH_TOPIC) or DEFAULT_PUSH_TOPIC
+        return MQTTTransport(
+            hass,
+            vehicle_id,
+            on_status,
+            on_connection,
+            topic.replace("{vehicle_id}", vehicle_id),
+        )
+    if transport == PUSH_STREAM and (url := entry.options.get(CONF_PUSH_URL)):
+        return StreamTransport(
+            hass,
+            vehicle_id,
+            on_status,
+            on_connection,
+            url.replace("{vehicle_id}", vehicle_id),
+        )
+    if transport == PUSH_REPLAY and (path := entry.options.get(CONF_REPLAY_PATH)):
+        return ReplayTransport(
+            hass,
+            vehicle_id,
+            on_status,
+            on_connection,
+            Path(hass.config.path(path)),
+            entry.options.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED),
+        )
+    return None
@@ -0,0 +1,172 @@
+"""Retry and circuit breaker policy for NIO API requests."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .api import (
+    NIOApiAuthError,
+    NIOApiCircuitOpenError,
+    NIOApiConnectionError,
+    NIOApiError,
+    NIOApiRateLimitError,
+)
+from .const import (
+    API_RETRIES,
+    API_RETRY_DELAY,
+    BREAKER_BASE_BACKOFF,
+    BREAKER_MAX_BACKOFF,
+    BREAKER_THRESHOLD,
+    CONF_VEHICLE_ID,
+    DATA_BREAKERS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_AUTH_FAILED = "auth_failed"
+
+
+class CircuitBreaker:
+    """Suspend requests of a vehicle after repeated failures.
+
+    After the failure threshold is reached the breaker opens for an
+    exponentially growing backoff. Once it elapses a single probe request
+    is let through; success closes the breaker, failure re-opens it.
+    Rejected credentials block all requests until they are replaced.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        base_backoff: float = BREAKER_BASE_BACKOFF,
+        max_backoff: float = BREAKER_MAX_BACKOFF,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.trips = 0
+        self._open_until = 0.0
+        self.auth_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        """Return the state of the breaker."""
+        if self.auth_error is not None:
+            return STATE_AUTH_FAILED
+        return STATE_OPEN if self.retry_in() > 0 else STATE_CLOSED
+
+    def retry_in(self) -> float:
+        """Return the seconds until requests are allowed again."""
+        return max(self._open_until - time.monotonic(), 0.0)
+
+    def before_request(self) -> None:
+        """Raise if the breaker is open, otherwise allow the request."""
+        if self.auth_error is not None:
+            # 凭据已被拒绝，再次请求必然失败
+            raise NIOApiAuthError(self.auth_error)
+        if (retry_in := self.retry_in()) > 0:
+            raise NIOApiCircuitOpenError(retry_in)
+        if self.trips:
+            # 半开状态：只放行一个探测请求，其余请求等待探测结果
+            self._open_until = time.monotonic() + self._backoff()
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        if self.trips:
+            _LOGGER.info("NIO API recovered, resuming requests")
+        self.failures = 0
+        self.trips = 0
+        self._open_until = 0.0
+        self.auth_error = None
+
+    def record_auth_failure(self, result_code: str | None) -> None:
+        """Block all requests after the credentials were rejected."""
+        self.auth_error = result_code
+        _LOGGER.warning(
+            "NIO API rejected the credentials (%s), suspending requests until "
+            "they are updated",
+            result_code,
+        )
+
+    def record_failure(self, retry_after: float | None = None, trip: bool = False) -> None:
+        """Record a failed request and open the breaker if needed."""
+        self.failures += 1
+        if not trip and not self.trips and self.failures < self.threshold:
+            return
+        self.trips += 1
+        backoff = max(self._backoff(), retry_after or 0.0)
+        self._open_until = time.monotonic() + backoff
+        _LOGGER.warning(
+            "NIO API failed %d times, suspending requests for %.0fs",
+            self.failures,
+            backoff,
+        )
+
+    def _backoff(self) -> float:
+        backoff = min(self.base_backoff * 2 ** max(self.trips - 1, 0), self.max_backoff)
+        return backoff * random.uniform(0.8, 1.2)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state as a dictionary."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "retry_in": round(self.retry_in(), 1),
+        }
+
+
+@callback
+def async_get_circuit_breaker(
+    hass: HomeAssistant, data: Mapping[str, Any]
+) -> CircuitBreaker:
+    """Return the circuit breaker of the vehicle of a config entry."""
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(DATA_BREAKERS, {})
+    # 按车辆区分：签名和时间戳是每辆车单独抓包的，一辆车被拒绝不代表其他车辆也失效
+    vehicle_id = data[CONF_VEHICLE_ID]
+    if (breaker := breakers.get(vehicle_id)) is None:
+        breaker = breakers[vehicle_id] = CircuitBreaker()
+    return breaker
+
+
+async def async_call_with_retry(
+    breaker: CircuitBreaker, request: Callable[[], Awaitable[_T]]
+) -> _T:
+    """Run a request with bounded retries guarded by a circuit breaker."""
+    breaker.before_request()
+    attempt = 0
+    while True:
+        try:
+            result = await request()
+        except NIOApiConnectionError as err:
+            if err.transient and attempt < API_RETRIES:
+                attempt += 1
+                delay = API_RETRY_DELAY * 2 ** (attempt - 1) * random.uniform(1, 2)
+                _LOGGER.debug("Retrying in %.1fs after error: %s", delay, err)
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_failure()
+            raise
+        except NIOApiAuthError as err:
+            breaker.record_auth_failure(err.result_code)
+            raise
+        except NIOApiRateLimitError as err:
+            breaker.record_failure(err.retry_after, trip=True)
+            raise
+        except NIOApiError:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
@@ -0,0 +1,121 @@
+"""Adaptive polling scheduler for NIO Vehicle."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from .const import (
+    CONNECTION_ONLINE,
+    FAST_CHARGE_SOC_RATE,
+    IDLE_SLEEP_AFTER,
+    INTERVAL_ASLEEP,
+    INTERVAL_AWAKE,
+    INTERVAL_CHARGING,
+    INTERVAL_DRIVING,
+    INTERVAL_FAST_CHARGING,
+    INTERVAL_PARKED,
+    MOVE_THRESHOLD_M,
+)
+from .model import PositionStatus, SocStatus, VehicleSnapshot
+from .util import distance_m
+
+STATE_DRIVING = "driving"
+STATE_FAST_CHARGING = "fast_charging"
+STATE_CHARGING = "charging"
+STATE_AWAKE = "awake"
+STATE_PARKED = "parked"
+STATE_ASLEEP = "asleep"
+
+_STATE_INTERVALS = {
+    STATE_DRIVING: INTERVAL_DRIVING,
+    STATE_FAST_CHARGING: INTERVAL_FAST_CHARGING,
+    STATE_CHARGING: INTERVAL_CHARGING,
+    STATE_AWAKE: INTERVAL_AWAKE,
+    STATE_PARKED: INTERVAL_PARKED,
+    STATE_ASLEEP: INTERVAL_ASLEEP,
+}
+
+
+class AdaptiveScheduler:
+    """Pick the next polling interval from the latest vehicle status.
+
+    The vehicle is classified into one of a few activity states and each
+    state maps to a polling interval, clamped to the configured bounds.
+    """
+
+    def __init__(self, min_interval: timedelta, max_interval: timedelta) -> None:
+        """Initialize the scheduler."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.state: str | None = None
+        self._last_time: datetime | None = None
+        self._last_mileage: float | None = None
+        self._last_soc: float | None = None
+        self._last_position: tuple[float, float] | None = None
+        self._idle_since: datetime | None = None
+
+    def next_interval(
+        self, snapshot: VehicleSnapshot, now: datetime | None = None
+    ) -> timedelta:
+        """Classify the snapshot and return the interval until the next poll."""
+        now = now or snapshot.fetched_at
+        self.state = self._classify(snapshot, now)
+        return min(max(_STATE_INTERVALS[self.state], self.min_interval), self.max_interval)
+
+    def _classify(self, snapshot: VehicleSnapshot, now: datetime) -> str:
+        soc_status = snapshot.soc or SocStatus()
+        position_status = snapshot.position or PositionStatus()
+
+        mileage = snapshot.exterior.mileage if snapshot.exterior else None
+        soc = soc_status.soc
+        latitude = position_status.latitude
+        longitude = position_status.longitude
+        position = (
+            (latitude, longitude)
+            if latitude is not None and longitude is not None
+            else None
+        )
+
+        moved = False
+        if self._last_mileage is not None and mileage is not None:
+            moved = mileage > self._last_mileage
+        if not moved and self._last_position is not None and position is not None:
+            moved = distance_m(*self._last_position, *position) >= MOVE_THRESHOLD_M
+
+        soc_rate = 0.0
+        if (
+            self._last_time is not None
+            and self._last_soc is not None
+            and soc is not None
+            and now > self._last_time
+        ):
+            minutes = (now - self._last_time).total_seconds() / 60
+            soc_rate = (soc - self._last_soc) / minutes
+
+        self._last_time = now
+        self._last_mileage = mileage if mileage is not None else self._last_mileage
+        self._last_soc = soc if soc is not None else self._last_soc
+        self._last_position = position or self._last_position
+
+        locked = snapshot.door is not None and snapshot.door.locked is True
+        online = (
+            snapshot.connection is None
+            or snapshot.connection.connection in (None, CONNECTION_ONLINE)
+        )
+
+        if moved:
+            self._idle_since = None
+            return STATE_DRIVING
+        if soc_status.charging:
+            self._idle_since = None
+            if soc_rate >= FAST_CHARGE_SOC_RATE:
+                return STATE_FAST_CHARGING
+            return STATE_CHARGING
+        if not locked:
+            self._idle_since = None
+            return STATE_AWAKE
+
+        if self._idle_since is None:
+            self._idle_since = now
+        if not online or now - self._idle_since >= IDLE_SLEEP_AFTER:
+            return STATE_ASLEEP
+        return STATE_PARKED
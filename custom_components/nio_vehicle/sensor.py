@@ -1,146 +1,570 @@
 """Support for NIO Vehicle sensors."""
 from __future__ import annotations
 
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import voluptuous as vol
+
 from homeassistant.components.sensor import (
     SensorEntity,
+    SensorEntityDescription,
     SensorDeviceClass,
     SensorStateClass,
 )
 from homeassistant.const import (
+    EntityCategory,
     PERCENTAGE,
+    UnitOfEnergy,
+    UnitOfInformation,
     UnitOfLength,
+    UnitOfPower,
     UnitOfPressure,
+    UnitOfTime,
     UnitOfTemperature,  # 使用新的温度单位常量
 )
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_platform, entity_registry as er
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 
 from . import DOMAIN, NIOVehicleDataUpdateCoordinator, NIOVehicleEntity
+from .const import (
+    ATTR_DEADBAND,
+    ATTR_HEARTBEAT,
+    ATTR_HYSTERESIS,
+    ATTR_MIN_INTERVAL,
+    FILTER_DEFAULTS,
+    SERVICE_SET_FILTER,
+    TOPIC_CHARGING,
+    TOPIC_EFFICIENCY,
+    TOPIC_PLACE,
+    TOPIC_TRIP,
+    TOPIC_TYRE_LEAK,
+    TYRE_POSITIONS,
+)
+from .filters import PublishFilter
+from .model import compile_path
+
+SET_FILTER_SCHEMA = {
+    vol.Optional(ATTR_DEADBAND): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(ATTR_HYSTERESIS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(ATTR_MIN_INTERVAL): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional(ATTR_HEARTBEAT): vol.All(vol.Coerce(int), vol.Range(min=60)),
+}
+
+
+@dataclass
+class NIOSensorEntityDescription(SensorEntityDescription):
+    """Describes a NIO Vehicle sensor.
+
+    Sensors read either a "group.attribute" path of the status snapshot or
+    a value function of the coordinator for derived data.
+    """
+
+    path: str | None = None
+    value_fn: Callable[[NIOVehicleDataUpdateCoordinator], Any] | None = None
+    attr_fn: Callable[[NIOVehicleDataUpdateCoordinator], dict[str, Any] | None] | None = None
+    available_fn: Callable[[NIOVehicleDataUpdateCoordinator], bool] | None = None
+    exists_fn: Callable[[NIOVehicleDataUpdateCoordinator], bool] | None = None
+    # entity_id 后缀，默认与 key 相同
+    object_id: str | None = None
+    topics: tuple[str, ...] = ()
+
+
+def _last_trip(attribute: str) -> Callable[[NIOVehicleDataUpdateCoordinator], Any]:
+    def value(coordinator: NIOVehicleDataUpdateCoordinator) -> Any:
+        trip = coordinator.trips.last_trip
+        return getattr(trip, attribute) if trip else None
+
+    return value
+
+
+def _efficiency(attribute: str) -> Callable[[NIOVehicleDataUpdateCoordinator], Any]:
+    def value(coordinator: NIOVehicleDataUpdateCoordinator) -> Any:
+        stats = coordinator.efficiency_stats
+        return getattr(stats, attribute) if stats else None
+
+    return value
+
+
+def _efficiency_attributes(
+    coordinator: NIOVehicleDataUpdateCoordinator,
+) -> dict | None:
+    stats = coordinator.efficiency_stats
+    if stats is None:
+        return None
+    return {
+        "distance": stats.distance,
+        "samples": stats.samples,
+        "by_temperature": stats.by_temperature,
+    }
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+def _median_poll_ms(coordinator: NIOVehicleDataUpdateCoordinator) -> float | None:
+    value = coordinator.metrics.phases["total"].percentile(50)
+    return round(value * 1000, 1) if value is not None else None
+
+
+def _credential_age(coordinator: NIOVehicleDataUpdateCoordinator) -> float | None:
+    age = coordinator.credentials.age(dt_util.utcnow())
+    return round(age.total_seconds() / 86400, 1) if age is not None else None
+
+
+def _place_attributes(coordinator: NIOVehicleDataUpdateCoordinator) -> dict | None:
+    place = coordinator.place
+    if place is None:
+        return None
+    return {
+        "category": place.category,
+        "distance": place.distance,
+        "geofences": list(place.geofences),
+    }
+
+
+def _metrics_enabled(coordinator: NIOVehicleDataUpdateCoordinator) -> bool:
+    return coordinator.metrics is not None
+
+
+SENSORS: tuple[NIOSensorEntityDescription, ...] = (
+    NIOSensorEntityDescription(
+        key="battery",
+        name="电池电量 Battery Level",
+        path="soc.soc",
+        device_class=SensorDeviceClass.BATTERY,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+    ),
+    NIOSensorEntityDescription(
+        key="range",
+        name="预估续航里程 Remaining Range",
+        path="soc.remaining_range",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+    ),
+    NIOSensorEntityDescription(
+        key="actual_range",
+        name="实际续航里程 Actual Range",
+        path="soc.remaining_actual_range",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+    ),
+    *(
+        NIOSensorEntityDescription(
+            key=f"tyre_pressure_{position}",
+            object_id=f"tyre_{position}",
+            name=f"{name_zh}轮胎压力 {name_en} Tyre",
+            path=f"tyre.{position}_wheel_press_bar",
+            device_class=SensorDeviceClass.PRESSURE,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfPressure.BAR,
+        )
+        for position, (name_zh, name_en) in TYRE_POSITIONS.items()
+    ),
+    NIOSensorEntityDescription(
+        key="tyre_leak_rate",
+        name="胎压下降速率 Tyre Leak Rate",
+        value_fn=lambda c: c.tyre_leaks.leak_rate,
+        attr_fn=lambda c: c.tyre_leaks.as_dict(),
+        topics=(TOPIC_TYRE_LEAK,),
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="bar/d",
+        suggested_display_precision=3,
+        icon="mdi:car-tire-alert",
+    ),
+    NIOSensorEntityDescription(
+        key="temperature",
+        name="车外温度 Outside Temperature",
+        path="hvac.outside_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+    ),
+    NIOSensorEntityDescription(
+        key="inside_temperature",
+        name="车内温度 Inside Temperature",
+        path="hvac.inside_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+    ),
+    NIOSensorEntityDescription(
+        key="mileage",
+        name="总里程 Total Mileage",
+        path="exterior.mileage",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+    ),
+    NIOSensorEntityDescription(
+        key="seat_heat_front_left",
+        name="主驾座椅加热档位 Driver Seat Heating Level",
+        path="heating.front_left_seat_heat_level",
+        icon="mdi:car-seat-heater",
+    ),
+    NIOSensorEntityDescription(
+        key="seat_heat_front_right",
+        name="副驾座椅加热档位 Passenger Seat Heating Level",
+        path="heating.front_right_seat_heat_level",
+        icon="mdi:car-seat-heater",
+    ),
+    NIOSensorEntityDescription(
+        key="maintenance_mileage",
+        name="距下次保养里程 Distance To Maintenance",
+        path="maintain.remaining_mileage",
+        device_class=SensorDeviceClass.DISTANCE,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        icon="mdi:car-wrench",
+    ),
+    NIOSensorEntityDescription(
+        key="maintenance_days",
+        name="距下次保养天数 Days To Maintenance",
+        path="maintain.remaining_days",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        icon="mdi:car-wrench",
+    ),
+    NIOSensorEntityDescription(
+        key="queue_delay",
+        name="请求排队延迟 Request Queue Delay",
+        value_fn=lambda c: c.fleet.stats(c.vehicle_id).get("last_queue_delay"),
+        attr_fn=lambda c: c.fleet.stats(c.vehicle_id),
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    NIOSensorEntityDescription(
+        key="last_trip_distance",
+        name="上次行程里程 Last Trip Distance",
+        value_fn=_last_trip("distance"),
+        attr_fn=lambda c: c.trips.last_trip.as_dict() if c.trips.last_trip else None,
+        topics=(TOPIC_TRIP,),
+        device_class=SensorDeviceClass.DISTANCE,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        icon="mdi:map-marker-distance",
+    ),
+    NIOSensorEntityDescription(
+        key="last_trip_duration",
+        name="上次行程时长 Last Trip Duration",
+        value_fn=_last_trip("duration"),
+        topics=(TOPIC_TRIP,),
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+    ),
+    NIOSensorEntityDescription(
+        key="last_trip_soc_used",
+        name="上次行程耗电 Last Trip Battery Used",
+        value_fn=_last_trip("soc_used"),
+        topics=(TOPIC_TRIP,),
+        native_unit_of_measurement=PERCENTAGE,
+        icon="mdi:battery-minus",
+    ),
+    NIOSensorEntityDescription(
+        key="consumption",
+        name="能耗 Consumption",
+        value_fn=_efficiency("consumption"),
+        attr_fn=_efficiency_attributes,
+        topics=(TOPIC_EFFICIENCY,),
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="%/100 km",
+        icon="mdi:leaf",
+    ),
+    NIOSensorEntityDescription(
+        key="distance_per_soc",
+        name="每 1% 电量里程 Distance per 1% SoC",
+        value_fn=_efficiency("distance_per_soc"),
+        topics=(TOPIC_EFFICIENCY,),
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="km/%",
+        icon="mdi:map-marker-distance",
+    ),
+    NIOSensorEntityDescription(
+        key="range_ratio",
+        name="续航比 Range Ratio",
+        value_fn=_efficiency("range_ratio"),
+        topics=(TOPIC_EFFICIENCY,),
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:gauge",
+    ),
+    NIOSensorEntityDescription(
+        key="place",
+        name="地点 Place",
+        value_fn=lambda c: c.place.place if c.place else None,
+        attr_fn=_place_attributes,
+        exists_fn=lambda c: c.geocoder is not None,
+        topics=(TOPIC_PLACE,),
+        icon="mdi:map-marker-radius",
+    ),
+    NIOSensorEntityDescription(
+        key="charge_rate",
+        name="充电速率 Charge Rate",
+        value_fn=lambda c: _round(c.charging.rate, 3),
+        topics=(TOPIC_CHARGING,),
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="%/min",
+        icon="mdi:battery-charging-high",
+    ),
+    NIOSensorEntityDescription(
+        key="charging_power",
+        name="估算充电功率 Estimated Charging Power",
+        value_fn=lambda c: c.charging.power,
+        topics=(TOPIC_CHARGING,),
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+    ),
+    NIOSensorEntityDescription(
+        key="time_to_full",
+        name="充满剩余时间 Time To Full",
+        value_fn=lambda c: c.charging.minutes_to(100),
+        topics=(TOPIC_CHARGING,),
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+    ),
+    NIOSensorEntityDescription(
+        key="time_to_target",
+        name="到达目标电量时间 Time To Target",
+        value_fn=lambda c: c.charging.minutes_to(c.charging.target_soc),
+        attr_fn=lambda c: {"target_soc": c.charging.target_soc},
+        topics=(TOPIC_CHARGING,),
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+    ),
+    NIOSensorEntityDescription(
+        key="last_charge_energy",
+        name="上次充电电量 Last Charge Energy",
+        value_fn=lambda c: (c.charging.last_summary() or {}).get("energy_added"),
+        attr_fn=lambda c: c.charging.last_summary(),
+        topics=(TOPIC_CHARGING,),
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    ),
+    NIOSensorEntityDescription(
+        key="credential_age",
+        name="认证信息时长 Credential Age",
+        value_fn=_credential_age,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:key-chain",
+    ),
+    NIOSensorEntityDescription(
+        key="token_expires",
+        name="令牌过期时间 Token Expires",
+        value_fn=lambda c: c.credentials.expires_at,
+        exists_fn=lambda c: c.credentials.expires_at is not None,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    NIOSensorEntityDescription(
+        key="poll_duration",
+        name="轮询耗时 Poll Duration",
+        value_fn=_median_poll_ms,
+        attr_fn=lambda c: c.metrics.as_dict()["phases_ms"],
+        exists_fn=_metrics_enabled,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    NIOSensorEntityDescription(
+        key="poll_success_ratio",
+        name="轮询成功率 Poll Success Ratio",
+        value_fn=lambda c: c.metrics.success_ratio,
+        attr_fn=lambda c: {
+            "requests": c.metrics.requests,
+            "retries": c.metrics.retries,
+            "failures": c.metrics.failures,
+        },
+        # 轮询失败时也保持可用
+        available_fn=lambda c: c.metrics.success_ratio is not None,
+        exists_fn=_metrics_enabled,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    NIOSensorEntityDescription(
+        key="payload_size",
+        name="响应大小 Payload Size",
+        value_fn=lambda c: c.metrics.payload.percentile(50),
+        exists_fn=_metrics_enabled,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+)
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the NIO Vehicle sensors."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    
-    sensors = [
-        NIOBatterySensor(coordinator),
-        NIORemainRangeSensor(coordinator),
-        NIOActualRemainRangeSensor(coordinator),  # 添加实际续航里程传感器
-        NIOTyrePressureSensor(coordinator, "front_left"),
-        NIOTyrePressureSensor(coordinator, "front_right"),
-        NIOTyrePressureSensor(coordinator, "rear_left"),
-        NIOTyrePressureSensor(coordinator, "rear_right"),
-        NIOTemperatureSensor(coordinator),
-        NIOMileageSensor(coordinator),  # 添加总里程传感器
-    ]
-    
-    async_add_entities(sensors)
-
-class NIOBatterySensor(NIOVehicleEntity, SensorEntity):
-    """Representation of NIO Battery sensor."""
-
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "battery")
-        self.entity_id = f"sensor.{self.entity_id_prefix}_battery"
-        self._attr_name = "电池电量 Battery Level"
-        self._attr_device_class = SensorDeviceClass.BATTERY
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = PERCENTAGE
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data["data"]["soc_status"]["soc"]
+    async_add_entities(
+        NIOSensor(coordinator, description)
+        for description in SENSORS
+        if description.exists_fn is None or description.exists_fn(coordinator)
+    )
 
-class NIORemainRangeSensor(NIOVehicleEntity, SensorEntity):
-    """Representation of NIO Remaining Range sensor."""
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_FILTER, SET_FILTER_SCHEMA, "async_set_filter"
+    )
 
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "range")
-        self.entity_id = f"sensor.{self.entity_id_prefix}_range"
-        self._attr_name = "预估续航里程 Remaining Range"
-        self._attr_device_class = SensorDeviceClass.DISTANCE
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data["data"]["soc_status"]["remaining_range"]
+class NIOSensor(NIOVehicleEntity, SensorEntity):
+    """Representation of a NIO Vehicle sensor."""
 
-class NIOTyrePressureSensor(NIOVehicleEntity, SensorEntity):
-    """Representation of NIO Tyre Pressure sensor."""
+    entity_description: NIOSensorEntityDescription
 
-    def __init__(self, coordinator, position):
+    def __init__(
+        self,
+        coordinator: NIOVehicleDataUpdateCoordinator,
+        description: NIOSensorEntityDescription,
+    ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, f"tyre_pressure_{position}")
-        
-        # 映射位置到中文名称
-        self._name_map = {
-            "front_left": "前左轮胎压力 Front Left Tyre",
-            "front_right": "前右轮胎压力 Front Right Tyre",
-            "rear_left": "后左轮胎压力 Rear Left Tyre",
-            "rear_right": "后右轮胎压力 Rear Right Tyre",
-        }
-        
-        self.position = position
-        self.entity_id = f"sensor.{self.entity_id_prefix}_tyre_{position}"
-        self._attr_name = self._name_map[position]
-        self._attr_device_class = SensorDeviceClass.PRESSURE
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = UnitOfPressure.BAR
+        fields = (description.path.split(".")[0],) if description.path else ()
+        super().__init__(coordinator, description.key, fields, description.topics)
+        self.entity_description = description
+        self._attr_device_class = description.device_class
+        self.entity_id = (
+            f"sensor.{self.entity_id_prefix}_{description.object_id or description.key}"
+        )
+        self._accessor = compile_path(description.path) if description.path else None
+        # 只过滤直接读取状态字段的传感器
+        self._filter: PublishFilter | None = None
+        self._published_available = False
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._timer_due = 0.0
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data["data"]["tyre_status"][f"{self.position}_wheel_press_bar"]
+    async def async_added_to_hass(self) -> None:
+        """Set up the publish filter when added to hass."""
+        await super().async_added_to_hass()
+        self._async_load_filter()
+        self.async_on_remove(self._async_cancel_timer)
 
-class NIOActualRemainRangeSensor(NIOVehicleEntity, SensorEntity):
-    """Representation of NIO Actual Remaining Range sensor."""
+    @callback
+    def async_registry_entry_updated(self) -> None:
+        """Apply changed filter options."""
+        self._async_load_filter()
+        # 新的过滤器以当前值为起点，立即写入，不保留旧过滤器压住的值
+        self.async_write_ha_state()
 
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "actual_range")
-        self.entity_id = f"sensor.{self.entity_id_prefix}_actual_range"
-        self._attr_name = "实际续航里程 Actual Range"
-        self._attr_device_class = SensorDeviceClass.DISTANCE
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
+    @callback
+    def _async_load_filter(self) -> None:
+        """Create the publish filter from the defaults and entity options."""
+        self._async_cancel_timer()
+        settings = dict(FILTER_DEFAULTS.get(self.device_class, {}))
+        if self.registry_entry is not None:
+            settings.update(self.registry_entry.options.get(DOMAIN, {}))
+        if self._accessor is None or not settings:
+            self._filter = None
+            return
+        self._filter = PublishFilter(**settings)
+        # 即将写入的初始状态作为第一次发布
+        self._filter.publish(self._live_value(), time.monotonic())
+        self._published_available = self.available
+        self._async_schedule(self._filter.heartbeat)
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data["data"]["soc_status"]["remaining_actual_range"]
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the filter lets the change through."""
+        if self._filter is None:
+            super()._handle_coordinator_update()
+            return
+        self._async_filter_update()
 
-class NIOTemperatureSensor(NIOVehicleEntity, SensorEntity):
-    """Representation of NIO Temperature sensor."""
+    @callback
+    def _async_filter_update(self, *_: Any) -> None:
+        assert self._filter is not None
+        now = time.monotonic()
+        value = self._live_value()
+        if self.available != self._published_available:
+            delay = 0.0
+        elif (delay := self._filter.delay(value, now)) is None:
+            return
+        if delay > 0:
+            self._async_schedule(delay)
+            return
 
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "temperature")
-        self.entity_id = f"sensor.{self.entity_id_prefix}_temperature"
-        self._attr_name = "车外温度 Outside Temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+        # 值未变化时为心跳，需要强制写入才会被记录
+        self._attr_force_update = value == self._filter.value
+        self._filter.publish(value, now)
+        self._published_available = self.available
+        self.async_write_ha_state()
+        self._attr_force_update = False
+        self._async_cancel_timer()
+        self._async_schedule(self._filter.heartbeat)
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data["data"]["hvac_status"]["outside_temperature"]
+    def _live_value(self) -> Any:
+        if self.coordinator.data is None:
+            return None
+        return self._accessor(self.coordinator.data)
 
-class NIOMileageSensor(NIOVehicleEntity, SensorEntity):
-    """Representation of NIO Mileage sensor."""
+    @callback
+    def _async_schedule(self, delay: float) -> None:
+        """Re-check the value after a delay, unless a check is due earlier."""
+        due = time.monotonic() + delay
+        if self._unsub_timer is not None:
+            if self._timer_due <= due:
+                return
+            self._unsub_timer()
+        self._timer_due = due
+        self._unsub_timer = async_call_later(self.hass, delay, self._async_timer_fired)
 
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator, "mileage")
-        self.entity_id = f"sensor.{self.entity_id_prefix}_mileage"
-        self._attr_name = "总里程 Total Mileage"
-        self._attr_device_class = SensorDeviceClass.DISTANCE
-        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
-        self._attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
+    @callback
+    def _async_timer_fired(self, _now: Any) -> None:
+        self._unsub_timer = None
+        self._async_filter_update()
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    async def async_set_filter(self, **options: Any) -> None:
+        """Store per-entity filter options; no options restore the defaults."""
+        if self._accessor is None:
+            raise HomeAssistantError(f"{self.entity_id} does not support filtering")
+        er.async_get(self.hass).async_update_entity_options(
+            self.entity_id, DOMAIN, options or None
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the entity is available."""
+        if self.entity_description.available_fn is not None:
+            return self.entity_description.available_fn(self.coordinator)
+        return super().available
 
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return self.coordinator.data["data"]["exterior_status"]["mileage"]
+        if self._filter is not None:
+            return self._filter.value
+        if self._accessor is not None:
+            return self._accessor(self.coordinator.data)
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes of the sensor."""
+        attributes = super().extra_state_attributes
+        if self.entity_description.attr_fn is None:
+            return attributes
+        return {
+            **(attributes or {}),
+            **(self.entity_description.attr_fn(self.coordinator) or {}),
+        } or None
@@ -0,0 +1,283 @@
+"""Services of the NIO Vehicle integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .api import NIOApiError
+from .archive import ARCHIVE_FIELDS
+from .commands import COMMANDS
+from .const import (
+    ATTR_COMMAND,
+    ATTR_END,
+    ATTR_FIELDS,
+    ATTR_MAX_AGE,
+    ATTR_SINCE,
+    ATTR_START,
+    CONF_VEHICLE_ID,
+    DEFAULT_REFRESH_MAX_AGE,
+    DOMAIN,
+    SERVICE_REFRESH,
+    SERVICE_SEND_COMMAND,
+    SERVICE_GET_TELEMETRY,
+    SERVICE_GET_TRAIL,
+    SERVICE_GET_TRIPS,
+)
+from .model import GROUP_MODELS
+from .trail import encode_polyline
+
+if TYPE_CHECKING:
+    from . import NIOVehicleDataUpdateCoordinator
+
+VEHICLE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_VEHICLE_ID): cv.string,
+    }
+)
+
+GET_TRAIL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_VEHICLE_ID): cv.string,
+        vol.Optional(ATTR_SINCE): cv.datetime,
+    }
+)
+
+GET_TELEMETRY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_VEHICLE_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [vol.In(ARCHIVE_FIELDS)]),
+    }
+)
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_VEHICLE_ID): cv.string,
+        vol.Optional(
+            ATTR_MAX_AGE, default=DEFAULT_REFRESH_MAX_AGE.total_seconds()
+        ): vol.All(vol.Coerce(float), vol.Range(min=0, max=86400)),
+        # 只接受解析的字段组：其他字段组不会保留在快照中，无法判断是否已获取
+        vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [vol.In(GROUP_MODELS)]),
+    }
+)
+
+SEND_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_VEHICLE_ID): cv.string,
+        vol.Required(ATTR_COMMAND): vol.In(list(COMMANDS)),
+        vol.Optional(ATTR_TEMPERATURE): vol.All(
+            vol.Coerce(float), vol.Range(min=16, max=32)
+        ),
+    }
+)
+
+
+def _coordinators(
+    hass: HomeAssistant, vehicle_id: str | None
+) -> list[NIOVehicleDataUpdateCoordinator]:
+    """Return the coordinators of one or all configured vehicles."""
+    coordinators = [
+        coordinator
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+        if vehicle_id is None or coordinator.vehicle_id == vehicle_id
+    ]
+    if vehicle_id is not None and not coordinators:
+        raise HomeAssistantError(f"Unknown vehicle: {vehicle_id}")
+    return coordinators
+
+
+def _isoformat(timestamp: float) -> str:
+    """Format a UTC timestamp."""
+    return dt_util.utc_from_timestamp(timestamp).isoformat()
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the NIO Vehicle services."""
+
+    async def async_get_trail(call: ServiceCall) -> ServiceResponse:
+        """Return the simplified location trail of the vehicles."""
+        since = call.data.get(ATTR_SINCE)
+        vehicles = {}
+        for coordinator in _coordinators(hass, call.data.get(CONF_VEHICLE_ID)):
+            points = coordinator.trail.points(since)
+            vehicles[coordinator.vehicle_id] = {
+                "polyline": encode_polyline(points),
+                "points": len(points),
+                "start": _isoformat(points[0][0]) if points else None,
+                "end": _isoformat(points[-1][0]) if points else None,
+            }
+        return {"vehicles": vehicles}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRAIL,
+        async_get_trail,
+        schema=GET_TRAIL_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_get_trips(call: ServiceCall) -> ServiceResponse:
+        """Return the recent trips of the vehicles."""
+        return {
+            "vehicles": {
+                coordinator.vehicle_id: [
+                    trip.as_dict() for trip in coordinator.trips.trips
+                ]
+                for coordinator in _coordinators(hass, call.data.get(CONF_VEHICLE_ID))
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRIPS,
+        async_get_trips,
+        schema=VEHICLE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_get_telemetry(call: ServiceCall) -> ServiceResponse:
+        """Return archived telemetry of the vehicles as columns."""
+        start = dt_util.as_utc(call.data[ATTR_START])
+        end = dt_util.as_utc(call.data.get(ATTR_END) or dt_util.utcnow())
+        coordinators = [
+            coordinator
+            for coordinator in _coordinators(hass, call.data.get(CONF_VEHICLE_ID))
+            if coordinator.archive is not None
+        ]
+        if not coordinators:
+            raise HomeAssistantError("Telemetry archive is not enabled")
+        return {
+            "vehicles": {
+                coordinator.vehicle_id: await coordinator.archive.async_query(
+                    start, end, call.data.get(ATTR_FIELDS)
+                )
+                for coordinator in coordinators
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TELEMETRY,
+        async_get_telemetry,
+        schema=GET_TELEMETRY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_refresh(call: ServiceCall) -> ServiceResponse:
+        """Refresh the status of the vehicles unless it is recent enough."""
+        max_age = timedelta(seconds=call.data[ATTR_MAX_AGE])
+        fields = call.data.get(ATTR_FIELDS, ())
+        coordinators = _coordinators(hass, call.data.get(CONF_VEHICLE_ID))
+        refreshed = await asyncio.gather(
+            *(
+                coordinator.async_refresh_status(max_age, fields)
+                for coordinator in coordinators
+            )
+        )
+        if not call.return_response:
+            return None
+        return {
+            "vehicles": {
+                coordinator.vehicle_id: {
+                    "refreshed": fetched,
+                    "fetched_at": coordinator.data.fetched_at.isoformat(),
+                }
+                for coordinator, fetched in zip(coordinators, refreshed)
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        async_refresh,
+        schema=REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_setup_command_service(hass: HomeAssistant) -> None:
+    """Register the send_command service for entries that enabled commands.
+
+    The command endpoint is not confirmed against the NIO cloud (only the
+    bench mock implements it), so the service only exists while at least
+    one entry explicitly opted in.
+    """
+    if hass.services.has_service(DOMAIN, SERVICE_SEND_COMMAND):
+        return
+
+    async def async_send_command(call: ServiceCall) -> ServiceResponse:
+        """Send a remote command to the vehicles and wait for completion."""
+        params = {}
+        if ATTR_TEMPERATURE in call.data:
+            params[ATTR_TEMPERATURE] = call.data[ATTR_TEMPERATURE]
+        vehicle_id = call.data.get(CONF_VEHICLE_ID)
+        coordinators = [
+            coordinator
+            for coordinator in _coordinators(hass, vehicle_id)
+            if coordinator.commands is not None
+        ]
+        if not coordinators:
+            raise HomeAssistantError(
+                f"Remote commands are not enabled for {vehicle_id or 'any vehicle'}"
+            )
+        results = await asyncio.gather(
+            *(
+                coordinator.commands.async_send(call.data[ATTR_COMMAND], params)
+                for coordinator in coordinators
+            ),
+            return_exceptions=True,
+        )
+        vehicles = {}
+        errors = []
+        for coordinator, result in zip(coordinators, results):
+            if isinstance(result, NIOApiError):
+                errors.append(f"{coordinator.vehicle_id}: {result}")
+                vehicles[coordinator.vehicle_id] = {
+                    "result": "error",
+                    "error": str(result),
+                }
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                vehicles[coordinator.vehicle_id] = {"result": result}
+        if errors and not call.return_response:
+            raise HomeAssistantError(
+                f"Sending {call.data[ATTR_COMMAND]} failed: {'; '.join(errors)}"
+            )
+        return {"vehicles": vehicles} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEND_COMMAND,
+        async_send_command,
+        schema=SEND_COMMAND_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_unload_command_service(hass: HomeAssistant) -> None:
+    """Remove the send_command service when no loaded entry enabled commands."""
+    if hass.services.has_service(DOMAIN, SERVICE_SEND_COMMAND) and not any(
+        coordinator.commands is not None
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+    ):
+        hass.services.async_remove(DOMAIN, SERVICE_SEND_COMMAND)
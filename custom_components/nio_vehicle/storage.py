@@ -0,0 +1,61 @@
+"""Persistent last-known-state cache for NIO Vehicle."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_SAVE_DELAY, DOMAIN
+from .model import VehicleSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class SnapshotCache:
+    """Store the last good snapshot of a vehicle across restarts.
+
+    Saves are throttled: at most one write is scheduled per save delay and
+    it always writes the newest snapshot. Home Assistant flushes a pending
+    write on shutdown.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        self._snapshot: VehicleSnapshot | None = None
+        self._save_pending = False
+
+    async def async_load(self) -> VehicleSnapshot | None:
+        """Load the cached snapshot, if any."""
+        if (data := await self._store.async_load()) is None:
+            return None
+        try:
+            return VehicleSnapshot.from_dict(data)
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring invalid cached vehicle status: %s", err)
+            return None
+
+    @callback
+    def async_save(self, snapshot: VehicleSnapshot) -> None:
+        """Schedule saving the snapshot."""
+        self._snapshot = snapshot
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        self._save_pending = False
+        assert self._snapshot is not None
+        return self._snapshot.as_dict()
+
+    async def async_remove(self) -> None:
+        """Remove the cached snapshot."""
+        await self._store.async_remove()
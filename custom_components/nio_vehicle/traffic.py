@@ -0,0 +1,164 @@
+"""Recording of NIO API traffic for offline replay.
+
+Status responses and pushed messages are appended to a gzip compressed
+JSON lines file per vehicle, one gzip member per flush:
+
+    {"format": "nio_vehicle_traffic", "version": 1}
+    {"t": 1700000000.0, "kind": "poll", "fields": ["soc", ...], "data": {...}}
+    {"t": 1700000012.5, "kind": "push", "data": {...}}
+
+Identifiers such as the VIN are removed from the data; positions are kept,
+so recordings should still be treated as personal data. Recordings are
+replayed by the "replay" push transport and by bench/replay.py.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import (
+    TRAFFIC_DIR,
+    TRAFFIC_FLUSH_INTERVAL,
+    TRAFFIC_FLUSH_RECORDS,
+    TRAFFIC_MAX_BYTES,
+    TRAFFIC_REDACT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMAT = "nio_vehicle_traffic"
+VERSION = 1
+SUFFIX = ".jsonl.gz"
+
+KIND_POLL = "poll"
+KIND_PUSH = "push"
+
+
+def sanitize(data: Any) -> Any:
+    """Return a copy of the data without identifying attributes."""
+    if isinstance(data, dict):
+        return {
+            key: sanitize(value)
+            for key, value in data.items()
+            if key not in TRAFFIC_REDACT
+        }
+    if isinstance(data, list):
+        return [sanitize(value) for value in data]
+    return data
+
+
+@dataclass(frozen=True, slots=True)
+class TrafficRecord:
+    """A recorded status response or pushed message."""
+
+    time: float
+    kind: str
+    data: dict[str, Any]
+    fields: tuple[str, ...] = ()
+
+
+def read_recording(path: Path) -> Iterator[TrafficRecord]:
+    """Read the records of a recording file (blocking).
+
+    A file cut off while a member was being written yields the records
+    before the damaged member.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        lines = iter(file)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except (EOFError, gzip.BadGzipFile, zlib.error) as err:
+                # 写入 gzip 段时被中断，之后的内容无法解压
+                _LOGGER.warning("Recording %s is truncated: %s", path, err)
+                return
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 异常退出时最后一段可能不完整
+                _LOGGER.debug("Skipping invalid line in %s", path)
+                continue
+            if "format" in entry or not isinstance(entry.get("data"), dict):
+                continue
+            yield TrafficRecord(
+                time=entry["t"],
+                kind=entry.get("kind", KIND_POLL),
+                data=entry["data"],
+                fields=tuple(entry.get("fields", ())),
+            )
+
+
+class TrafficRecorder:
+    """Append-only recorder of the API traffic of one vehicle."""
+
+    def __init__(self, hass: HomeAssistant, vehicle_id: str) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.vehicle_id = vehicle_id
+        self.path = Path(hass.config.path(TRAFFIC_DIR, f"{slugify(vehicle_id)}{SUFFIX}"))
+        self._pending: list[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.records = 0
+
+    @callback
+    def record(
+        self, kind: str, data: dict[str, Any], fields: Sequence[str] = ()
+    ) -> None:
+        """Buffer a status response or pushed message."""
+        entry: dict[str, Any] = {"t": round(time.time(), 3), "kind": kind}
+        if fields:
+            entry["fields"] = list(fields)
+        entry["data"] = sanitize(data)
+        self._pending.append(json.dumps(entry, separators=(",", ":")))
+        self.records += 1
+        if (
+            len(self._pending) >= TRAFFIC_FLUSH_RECORDS
+            or time.monotonic() - self._last_flush
+            >= TRAFFIC_FLUSH_INTERVAL.total_seconds()
+        ):
+            self.hass.async_create_background_task(
+                self.async_flush(), f"nio_vehicle_traffic_{self.vehicle_id}"
+            )
+
+    async def async_flush(self) -> None:
+        """Write the buffered records to disk."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        async with self._lock:
+            await self.hass.async_add_executor_job(self._append, lines)
+
+    def _append(self, lines: list[str]) -> None:
+        """Append a gzip member and rotate the file when it is full."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size >= TRAFFIC_MAX_BYTES:
+            # 只保留上一个文件
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        if not self.path.exists():
+            lines = [json.dumps({"format": FORMAT, "version": VERSION}), *lines]
+        with self.path.open("ab") as file:
+            file.write(gzip.compress(("\n".join(lines) + "\n").encode()))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the recorder for diagnostics."""
+        return {
+            "file": self.path.name,
+            "records": self.records,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,130 @@
+"""Simplified location trail of a NIO vehicle."""
+from __future__ import annotations
+
+import math
+from collections import deque
+from datetime import datetime
+
+from .const import (
+    TRAIL_MAX_CANDIDATES,
+    TRAIL_MAX_POINTS,
+    TRAIL_MIN_DISTANCE_M,
+    TRAIL_TOLERANCE_M,
+)
+from .util import distance_m
+
+# (时间戳, 纬度, 经度)
+TrailPoint = tuple[float, float, float]
+
+
+def _offset_m(origin: TrailPoint, point: TrailPoint) -> tuple[float, float]:
+    """Project a point to metres east/north of the origin."""
+    x = math.radians(point[2] - origin[2]) * math.cos(math.radians(origin[1]))
+    y = math.radians(point[1] - origin[1])
+    return 6371000.0 * x, 6371000.0 * y
+
+
+def _cross_track_m(start: TrailPoint, end: TrailPoint, point: TrailPoint) -> float:
+    """Return the distance of a point from the segment start-end in metres."""
+    ex, ey = _offset_m(start, end)
+    px, py = _offset_m(start, point)
+    length_sq = ex * ex + ey * ey
+    if length_sq == 0:
+        return math.hypot(px, py)
+    t = min(max((px * ex + py * ey) / length_sq, 0.0), 1.0)
+    return math.hypot(px - t * ex, py - t * ey)
+
+
+def _encode_value(value: int) -> str:
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def encode_polyline(points: list[TrailPoint]) -> str:
+    """Encode points with the Google encoded polyline algorithm."""
+    result = []
+    last_lat = last_lon = 0
+    for _, lat, lon in points:
+        lat_e5 = round(lat * 1e5)
+        lon_e5 = round(lon * 1e5)
+        result.append(_encode_value(lat_e5 - last_lat))
+        result.append(_encode_value(lon_e5 - last_lon))
+        last_lat, last_lon = lat_e5, lon_e5
+    return "".join(result)
+
+
+class LocationTrail:
+    """Bounded ring buffer of simplified vehicle positions.
+
+    Points closer than the minimum distance to the last point are dropped,
+    which removes duplicates while parked. Moving points are simplified
+    with an opening-window algorithm: a point is only kept once a straight
+    line from the last kept point no longer passes within the tolerance of
+    every point seen since.
+    """
+
+    def __init__(
+        self,
+        max_points: int = TRAIL_MAX_POINTS,
+        min_distance: float = TRAIL_MIN_DISTANCE_M,
+        tolerance: float = TRAIL_TOLERANCE_M,
+    ) -> None:
+        """Initialize the trail."""
+        self.min_distance = min_distance
+        self.tolerance = tolerance
+        self._points: deque[TrailPoint] = deque(maxlen=max_points)
+        # 最后一个保留点之后、尚未确定是否保留的点
+        self._candidates: list[TrailPoint] = []
+
+    def __len__(self) -> int:
+        """Return the number of points in the trail."""
+        return len(self._points) + (1 if self._candidates else 0)
+
+    def add(self, timestamp: datetime, latitude: float, longitude: float) -> bool:
+        """Add a position and return False if it was dropped as a duplicate."""
+        point = (timestamp.timestamp(), latitude, longitude)
+        if self._candidates:
+            last = self._candidates[-1]
+        elif self._points:
+            last = self._points[-1]
+        else:
+            last = None
+        if (
+            last is not None
+            and distance_m(last[1], last[2], latitude, longitude) < self.min_distance
+        ):
+            return False
+
+        if not self._points:
+            self._points.append(point)
+            return True
+
+        anchor = self._points[-1]
+        if len(self._candidates) >= TRAIL_MAX_CANDIDATES or any(
+            _cross_track_m(anchor, point, candidate) > self.tolerance
+            for candidate in self._candidates
+        ):
+            # 直线无法覆盖中间点，保留上一个候选点作为新的锚点
+            self._points.append(self._candidates[-1])
+            self._candidates = []
+        self._candidates.append(point)
+        return True
+
+    def points(self, since: datetime | None = None) -> list[TrailPoint]:
+        """Return the simplified trail, optionally limited to recent points."""
+        points = list(self._points)
+        if self._candidates:
+            points.append(self._candidates[-1])
+        if since is not None:
+            start = since.timestamp()
+            points = [point for point in points if point[0] >= start]
+        return points
+
+    def as_polyline(self, since: datetime | None = None) -> str:
+        """Return the trail as an encoded polyline."""
+        return encode_polyline(self.points(since))
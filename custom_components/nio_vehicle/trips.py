@@ -0,0 +1,144 @@
+"""Incremental trip detection for NIO vehicles."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from .const import (
+    MOVE_THRESHOLD_M,
+    TRIP_END_IDLE,
+    TRIP_LOCKED_DWELL,
+    TRIP_LOG_SIZE,
+    TRIP_MIN_DISTANCE,
+)
+from .model import VehicleSnapshot
+from .util import distance_m
+
+
+@dataclass(slots=True)
+class TripPoint:
+    """Vehicle state at the start or end of a trip."""
+
+    time: datetime
+    mileage: float
+    soc: float | None
+    latitude: float | None
+    longitude: float | None
+
+    @classmethod
+    def from_snapshot(cls, snapshot: VehicleSnapshot) -> TripPoint | None:
+        """Return the trip point of a snapshot, or None without mileage."""
+        if snapshot.exterior is None or snapshot.exterior.mileage is None:
+            return None
+        position = snapshot.position
+        return cls(
+            snapshot.fetched_at,
+            snapshot.exterior.mileage,
+            snapshot.soc.soc if snapshot.soc else None,
+            position.latitude if position else None,
+            position.longitude if position else None,
+        )
+
+    def distance_to(self, other: TripPoint) -> float | None:
+        """Return the distance in metres to another point, if both have one."""
+        if None in (self.latitude, self.longitude, other.latitude, other.longitude):
+            return None
+        return distance_m(self.latitude, self.longitude, other.latitude, other.longitude)
+
+
+@dataclass(slots=True)
+class Trip:
+    """A single trip."""
+
+    start: TripPoint
+    end: TripPoint
+
+    @property
+    def distance(self) -> float:
+        """Return the driven distance in km."""
+        return round(self.end.mileage - self.start.mileage, 1)
+
+    @property
+    def duration(self) -> float:
+        """Return the duration in minutes."""
+        return round((self.end.time - self.start.time).total_seconds() / 60, 1)
+
+    @property
+    def soc_used(self) -> float | None:
+        """Return the state of charge used in percent."""
+        if self.start.soc is None or self.end.soc is None:
+            return None
+        return round(self.start.soc - self.end.soc, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trip as a dictionary."""
+        return {
+            "start_time": self.start.time.isoformat(),
+            "end_time": self.end.time.isoformat(),
+            "distance": self.distance,
+            "duration": self.duration,
+            "soc_used": self.soc_used,
+            "start_latitude": self.start.latitude,
+            "start_longitude": self.start.longitude,
+            "end_latitude": self.end.latitude,
+            "end_longitude": self.end.longitude,
+        }
+
+
+class TripDetector:
+    """Open and close trips from a stream of snapshots.
+
+    A trip starts at the last stationary sample before the mileage or
+    position changes and ends once the vehicle has been locked without
+    moving for a few minutes, or has not moved for a while. The locked
+    dwell keeps vehicles that lock automatically while driving from
+    splitting a trip at every stop. Each sample is processed in constant
+    time and only a bounded log of finished trips is kept.
+    """
+
+    def __init__(self, max_trips: int = TRIP_LOG_SIZE) -> None:
+        """Initialize the detector."""
+        self.trips: deque[Trip] = deque(maxlen=max_trips)
+        self.current: Trip | None = None
+        self._last: TripPoint | None = None
+
+    @property
+    def last_trip(self) -> Trip | None:
+        """Return the last finished trip."""
+        return self.trips[-1] if self.trips else None
+
+    def update(self, snapshot: VehicleSnapshot) -> Trip | None:
+        """Process a snapshot and return the trip it finished, if any."""
+        point = TripPoint.from_snapshot(snapshot)
+        if point is None:
+            return None
+        last, self._last = self._last, point
+        if last is None:
+            return None
+
+        moved = point.mileage > last.mileage
+        if not moved and (distance := point.distance_to(last)) is not None:
+            moved = distance >= MOVE_THRESHOLD_M
+
+        if moved:
+            if self.current is None:
+                self.current = Trip(start=last, end=point)
+            else:
+                self.current.end = point
+            return None
+
+        if self.current is None:
+            return None
+        locked = snapshot.door is not None and snapshot.door.locked is True
+        if point.time - self.current.end.time < (
+            TRIP_LOCKED_DWELL if locked else TRIP_END_IDLE
+        ):
+            return None
+
+        trip, self.current = self.current, None
+        if trip.distance < TRIP_MIN_DISTANCE:
+            return None
+        self.trips.append(trip)
+        return trip
@@ -0,0 +1,206 @@
+"""Streaming tyre slow-leak detection for NIO vehicles.
+
+Pressures are first normalized to a reference temperature using the
+outside temperature, then compared with the other tyre on the same axle.
+Warming up while driving or a cold night affects both tyres of an axle
+alike, so the difference isolates a single tyre losing air.
+
+Per tyre the detector keeps an exponentially weighted mean and variance
+of that difference as the tyre's normal offset, and an exponentially
+weighted least squares fit of the difference over time as the leak rate.
+Each update takes constant time and memory. A leak of both tyres on an
+axle at the same rate is not detected.
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Any
+
+from .const import (
+    TYRE_BASELINE_HALF_LIFE,
+    TYRE_LEAK_HALF_LIFE,
+    TYRE_LEAK_MIN_DROP,
+    TYRE_LEAK_MIN_SPAN,
+    TYRE_LEAK_RATE,
+    TYRE_LEAK_Z,
+    TYRE_POSITIONS,
+)
+from .model import VehicleSnapshot
+
+# 标准大气压（bar）和参考温度（K）
+_ATMOSPHERE = 1.01325
+_REFERENCE_TEMPERATURE = 293.15
+
+
+def compensate(pressure: float, temperature: float | None) -> float:
+    """Return the gauge pressure at the reference temperature of 20 °C."""
+    if temperature is None:
+        return pressure
+    # 气体体积不变时绝对压力与绝对温度成正比
+    absolute = pressure + _ATMOSPHERE
+    return absolute * _REFERENCE_TEMPERATURE / (temperature + 273.15) - _ATMOSPHERE
+
+
+def _partner(position: str) -> str:
+    """Return the other tyre on the same axle."""
+    axle, side = position.split("_")
+    return f"{axle}_{'right' if side == 'left' else 'left'}"
+
+
+class TyreState:
+    """Constant-size statistics of one tyre."""
+
+    __slots__ = (
+        "mean",
+        "variance",
+        "deviation",
+        "leaking",
+        "_count",
+        "_s0",
+        "_sx",
+        "_sy",
+        "_sxx",
+        "_sxy",
+        "_last_t",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the state."""
+        self.mean: float | None = None
+        self.variance = 0.0
+        self.deviation = 0.0
+        self.leaking = False
+        self._count = 0
+        self._s0 = self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._last_t: float | None = None
+
+    def add(self, t: float, value: float, learn: bool) -> None:
+        """Add an axle-relative pressure at t days."""
+        dt = 0.0 if self._last_t is None else t - self._last_t
+        self._last_t = t
+
+        # 指数加权最小二乘拟合压差随时间的变化
+        weight = 0.5 ** (dt / TYRE_LEAK_HALF_LIFE)
+        self._s0 = self._s0 * weight + 1
+        self._sx = self._sx * weight + t
+        self._sy = self._sy * weight + value
+        self._sxx = self._sxx * weight + t * t
+        self._sxy = self._sxy * weight + t * value
+
+        if self.mean is None:
+            self.mean = value
+            self._count = 1
+        elif learn:
+            # 正常状态下的压差基线，漏气期间冻结；样本较少时按算术平均，
+            # 避免基线停留在第一个带噪声的读数上
+            self._count += 1
+            alpha = max(1 - 0.5 ** (dt / TYRE_BASELINE_HALF_LIFE), 1 / self._count)
+            diff = value - self.mean
+            self.mean += alpha * diff
+            self.variance = (1 - alpha) * (self.variance + alpha * diff * diff)
+        self.deviation = value - self.mean
+        if self.leaking:
+            # 回差：压差恢复到一半以内才解除，避免在阈值附近反复切换
+            self.leaking = self.deviation <= -TYRE_LEAK_MIN_DROP / 2
+        else:
+            self.leaking = self._leak_detected()
+
+    @property
+    def rate(self) -> float | None:
+        """Return the fitted change of the pressure difference in bar/day."""
+        if self._s0 == 0:
+            return None
+        mean_t = self._sx / self._s0
+        spread = self._sxx / self._s0 - mean_t * mean_t
+        if spread < TYRE_LEAK_MIN_SPAN**2:
+            return None
+        return (self._sxy / self._s0 - mean_t * self._sy / self._s0) / spread
+
+    def _leak_detected(self) -> bool:
+        """Return True if the tyre lost pressure against its axle partner."""
+        threshold = max(TYRE_LEAK_MIN_DROP, TYRE_LEAK_Z * math.sqrt(self.variance))
+        if self.deviation <= -threshold:
+            return True
+        rate = self.rate
+        return (
+            rate is not None
+            and rate <= -TYRE_LEAK_RATE
+            and self.deviation <= -TYRE_LEAK_MIN_DROP / 2
+        )
+
+
+class TyreLeakDetector:
+    """Detect slow leaks from the four tyre pressures."""
+
+    def __init__(self) -> None:
+        """Initialize the detector."""
+        self.tyres = {position: TyreState() for position in TYRE_POSITIONS}
+        self.leaking: tuple[str, ...] = ()
+        self._start: datetime | None = None
+        self._last_time: datetime | None = None
+
+    def update(self, snapshot: VehicleSnapshot) -> bool:
+        """Feed a snapshot. Returns True if the published results changed."""
+        tyre = snapshot.tyre
+        # 只接受更新的样本：回放的录制可能早于已处理的实时状态
+        if tyre is None or (
+            self._last_time is not None and snapshot.fetched_at <= self._last_time
+        ):
+            return False
+        pressures = {
+            position: getattr(tyre, f"{position}_wheel_press_bar")
+            for position in TYRE_POSITIONS
+        }
+        if None in pressures.values():
+            return False
+        self._last_time = snapshot.fetched_at
+        if self._start is None:
+            self._start = snapshot.fetched_at
+        t = (snapshot.fetched_at - self._start).total_seconds() / 86400
+
+        hvac = snapshot.hvac
+        temperature = hvac.outside_temperature if hvac else None
+        compensated = {
+            position: compensate(pressure, temperature)
+            for position, pressure in pressures.items()
+        }
+        before = self.results()
+        # 同轴任一轮胎漏气时两侧的基线都冻结
+        learn = {
+            position: not (state.leaking or self.tyres[_partner(position)].leaking)
+            for position, state in self.tyres.items()
+        }
+        for position, state in self.tyres.items():
+            state.add(
+                t,
+                compensated[position] - compensated[_partner(position)],
+                learn=learn[position],
+            )
+        self.leaking = tuple(
+            position for position, state in self.tyres.items() if state.leaking
+        )
+        return self.results() != before
+
+    @property
+    def leak_rate(self) -> float | None:
+        """Return the fastest pressure loss of any tyre in bar/day."""
+        rates = [
+            -state.rate for state in self.tyres.values() if state.rate is not None
+        ]
+        return round(max(max(rates), 0.0), 3) if rates else None
+
+    def results(self) -> tuple:
+        """Return the published results, for change detection."""
+        return (self.leaking, self.leak_rate)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the per tyre state."""
+        return {
+            position: {
+                "deviation": round(state.deviation, 3),
+                "rate": round(state.rate, 3) if state.rate is not None else None,
+                "leaking": position in self.leaking,
+            }
+            for position, state in self.tyres.items()
+        }
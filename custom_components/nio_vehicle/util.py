@@ -0,0 +1,12 @@
+"""Helpers shared by the NIO Vehicle modules."""
+from __future__ import annotations
+
+import math
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the approximate distance in metres between two coordinates."""
+    # 等距圆柱投影，对几公里内的距离足够精确
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371000.0 * math.hypot(x, y)
@@ -0,0 +1 @@
+"""Tests for the NIO Vehicle integration."""
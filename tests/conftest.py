@@ -0,0 +1,76 @@
+"""Fixtures for the NIO Vehicle tests."""
+from __future__ import annotations
+
+from collections.abc import Generator
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_APP_VERSION,
+    CONF_DEVICE_ID,
+    CONF_SIGN,
+    CONF_TIMESTAMP,
+    CONF_VEHICLE_ID,
+    DOMAIN,
+)
+
+MOCK_DATA = {
+    CONF_VEHICLE_ID: "ES8-1",
+    CONF_ACCESS_TOKEN: "token",
+    CONF_DEVICE_ID: "device",
+    CONF_SIGN: "sign",
+    CONF_TIMESTAMP: "1709251200",
+    CONF_APP_VERSION: "5.2.0",
+}
+
+MOCK_STATUS = {
+    "soc_status": {"soc": 80, "remaining_range": 400, "charge_state": 0},
+    "door_status": {"vehicle_lock_status": 1},
+    "exterior_status": {"mileage": 12345.6},
+    "position_status": {"latitude": 31.2304, "longitude": 121.4737},
+    "hvac_status": {"outside_temperature": 18, "air_con_on": 0},
+    "tyre_status": {
+        "front_left_wheel_press_bar": 2.5,
+        "front_right_wheel_press_bar": 2.5,
+        "rear_left_wheel_press_bar": 2.6,
+        "rear_right_wheel_press_bar": 2.6,
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load custom_components/nio_vehicle in every test."""
+    yield
+
+
+@pytest.fixture
+def mock_api() -> Generator[AsyncMock, None, None]:
+    """Patch the requests of the API client."""
+    with patch(
+        "custom_components.nio_vehicle.api.NIOApiClient.async_get_status",
+        return_value=MOCK_STATUS,
+    ) as get_status, patch(
+        "custom_components.nio_vehicle.api.NIOApiClient.async_send_command",
+        return_value={},
+    ) as send_command:
+        get_status.send_command = send_command
+        yield get_status
+
+
+async def setup_integration(
+    hass: HomeAssistant, options: dict | None = None, **data: str
+) -> MockConfigEntry:
+    """Set up a config entry of the mocked vehicle."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={**MOCK_DATA, **data}, options=options or {}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
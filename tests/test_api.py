@@ -0,0 +1,150 @@
+"""Tests for the NIO API client."""
+from __future__ import annotations
+
+from datetime import timedelta
+from email.utils import format_datetime
+from http import HTTPStatus
+
+import pytest
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.nio_vehicle.api import (
+    NIOApiAuthError,
+    NIOApiClient,
+    NIOApiConnectionError,
+    NIOApiRateLimitError,
+    NIOApiResponseError,
+    _retry_after,
+)
+from custom_components.nio_vehicle.const import API_BASE_URL
+
+from .conftest import MOCK_DATA, MOCK_STATUS
+
+STATUS_URL = f"{API_BASE_URL}/{MOCK_DATA['vehicle_id']}/status"
+
+
+@pytest.fixture
+async def client(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker):
+    """Return a client on a mocked session."""
+    session = aioclient_mock.create_session(hass.loop)
+    yield NIOApiClient(session)
+    await session.close()
+
+
+async def _get_status(client: NIOApiClient) -> dict:
+    return await client.async_get_status(client.vehicle_request(MOCK_DATA), ["soc"])
+
+
+async def test_get_status(
+    client: NIOApiClient, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """The "data" object of a successful response is returned."""
+    aioclient_mock.get(
+        STATUS_URL, json={"result_code": "success", "data": MOCK_STATUS}
+    )
+    assert await _get_status(client) == MOCK_STATUS
+    _, url, _, headers = aioclient_mock.mock_calls[0]
+    assert url.query.getall("field") == ["soc"]
+    assert url.query["sign"] == MOCK_DATA["sign"]
+    assert headers["Authorization"] == f"Bearer {MOCK_DATA['access_token']}"
+
+
+@pytest.mark.parametrize(
+    ("status", "error"),
+    [
+        (HTTPStatus.UNAUTHORIZED, NIOApiAuthError),
+        (HTTPStatus.FORBIDDEN, NIOApiAuthError),
+        (HTTPStatus.TOO_MANY_REQUESTS, NIOApiRateLimitError),
+        (HTTPStatus.NOT_FOUND, NIOApiConnectionError),
+        (HTTPStatus.BAD_GATEWAY, NIOApiConnectionError),
+    ],
+)
+async def test_http_status_errors(
+    client: NIOApiClient,
+    aioclient_mock: AiohttpClientMocker,
+    status: HTTPStatus,
+    error: type[Exception],
+) -> None:
+    """HTTP error statuses map to the client's error types."""
+    aioclient_mock.get(STATUS_URL, status=status)
+    with pytest.raises(error):
+        await _get_status(client)
+
+
+async def test_connection_error_transient(
+    client: NIOApiClient, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Only server errors are worth retrying."""
+    aioclient_mock.get(STATUS_URL, status=HTTPStatus.NOT_FOUND)
+    with pytest.raises(NIOApiConnectionError) as err:
+        await _get_status(client)
+    assert err.value.status == HTTPStatus.NOT_FOUND
+    assert not err.value.transient
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(STATUS_URL, status=HTTPStatus.SERVICE_UNAVAILABLE)
+    with pytest.raises(NIOApiConnectionError) as err:
+        await _get_status(client)
+    assert err.value.transient
+
+
+async def test_rate_limit_retry_after(
+    client: NIOApiClient, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """The Retry-After header of a 429 response is passed on."""
+    aioclient_mock.get(
+        STATUS_URL,
+        status=HTTPStatus.TOO_MANY_REQUESTS,
+        headers={"Retry-After": "120"},
+    )
+    with pytest.raises(NIOApiRateLimitError) as err:
+        await _get_status(client)
+    assert err.value.retry_after == 120
+
+
+@pytest.mark.parametrize(
+    ("body", "error"),
+    [
+        ({"result_code": "auth_failed"}, NIOApiAuthError),
+        ({"result_code": "internal_error"}, NIOApiResponseError),
+        ([], NIOApiResponseError),
+    ],
+)
+async def test_result_code_errors(
+    client: NIOApiClient,
+    aioclient_mock: AiohttpClientMocker,
+    body: object,
+    error: type[Exception],
+) -> None:
+    """Unsuccessful result codes raise, rejected credentials as auth errors."""
+    aioclient_mock.get(STATUS_URL, json=body)
+    with pytest.raises(error) as err:
+        await _get_status(client)
+    assert type(err.value) is error
+
+
+async def test_invalid_json(
+    client: NIOApiClient, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """A body that is not JSON is reported as a connection error."""
+    aioclient_mock.get(STATUS_URL, text="<html>")
+    with pytest.raises(NIOApiConnectionError):
+        await _get_status(client)
+
+
+def test_retry_after() -> None:
+    """Retry-After is parsed from seconds or an HTTP date."""
+    assert _retry_after({}) is None
+    assert _retry_after({"Retry-After": "30"}) == 30
+    assert _retry_after({"Retry-After": "-5"}) == 0
+    assert _retry_after({"Retry-After": "soon"}) is None
+
+    retry_at = dt_util.utcnow() + timedelta(minutes=2)
+    assert 100 < _retry_after({"Retry-After": format_datetime(retry_at)}) <= 120
+    past = dt_util.utcnow() - timedelta(minutes=2)
+    assert _retry_after({"Retry-After": format_datetime(past)}) == 0
@@ -0,0 +1,110 @@
+"""Tests for the telemetry archive."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.archive import (
+    ACTIVE_FILE,
+    ARCHIVE_FIELDS,
+    SEGMENT_SUFFIX,
+    TelemetryArchive,
+)
+from custom_components.nio_vehicle.const import ARCHIVE_MIN_INTERVAL
+from custom_components.nio_vehicle.model import (
+    PositionStatus,
+    SocStatus,
+    VehicleSnapshot,
+)
+
+START = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(seconds: float, soc: float | None = 50.0) -> VehicleSnapshot:
+    return VehicleSnapshot(
+        START + timedelta(seconds=seconds),
+        soc=SocStatus(soc=soc) if soc is not None else None,
+        position=PositionStatus(latitude=31.2304, longitude=121.4737),
+    )
+
+
+@pytest.fixture
+def archive(hass: HomeAssistant, tmp_path: Path) -> TelemetryArchive:
+    """Return an archive writing below a temporary directory."""
+    archive = TelemetryArchive(hass, "ES8-1")
+    archive.path = tmp_path / "es8_1"
+    return archive
+
+
+async def test_pending_rows_are_queried(archive: TelemetryArchive) -> None:
+    """Buffered rows are returned before they are flushed."""
+    archive.add(_snapshot(0, 50))
+    archive.add(_snapshot(ARCHIVE_MIN_INTERVAL, None))
+    result = await archive.async_query(START, START + timedelta(hours=1), ["soc"])
+    assert result == {
+        "time": [int(START.timestamp()), int(START.timestamp()) + ARCHIVE_MIN_INTERVAL],
+        "soc": [50.0, None],
+    }
+
+
+async def test_rows_are_throttled(archive: TelemetryArchive) -> None:
+    """Snapshots closer than the minimum interval are not archived."""
+    archive.add(_snapshot(0))
+    archive.add(_snapshot(ARCHIVE_MIN_INTERVAL / 2))
+    result = await archive.async_query(START, START + timedelta(hours=1))
+    assert len(result["time"]) == 1
+    assert set(result) == {"time", *ARCHIVE_FIELDS}
+
+
+async def test_flush_and_rotate_round_trip(archive: TelemetryArchive) -> None:
+    """Rows survive flushing and compression into a segment."""
+    for index in range(30):
+        archive.add(_snapshot(index * 60, 80 - index * 0.5))
+    await archive.async_flush()
+    assert (archive.path / ACTIVE_FILE).exists()
+    archive._rotate(archive.path / ACTIVE_FILE)
+    assert not (archive.path / ACTIVE_FILE).exists()
+    assert len(list(archive.path.glob(f"*{SEGMENT_SUFFIX}"))) == 1
+
+    archive.add(_snapshot(30 * 60, 65))
+    await archive.async_flush()
+    result = await archive.async_query(
+        START + timedelta(minutes=10),
+        START + timedelta(minutes=40),
+        ["soc", "latitude"],
+    )
+    assert result["time"] == [
+        int(START.timestamp()) + minute * 60 for minute in range(10, 31)
+    ]
+    assert result["soc"] == [80 - minute * 0.5 for minute in range(10, 31)]
+    assert result["latitude"] == [31.2304] * 21
+
+
+async def test_segments_outside_the_range_are_skipped(
+    archive: TelemetryArchive,
+) -> None:
+    """A query before the archived rows returns nothing."""
+    for index in range(5):
+        archive.add(_snapshot(index * 60))
+    await archive.async_flush()
+    archive._rotate(archive.path / ACTIVE_FILE)
+    result = await archive.async_query(START - timedelta(days=2), START - timedelta(days=1))
+    assert result["time"] == []
+
+
+async def test_partial_rows_are_dropped(archive: TelemetryArchive) -> None:
+    """A half written row after a crash is ignored."""
+    for index in range(3):
+        archive.add(_snapshot(index * 60))
+    await archive.async_flush()
+    with (archive.path / ACTIVE_FILE).open("ab") as file:
+        file.write(b"\x00" * 7)
+    result = await archive.async_query(START, START + timedelta(hours=1), ["soc"])
+    assert len(result["time"]) == 3
+    archive._rotate(archive.path / ACTIVE_FILE)
+    result = await archive.async_query(START, START + timedelta(hours=1), ["soc"])
+    assert result["soc"] == [50.0] * 3
@@ -0,0 +1,91 @@
+"""Tests for the charging session tracking."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.nio_vehicle.charging import ChargingSession, ChargingTracker
+from custom_components.nio_vehicle.const import CHARGE_MAX_SAMPLES, CHARGE_MIN_SAMPLES
+from custom_components.nio_vehicle.model import SocStatus, VehicleSnapshot
+
+START = datetime(2024, 3, 1, 22, 0, tzinfo=timezone.utc)
+
+
+def _snapshot(minutes: float, soc: float, charge_state: int = 1) -> VehicleSnapshot:
+    return VehicleSnapshot(
+        START + timedelta(minutes=minutes),
+        soc=SocStatus(soc=soc, charge_state=charge_state),
+    )
+
+
+def test_constant_rate_is_fitted() -> None:
+    """A linear charge yields its slope as the rate."""
+    tracker = ChargingTracker(capacity=100, target_soc=90)
+    for minute in range(10):
+        assert tracker.update(_snapshot(minute, 20 + minute * 0.5))
+    assert tracker.rate == pytest.approx(0.5)
+    # 0.5 %/min × 60 × 100 kWh / 100 = 30 kW
+    assert tracker.power == 30.0
+    # 当前 24.5%，到 90% 还需 65.5 / 0.5 分钟
+    assert tracker.minutes_to(90) == 131
+    assert tracker.minutes_to(10) == 0
+
+
+def test_rate_needs_a_few_samples() -> None:
+    """No rate is estimated from too few samples."""
+    tracker = ChargingTracker(capacity=100, target_soc=90)
+    for minute in range(CHARGE_MIN_SAMPLES - 1):
+        tracker.update(_snapshot(minute, 50 + minute))
+    assert tracker.current is not None
+    assert tracker.rate is None
+    assert tracker.power is None
+    assert tracker.minutes_to(90) is None
+
+
+def test_rate_follows_the_taper() -> None:
+    """Recent samples dominate the fitted rate."""
+    tracker = ChargingTracker(capacity=100, target_soc=90)
+    soc = 50.0
+    for minute in range(60):
+        soc += 1.0 if minute < 30 else 0.2
+        tracker.update(_snapshot(minute, soc))
+    assert 0.2 <= tracker.rate < 0.6
+    assert tracker.current.peak_rate == pytest.approx(1.0)
+
+
+def test_session_ends_when_charging_stops() -> None:
+    """The finished session is summarized once charging stops."""
+    tracker = ChargingTracker(capacity=75, target_soc=90)
+    for minute in range(0, 61, 5):
+        tracker.update(_snapshot(minute, 40 + minute / 2))
+    assert tracker.last_summary() is None
+    assert tracker.update(_snapshot(65, 70, charge_state=0))
+    assert tracker.current is None
+    summary = tracker.last_summary()
+    assert summary["duration"] == 60.0
+    assert summary["start_soc"] == 40
+    assert summary["end_soc"] == 70
+    assert summary["soc_added"] == 30.0
+    assert summary["energy_added"] == 22.5
+    assert summary["average_rate"] == 0.5
+    assert not tracker.update(_snapshot(70, 70, charge_state=0))
+
+
+def test_snapshots_without_soc_are_ignored() -> None:
+    """Snapshots lacking the SOC group do not start a session."""
+    tracker = ChargingTracker(capacity=75, target_soc=90)
+    assert not tracker.update(VehicleSnapshot(START))
+    assert tracker.current is None
+
+
+def test_samples_are_bounded() -> None:
+    """Long sessions are downsampled instead of growing without bound."""
+    session = ChargingSession(START, 10)
+    for minute in range(1, 4 * CHARGE_MAX_SAMPLES):
+        session.add(START + timedelta(minutes=minute), 10 + minute / 100)
+    assert CHARGE_MAX_SAMPLES // 2 <= session.sample_count <= CHARGE_MAX_SAMPLES
+    # 降采样后仍保留最早的样本，且时间递增
+    times = session.samples[::2]
+    assert times[0] == 0
+    assert list(times) == sorted(times)
@@ -0,0 +1,96 @@
+"""Tests for the remote command queue."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.api import NIOApiResponseError
+from custom_components.nio_vehicle.commands import CommandQueue
+from custom_components.nio_vehicle.const import (
+    COMMAND_DONE,
+    COMMAND_SUPERSEDED,
+    COMMAND_TIMEOUT,
+    CONF_ENABLE_COMMANDS,
+    DOMAIN,
+    SERVICE_SEND_COMMAND,
+)
+
+from .conftest import setup_integration
+
+
+@pytest.fixture(autouse=True)
+def no_poll_delay():
+    """Poll for completion without waiting."""
+    with patch("custom_components.nio_vehicle.commands.COMMAND_POLL_DELAYS", (0, 0)):
+        yield
+
+
+@pytest.fixture
+async def commands(hass: HomeAssistant, mock_api: AsyncMock) -> CommandQueue:
+    """Set up an entry with remote commands and return its queue."""
+    entry = await setup_integration(hass, {CONF_ENABLE_COMMANDS: True})
+    yield hass.data[DOMAIN][entry.entry_id].commands
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_command_completes(commands: CommandQueue, mock_api: AsyncMock) -> None:
+    """A command is done once the polled status reaches its target."""
+    assert await commands.async_send("lock") == COMMAND_DONE
+    assert mock_api.send_command.call_count == 1
+    # 只请求命令影响的字段组
+    assert mock_api.call_args.args[1] == ["door"]
+    assert commands.as_dict()["sent"] == 1
+
+
+async def test_identical_commands_are_coalesced(
+    commands: CommandQueue, mock_api: AsyncMock
+) -> None:
+    """Repeating a pending command shares its result."""
+    results = await asyncio.gather(
+        commands.async_send("lock"), commands.async_send("lock")
+    )
+    assert results == [COMMAND_DONE, COMMAND_DONE]
+    assert mock_api.send_command.call_count == 1
+    assert commands.coalesced == 1
+
+
+async def test_contradictory_command_replaces_pending(
+    commands: CommandQueue, mock_api: AsyncMock
+) -> None:
+    """A queued command is superseded by a later one for the same target."""
+    results = await asyncio.gather(
+        commands.async_send("unlock"), commands.async_send("lock")
+    )
+    assert results == [COMMAND_SUPERSEDED, COMMAND_DONE]
+    assert mock_api.send_command.call_count == 1
+    assert mock_api.send_command.call_args.args[1] == "lock"
+
+
+async def test_unconfirmed_command_times_out(
+    commands: CommandQueue, mock_api: AsyncMock
+) -> None:
+    """A command whose target state is never reported times out."""
+    assert await commands.async_send("hvac_on") == COMMAND_TIMEOUT
+    assert commands.as_dict()["in_progress"] == []
+
+
+async def test_send_error_is_raised(
+    hass: HomeAssistant, commands: CommandQueue, mock_api: AsyncMock
+) -> None:
+    """Errors of the command request reach the caller."""
+    mock_api.send_command.side_effect = NIOApiResponseError("command_failed")
+    with pytest.raises(NIOApiResponseError):
+        await commands.async_send("lock")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SEND_COMMAND,
+        {"command": "lock"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["vehicles"]["ES8-1"]["result"] == "error"
@@ -0,0 +1,129 @@
+"""Tests for the NIO Vehicle config flow."""
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.nio_vehicle.api import (
+    NIOApiAuthError,
+    NIOApiConnectionError,
+    NIOApiResponseError,
+)
+from custom_components.nio_vehicle.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_APP_VERSION,
+    CONF_DEVICE_ID,
+    CONF_PUSH_TRANSPORT,
+    CONF_PUSH_URL,
+    CONF_REPLAY_PATH,
+    CONF_SIGN,
+    CONF_TIMESTAMP,
+    DOMAIN,
+    PUSH_REPLAY,
+    PUSH_STREAM,
+)
+
+from .conftest import MOCK_DATA, setup_integration
+
+REAUTH_INPUT = {
+    CONF_ACCESS_TOKEN: "new-token",
+    CONF_SIGN: "new-sign",
+    CONF_TIMESTAMP: "1711929600",
+    CONF_DEVICE_ID: "device",
+    CONF_APP_VERSION: "5.3.0",
+}
+
+
+async def test_user_step(hass: HomeAssistant, mock_api: AsyncMock) -> None:
+    """Valid credentials create an entry."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] == FlowResultType.FORM
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], MOCK_DATA
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == "NIO Vehicle (ES8-1)"
+    assert result["data"] == MOCK_DATA
+    await hass.async_block_till_done()
+
+
+async def test_user_step_errors(hass: HomeAssistant, mock_api: AsyncMock) -> None:
+    """Only authentication errors are reported as invalid credentials."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    for error, reason in (
+        (NIOApiAuthError("invalid_token"), "invalid_auth"),
+        (NIOApiResponseError("system_busy"), "cannot_connect"),
+        (NIOApiConnectionError("Timeout error"), "cannot_connect"),
+        (RuntimeError, "unknown"),
+    ):
+        mock_api.side_effect = error
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], MOCK_DATA
+        )
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": reason}
+
+
+async def test_reauth(hass: HomeAssistant, mock_api: AsyncMock) -> None:
+    """New credentials update the loaded entry, which reloads once."""
+    entry = await setup_integration(hass)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_REAUTH, "entry_id": entry.entry_id},
+        data=entry.data,
+    )
+    assert result["step_id"] == "reauth_confirm"
+    with patch.object(
+        hass.config_entries, "async_reload", wraps=hass.config_entries.async_reload
+    ) as reload:
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], REAUTH_INPUT
+        )
+        await hass.async_block_till_done()
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert entry.data[CONF_ACCESS_TOKEN] == "new-token"
+    # 只由更新监听器重新加载一次
+    reload.assert_called_once_with(entry.entry_id)
+    assert entry.state is config_entries.ConfigEntryState.LOADED
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_options(hass: HomeAssistant, tmp_path: Path) -> None:
+    """The push options are validated."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_DATA)
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_PUSH_TRANSPORT: PUSH_STREAM}
+    )
+    assert result["errors"] == {CONF_PUSH_URL: "push_url_required"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_PUSH_TRANSPORT: PUSH_REPLAY, CONF_REPLAY_PATH: str(tmp_path / "none")},
+    )
+    assert result["errors"] == {CONF_REPLAY_PATH: "replay_path_not_found"}
+
+    recording = tmp_path / "es8_1.jsonl.gz"
+    recording.write_bytes(b"")
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_PUSH_TRANSPORT: PUSH_REPLAY, CONF_REPLAY_PATH: str(recording)},
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_REPLAY_PATH] == str(recording)
@@ -0,0 +1,80 @@
+"""Tests for the NIO Vehicle data update coordinator."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, Mock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+
+from custom_components.nio_vehicle.api import NIOApiResponseError
+from custom_components.nio_vehicle.const import DOMAIN
+
+from .conftest import MOCK_STATUS, setup_integration
+
+
+async def test_unchanged_poll_writes_no_state(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """Listeners are only notified of the groups that changed."""
+    entry = await setup_integration(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    soc_listener = Mock()
+    tyre_listener = Mock()
+    entry.async_on_unload(coordinator.async_add_listener(soc_listener, frozenset({"soc"})))
+    entry.async_on_unload(
+        coordinator.async_add_listener(tyre_listener, frozenset({"tyre"}))
+    )
+
+    with patch.object(
+        Entity,
+        "async_write_ha_state",
+        autospec=True,
+        side_effect=Entity.async_write_ha_state,
+    ) as write_state:
+        await coordinator.async_refresh()
+        assert mock_api.call_count == 2
+        # 凭据年龄随时间变化，不读取状态字段组，每次轮询都会写入
+        assert {call.args[0].entity_id for call in write_state.call_args_list} == {
+            "sensor.nio_s8_1_credential_age"
+        }
+        soc_listener.assert_not_called()
+        tyre_listener.assert_not_called()
+
+        mock_api.return_value = {
+            **MOCK_STATUS,
+            "soc_status": {**MOCK_STATUS["soc_status"], "soc": 70},
+        }
+        write_state.reset_mock()
+        await coordinator.async_refresh()
+        soc_listener.assert_called_once()
+        tyre_listener.assert_not_called()
+        written = {call.args[0].entity_id for call in write_state.call_args_list}
+        assert "sensor.nio_s8_1_battery" in written
+        assert not any("tyre" in entity_id for entity_id in written)
+
+    assert hass.states.get("sensor.nio_s8_1_battery").state == "70"
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_failed_poll_notifies_all_listeners(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """Availability changes reach every listener."""
+    entry = await setup_integration(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    tyre_listener = Mock()
+    entry.async_on_unload(
+        coordinator.async_add_listener(tyre_listener, frozenset({"tyre"}))
+    )
+
+    mock_api.side_effect = NIOApiResponseError("system_busy")
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    tyre_listener.assert_called_once()
+    assert hass.states.get("sensor.nio_s8_1_tyre_front_left").state == "unavailable"
+
+    mock_api.side_effect = None
+    await coordinator.async_refresh()
+    assert tyre_listener.call_count == 2
+    assert hass.states.get("sensor.nio_s8_1_tyre_front_left").state == "2.5"
+    await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,49 @@
+"""Tests for the credential lifecycle."""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from custom_components.nio_vehicle.credentials import CredentialInfo
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
+def test_from_data() -> None:
+    """The signed time and the JWT expiry are read from the entry data."""
+    info = CredentialInfo.from_data(
+        {
+            "access_token": _jwt({"exp": (NOW + timedelta(days=10)).timestamp()}),
+            # 毫秒时间戳
+            "timestamp": str(int((NOW - timedelta(days=2)).timestamp() * 1000)),
+        }
+    )
+    assert info.age(NOW) == timedelta(days=2)
+    assert info.expires_in(NOW) == timedelta(days=10)
+
+
+def test_opaque_token() -> None:
+    """Tokens that are not JWTs have no known expiry."""
+    info = CredentialInfo.from_data({"access_token": "token", "timestamp": "x"})
+    assert info.age(NOW) is None
+    assert info.expires_in(NOW) is None
+    assert info.as_dict(NOW) == {
+        "signed_at": None,
+        "age_days": None,
+        "expires_at": None,
+        "expires_in_days": None,
+    }
+
+
+def test_as_dict_zero_durations() -> None:
+    """A zero age or remaining lifetime is reported, not dropped."""
+    info = CredentialInfo(signed_at=NOW, expires_at=NOW)
+    data = info.as_dict(NOW)
+    assert data["age_days"] == 0
+    assert data["expires_in_days"] == 0
@@ -0,0 +1,43 @@
+"""Tests for the NIO Vehicle diagnostics."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.const import CONF_ENABLE_METRICS
+from custom_components.nio_vehicle.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from .conftest import setup_integration
+
+
+async def test_diagnostics(hass: HomeAssistant, mock_api: AsyncMock) -> None:
+    """Credentials and the position are redacted, metrics are included."""
+    entry = await setup_integration(hass, options={CONF_ENABLE_METRICS: True})
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    data = diagnostics["entry"]["data"]
+    assert data["access_token"] == REDACTED
+    assert data["sign"] == REDACTED
+    assert data["vehicle_id"] == REDACTED
+    assert diagnostics["snapshot"]["position"]["latitude"] == REDACTED
+    assert diagnostics["snapshot"]["soc"]["soc"] == 80
+    assert diagnostics["coordinator"]["last_update_success"]
+
+    metrics = diagnostics["metrics"]
+    assert metrics["successes"] == 1
+    total = metrics["phases_ms"]["total"]
+    assert total["count"] == 1
+    assert total["p50"] == total["p95"] == total["max"]
+
+
+async def test_diagnostics_without_metrics(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """Metrics are only collected when enabled."""
+    entry = await setup_integration(hass)
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["metrics"] is None
@@ -0,0 +1,105 @@
+"""Tests for the rolling efficiency statistics."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from custom_components.nio_vehicle.const import EFFICIENCY_SAMPLE_DISTANCE
+from custom_components.nio_vehicle.efficiency import (
+    MILEAGE,
+    EfficiencyWindow,
+    compute_efficiency,
+)
+from custom_components.nio_vehicle.model import (
+    ExteriorStatus,
+    HvacStatus,
+    SocStatus,
+    VehicleSnapshot,
+)
+
+START = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(
+    index: int,
+    mileage: float,
+    soc: float,
+    temperature: float | None = 20.0,
+    charge_state: int = 0,
+) -> VehicleSnapshot:
+    return VehicleSnapshot(
+        START + timedelta(minutes=index),
+        soc=SocStatus(
+            soc=soc,
+            charge_state=charge_state,
+            remaining_range=soc * 5,
+            remaining_actual_range=soc * 4,
+        ),
+        exterior=ExteriorStatus(mileage=mileage),
+        hvac=HvacStatus(outside_temperature=temperature),
+    )
+
+
+def test_window_only_samples_on_movement() -> None:
+    """Stationary snapshots do not add samples."""
+    window = EfficiencyWindow()
+    assert window.add(_snapshot(0, 1000, 80))
+    assert not window.add(_snapshot(1, 1000 + EFFICIENCY_SAMPLE_DISTANCE / 2, 80))
+    assert window.add(_snapshot(2, 1000 + EFFICIENCY_SAMPLE_DISTANCE, 79))
+    # 充电状态变化即使不动也要记录
+    assert window.add(_snapshot(3, 1000 + EFFICIENCY_SAMPLE_DISTANCE, 79, charge_state=1))
+    assert len(window) == 3
+    assert not window.add(VehicleSnapshot(START))
+
+
+def test_window_is_a_ring_buffer() -> None:
+    """Old samples are overwritten and returned oldest first."""
+    window = EfficiencyWindow(size=4)
+    for index in range(6):
+        window.add(_snapshot(index, 1000 + index * 10, 80 - index))
+    assert len(window) == 4
+    assert window.added == 6
+    np.testing.assert_array_equal(window.samples()[:, MILEAGE], [1020, 1030, 1040, 1050])
+
+
+def test_consumption() -> None:
+    """Consumption is computed over driving intervals."""
+    window = EfficiencyWindow()
+    for index in range(11):
+        # 每 10 公里消耗 2%
+        window.add(_snapshot(index, 1000 + index * 10, 80 - index * 2))
+    stats = compute_efficiency(window.samples())
+    assert stats.distance == 100.0
+    assert stats.consumption == 20.0
+    assert stats.distance_per_soc == 5.0
+    assert stats.range_ratio == pytest.approx(1.25)
+    assert stats.by_temperature == {"20..30": 20.0}
+    assert stats.samples == 11
+
+
+def test_charging_intervals_are_excluded() -> None:
+    """The SOC gained while charging does not count as negative consumption."""
+    window = EfficiencyWindow()
+    window.add(_snapshot(0, 1000, 80))
+    window.add(_snapshot(1, 1030, 74))
+    window.add(_snapshot(2, 1030, 74, charge_state=1))
+    window.add(_snapshot(3, 1031, 90, temperature=-5))
+    window.add(_snapshot(4, 1061, 84, temperature=-5))
+    stats = compute_efficiency(window.samples())
+    assert stats.distance == 60.0
+    assert stats.consumption == 20.0
+    assert stats.by_temperature == {"20..30": 20.0, "-10..0": 20.0}
+
+
+def test_too_little_distance() -> None:
+    """Short windows only report the range ratio."""
+    window = EfficiencyWindow()
+    assert compute_efficiency(window.samples()) is None
+    window.add(_snapshot(0, 1000, 80))
+    window.add(_snapshot(1, 1005, 79))
+    stats = compute_efficiency(window.samples())
+    assert stats.consumption is None
+    assert stats.distance == 5.0
+    assert stats.range_ratio == pytest.approx(1.25)
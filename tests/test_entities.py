@@ -0,0 +1,129 @@
+"""Tests for the sensor and binary sensor tables."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.nio_vehicle.binary_sensor import BINARY_SENSORS
+from custom_components.nio_vehicle.const import DOMAIN, TYRE_POSITIONS
+from custom_components.nio_vehicle.model import VehicleSnapshot, compile_path
+from custom_components.nio_vehicle.sensor import SENSORS
+
+from .conftest import MOCK_STATUS, setup_integration
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+# 早期版本中的 unique_id，改名会让用户丢失实体历史
+LEGACY_UNIQUE_IDS = {
+    "sensor": (
+        "battery",
+        "range",
+        "actual_range",
+        *(f"tyre_pressure_{position}" for position in TYRE_POSITIONS),
+        "temperature",
+        "mileage",
+    ),
+    "binary_sensor": (
+        "door_lock",
+        *(f"door_{position}" for position in TYRE_POSITIONS),
+        "door_trunk",
+        "charging_port",
+        "charging",
+    ),
+}
+
+STATUS = {
+    **MOCK_STATUS,
+    "soc_status": {"soc": 80, "remaining_range": 400, "charge_state": 2},
+    "door_status": {
+        "vehicle_lock_status": 0,
+        "door_ajar_front_left_status": 0,
+        "door_ajar_front_right_status": 1,
+        "door_ajar_rear_left_status": 1,
+        "door_ajar_rear_right_status": 1,
+        "tailgate_ajar_status": 1,
+        "second_charge_port_ajar_status": 0,
+    },
+    "window_status": {"window_ajar_front_left_status": 1, "sun_roof_ajar_status": 0},
+}
+
+
+def test_keys_unique() -> None:
+    """Every description has its own key, so unique IDs never collide."""
+    for descriptions in (SENSORS, BINARY_SENSORS):
+        keys = [description.key for description in descriptions]
+        assert len(keys) == len(set(keys))
+
+
+@pytest.mark.parametrize(
+    ("key", "expected"),
+    [
+        ("door_lock", True),
+        ("door_front_left", True),
+        ("door_front_right", False),
+        ("door_trunk", False),
+        ("charging_port", True),
+        ("charging", True),
+        ("window_front_left", False),
+        ("window_rear_left", None),
+        ("sunroof", True),
+        ("air_conditioning", False),
+    ],
+)
+def test_binary_sensor_values(key: str, expected: bool | None) -> None:
+    """The on functions map raw status values to binary states."""
+    description = next(d for d in BINARY_SENSORS if d.key == key)
+    snapshot = VehicleSnapshot.from_status(STATUS, NOW)
+    assert description.on_fn(compile_path(description.path)(snapshot)) is expected
+
+
+def test_binary_sensor_unknown_values() -> None:
+    """Missing attributes are unknown rather than closed or not charging."""
+    snapshot = VehicleSnapshot.from_status(
+        {"soc_status": {"soc": 80}, "door_status": {}}, NOW
+    )
+    for key in ("door_lock", "door_front_left", "charging_port", "charging"):
+        description = next(d for d in BINARY_SENSORS if d.key == key)
+        assert description.on_fn(compile_path(description.path)(snapshot)) is None
+
+
+async def test_unique_ids_stable(
+    hass: HomeAssistant, entity_registry: er.EntityRegistry, mock_api: AsyncMock
+) -> None:
+    """Entities keep the unique IDs of earlier versions."""
+    await setup_integration(hass)
+    for platform, keys in LEGACY_UNIQUE_IDS.items():
+        for key in keys:
+            assert entity_registry.async_get_entity_id(
+                platform, DOMAIN, f"ES8-1_{key}"
+            ), key
+
+
+async def test_entity_states(
+    hass: HomeAssistant, entity_registry: er.EntityRegistry, mock_api: AsyncMock
+) -> None:
+    """Entity states follow the status of the sample vehicle."""
+    mock_api.return_value = STATUS
+    await setup_integration(hass)
+
+    def state(platform: str, key: str) -> str:
+        entity_id = entity_registry.async_get_entity_id(
+            platform, DOMAIN, f"ES8-1_{key}"
+        )
+        return hass.states.get(entity_id).state
+
+    assert state("binary_sensor", "door_lock") == STATE_ON
+    assert state("binary_sensor", "door_front_left") == STATE_ON
+    assert state("binary_sensor", "door_rear_right") == STATE_OFF
+    assert state("binary_sensor", "charging_port") == STATE_ON
+    assert state("binary_sensor", "charging") == STATE_ON
+    assert state("sensor", "battery") == "80"
+    assert state("sensor", "range") == "400"
+    assert state("sensor", "tyre_pressure_rear_left") == "2.6"
+    assert state("sensor", "mileage") == "12345.6"
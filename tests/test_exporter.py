@@ -0,0 +1,94 @@
+"""Tests for the OpenMetrics exporter."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from custom_components.nio_vehicle.exporter import EXPORTED_FIELDS, MetricsExporter
+from custom_components.nio_vehicle.model import VehicleSnapshot
+
+FETCHED_AT = datetime(2024, 3, 1, tzinfo=timezone.utc)
+STATUS = {
+    "soc_status": {"soc": 80, "charge_state": 0},
+    "door_status": {"vehicle_lock_status": 1, "door_ajar_front_left_status": 0},
+    "tyre_status": {"front_left_wheel_press_bar": 2.5},
+}
+
+
+def _coordinator(vehicle_id: str = "ES8-1") -> SimpleNamespace:
+    return SimpleNamespace(
+        vehicle_id=vehicle_id,
+        config_entry=SimpleNamespace(entry_id=f"entry_{vehicle_id}"),
+        data=VehicleSnapshot.from_status(STATUS, FETCHED_AT),
+        last_update_success=True,
+        update_interval=timedelta(minutes=5),
+        breaker=SimpleNamespace(failures=0),
+        async_add_listener=Mock(return_value=Mock()),
+    )
+
+
+def test_render() -> None:
+    """The snapshot is rendered as OpenMetrics text."""
+    exporter = MetricsExporter()
+    coordinator = _coordinator()
+    exporter.async_register(coordinator)
+    coordinator.async_add_listener.assert_called_once()
+    assert coordinator.async_add_listener.call_args.args[1] == EXPORTED_FIELDS
+
+    lines = exporter.async_render().decode().splitlines()
+    assert 'nio_vehicle_soc_percent{vehicle="ES8-1"} 80.0' in lines
+    assert (
+        'nio_vehicle_tyre_pressure_bar{vehicle="ES8-1",position="front_left"} 2.5'
+        in lines
+    )
+    assert 'nio_vehicle_locked{vehicle="ES8-1"} 1' in lines
+    assert 'nio_vehicle_door_open{vehicle="ES8-1",door="front_left"} 1' in lines
+    assert 'nio_vehicle_charging{vehicle="ES8-1"} 0' in lines
+    assert 'nio_vehicle_up{vehicle="ES8-1"} 1' in lines
+    assert 'nio_vehicle_update_interval_seconds{vehicle="ES8-1"} 300.0' in lines
+    assert "# UNIT nio_vehicle_soc_percent percent" in lines
+    # 缺少数据的样本不输出，指标族的元数据仍保留
+    assert not any(line.startswith("nio_vehicle_mileage_kilometers{") for line in lines)
+    assert "# TYPE nio_vehicle_mileage_kilometers gauge" in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_render_is_cached() -> None:
+    """The body is only rendered again when a vehicle changed."""
+    exporter = MetricsExporter()
+    coordinator = _coordinator()
+    exporter.async_register(coordinator)
+    body = exporter.async_render()
+    assert exporter.async_render() is body
+    assert exporter.as_dict() == {"vehicles": 1, "scrapes": 2, "renders": 1}
+
+    coordinator.data = coordinator.data.merge_status(
+        {"soc_status": {"soc": 79}}, FETCHED_AT + timedelta(minutes=5)
+    )
+    assert b'nio_vehicle_soc_percent{vehicle="ES8-1"} 79.0' in exporter.async_render()
+    coordinator.breaker.failures = 2
+    coordinator.last_update_success = False
+    body = exporter.async_render()
+    assert b'nio_vehicle_up{vehicle="ES8-1"} 0' in body
+    assert b'nio_vehicle_consecutive_failures{vehicle="ES8-1"} 2' in body
+    assert exporter.renders == 3
+
+
+def test_vehicles_are_grouped_by_family() -> None:
+    """Samples of all vehicles follow the header of their family."""
+    exporter = MetricsExporter()
+    first, second = _coordinator("ES8-1"), _coordinator('ET7 "2"')
+    exporter.async_register(first)
+    unregister = exporter.async_register(second)
+    lines = exporter.async_render().decode().splitlines()
+    start = lines.index("# HELP nio_vehicle_soc_percent State of charge.")
+    assert lines[start + 1 : start + 3] == [
+        'nio_vehicle_soc_percent{vehicle="ES8-1"} 80.0',
+        'nio_vehicle_soc_percent{vehicle="ET7 \\"2\\""} 80.0',
+    ]
+
+    unregister()
+    second.async_add_listener.return_value.assert_called_once()
+    assert b"ET7" not in exporter.async_render()
+    assert exporter.as_dict()["vehicles"] == 1
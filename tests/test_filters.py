@@ -0,0 +1,82 @@
+"""Tests for the sensor publish filter."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.const import DOMAIN, SERVICE_SET_FILTER
+from custom_components.nio_vehicle.filters import PublishFilter
+
+from .conftest import MOCK_STATUS, setup_integration
+
+TYRE = "sensor.nio_s8_1_tyre_rear_left"
+
+
+def test_first_value_is_published() -> None:
+    """A filter that never published publishes immediately."""
+    assert PublishFilter(deadband=5).delay(10.0, 0) == 0.0
+
+
+def test_deadband_suppresses_small_changes() -> None:
+    """Changes inside the deadband wait for the heartbeat."""
+    publish_filter = PublishFilter(deadband=1.0, heartbeat=600)
+    publish_filter.publish(50.0, 0)
+    assert publish_filter.delay(50.0, 10) is None
+    assert publish_filter.delay(50.5, 10) == 590
+    assert publish_filter.delay(51.0, 10) == 0.0
+    assert publish_filter.delay(50.5, 600) == 0.0
+
+
+def test_hysteresis_on_reversal() -> None:
+    """Reversing the last change needs the deadband plus the hysteresis."""
+    publish_filter = PublishFilter(deadband=1.0, hysteresis=0.5, heartbeat=600)
+    publish_filter.publish(50.0, 0)
+    publish_filter.publish(51.0, 10)
+    # 继续上升只需跨过死区
+    assert publish_filter.delay(52.0, 20) == 0.0
+    # 反向变化需要额外的回差
+    assert publish_filter.delay(50.0, 20) == 590
+    assert publish_filter.delay(49.5, 20) == 0.0
+
+
+def test_min_interval_delays_changes() -> None:
+    """Significant changes are rate limited."""
+    publish_filter = PublishFilter(min_interval=30)
+    publish_filter.publish(1.0, 100)
+    assert publish_filter.delay(2.0, 110) == 20
+    assert publish_filter.delay(2.0, 140) == 0.0
+
+
+def test_unavailable_values_bypass_the_deadband() -> None:
+    """Switching to or from None is always a significant change."""
+    publish_filter = PublishFilter(deadband=10)
+    publish_filter.publish(1.0, 0)
+    assert publish_filter.delay(None, 1) == 0.0
+    publish_filter.publish(None, 1)
+    assert publish_filter.delay(1.5, 2) == 0.0
+    assert publish_filter.direction == 0
+
+
+async def test_set_filter_applies_immediately(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """Changing the filter publishes the value held back by the old one."""
+    entry = await setup_integration(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert hass.states.get(TYRE).state == "2.6"
+
+    # 默认 0.05 bar 死区内的变化不写入
+    mock_api.return_value = {
+        **MOCK_STATUS,
+        "tyre_status": {**MOCK_STATUS["tyre_status"], "rear_left_wheel_press_bar": 2.62},
+    }
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(TYRE).state == "2.6"
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_SET_FILTER, {"entity_id": TYRE, "deadband": 0}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(TYRE).state == "2.62"
@@ -0,0 +1,99 @@
+"""Tests for the fleet-wide request scheduler."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from custom_components.nio_vehicle.const import FLEET_JITTER_RATIO
+from custom_components.nio_vehicle.fleet import FleetScheduler
+
+MIN = timedelta(seconds=15)
+MAX = timedelta(minutes=30)
+
+
+async def _poll(fleet: FleetScheduler, vehicle_id: str) -> None:
+    async with fleet.slot(vehicle_id):
+        pass
+
+
+async def test_unregistered_vehicle_is_clamped() -> None:
+    """Without statistics the interval is only clamped."""
+    fleet = FleetScheduler(4)
+    interval = timedelta(minutes=5)
+    assert fleet.next_interval("v1", interval, MIN, MAX) == interval
+    assert fleet.next_interval("v1", timedelta(seconds=1), MIN, MAX) == MIN
+    assert fleet.next_interval("v1", timedelta(hours=2), MIN, MAX) == MAX
+
+
+async def test_first_poll_phase_offset() -> None:
+    """The first interval spreads vehicles over 0.5 to 1.5 intervals."""
+    fleet = FleetScheduler(4)
+    interval = timedelta(minutes=5)
+    offsets = set()
+    for index in range(50):
+        vehicle_id = f"vehicle{index}"
+        fleet.async_register(vehicle_id)
+        await _poll(fleet, vehicle_id)
+        result = fleet.next_interval(vehicle_id, interval, MIN, MAX)
+        assert interval * 0.5 <= result < interval * 1.5
+        offsets.add(result)
+        # 相位由车辆 ID 决定，重复计算结果不变
+        assert fleet.next_interval(vehicle_id, interval, MIN, MAX) == result
+    assert len(offsets) == 50
+
+
+async def test_jitter_stays_within_bounds() -> None:
+    """Later intervals jitter by at most the ratio and never leave the bounds."""
+    fleet = FleetScheduler(4)
+    fleet.async_register("v1")
+    for _ in range(200):
+        await _poll(fleet, "v1")
+        result = fleet.next_interval("v1", timedelta(minutes=5), MIN, MAX)
+        if fleet.stats("v1")["polls"] > 1:
+            assert abs(result / timedelta(minutes=5) - 1) <= FLEET_JITTER_RATIO
+        # 已经在边界上的间隔抖动后仍然在边界内
+        assert fleet.next_interval("v1", MIN, MIN, MAX) >= MIN
+        assert fleet.next_interval("v1", MAX, MIN, MAX) <= MAX
+
+
+async def test_slot_limits_concurrency() -> None:
+    """No more requests than allowed are in flight at the same time."""
+    fleet = FleetScheduler(2)
+    peak = 0
+
+    async def _request(vehicle_id: str) -> None:
+        nonlocal peak
+        async with fleet.slot(vehicle_id):
+            peak = max(peak, fleet.in_flight)
+            await asyncio.sleep(0.01)
+
+    for index in range(6):
+        fleet.async_register(f"v{index}")
+    await asyncio.gather(*(_request(f"v{index}") for index in range(6)))
+    assert peak == 2
+    assert fleet.in_flight == 0
+    assert fleet.stats("v5")["polls"] == 1
+    assert fleet.stats("v5")["max_queue_delay"] > 0
+
+
+async def test_unregister_drops_statistics() -> None:
+    """Unregistered vehicles no longer report statistics."""
+    fleet = FleetScheduler(1)
+    unregister = fleet.async_register("v1")
+    await _poll(fleet, "v1")
+    assert fleet.stats("v1")["polls"] == 1
+    unregister()
+    assert fleet.stats("v1") == {}
+
+
+@pytest.mark.parametrize("max_concurrent", [1, 3])
+async def test_slot_releases_on_error(max_concurrent: int) -> None:
+    """A failing request frees its slot."""
+    fleet = FleetScheduler(max_concurrent)
+    with pytest.raises(RuntimeError):
+        async with fleet.slot("v1"):
+            raise RuntimeError
+    assert fleet.in_flight == 0
+    await asyncio.wait_for(_poll(fleet, "v1"), 1)
@@ -0,0 +1,115 @@
+"""Tests for the offline reverse geocoding."""
+from __future__ import annotations
+
+from pathlib import Path
+import random
+
+from custom_components.nio_vehicle.const import GEOCODE_MAX_DISTANCE_M
+from custom_components.nio_vehicle.geocode import (
+    Geocoder,
+    Place,
+    encode_geohash,
+    load_geocoder,
+)
+from custom_components.nio_vehicle.util import distance_m
+
+SHANGHAI = (31.2304, 121.4737)
+
+
+def test_encode_geohash() -> None:
+    """Geohashes match the reference encoding."""
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(*SHANGHAI, 5) == "wtw3s"
+
+
+def test_nearest_place_matches_brute_force() -> None:
+    """The grid search finds the same place as a linear scan."""
+    generator = random.Random(1)
+    places = [
+        Place(
+            f"place {index}",
+            SHANGHAI[0] + generator.uniform(-0.2, 0.2),
+            SHANGHAI[1] + generator.uniform(-0.2, 0.2),
+        )
+        for index in range(500)
+    ]
+    geocoder = Geocoder(places)
+    for _ in range(200):
+        latitude = SHANGHAI[0] + generator.uniform(-0.2, 0.2)
+        longitude = SHANGHAI[1] + generator.uniform(-0.2, 0.2)
+        distance, nearest = min(
+            (distance_m(latitude, longitude, p.latitude, p.longitude), p.name)
+            for p in places
+        )
+        place, found = geocoder._nearest(latitude, longitude)
+        if distance > GEOCODE_MAX_DISTANCE_M:
+            assert place is None
+        else:
+            assert place.name == nearest
+            assert found == distance
+
+
+def test_nothing_nearby() -> None:
+    """Points far away from every place have no match."""
+    match = Geocoder([Place("Depot", *SHANGHAI)]).lookup(39.9042, 116.4074)
+    assert match.place is None
+    assert match.distance is None
+    assert match.geofences == ()
+
+
+def test_geofences() -> None:
+    """A point is inside the geofences whose radius contains it."""
+    geocoder = Geocoder(
+        [
+            Place("Depot", *SHANGHAI, category="depot", radius=200),
+            Place("Campus", SHANGHAI[0] + 0.01, SHANGHAI[1], radius=2000),
+        ]
+    )
+    match = geocoder.lookup(SHANGHAI[0] + 0.001, SHANGHAI[1])
+    assert match.place == "Depot"
+    assert match.category == "depot"
+    assert match.distance == 111
+    assert set(match.geofences) == {"Depot", "Campus"}
+    # 约 330 米，超出车场半径
+    assert geocoder.lookup(SHANGHAI[0] + 0.003, SHANGHAI[1]).geofences == ("Campus",)
+
+
+def test_lookups_are_cached() -> None:
+    """Nearby lookups reuse the cached nearest place."""
+    geocoder = Geocoder([Place("Depot", *SHANGHAI)])
+    geocoder.lookup(*SHANGHAI)
+    geocoder.lookup(SHANGHAI[0] + 0.00001, SHANGHAI[1])
+    assert geocoder.as_dict() == {
+        "places": 1,
+        "cached_cells": 1,
+        "cache_hits": 1,
+        "cache_misses": 1,
+    }
+
+
+def test_load_csv(tmp_path: Path) -> None:
+    """Places are read from a CSV file, skipping invalid rows."""
+    path = tmp_path / "places.csv"
+    path.write_text(
+        "name,latitude,longitude,category,radius\n"
+        "Depot,31.2304,121.4737,depot,150\n"
+        "Broken,north,121.4737,,\n"
+        "Home,31.2404,121.4737,,\n",
+        encoding="utf-8",
+    )
+    geocoder = load_geocoder(path)
+    assert geocoder.size == 2
+    assert geocoder.lookup(*SHANGHAI).geofences == ("Depot",)
+
+
+def test_load_geonames(tmp_path: Path) -> None:
+    """Places are read from a GeoNames dump."""
+    path = tmp_path / "cities500.txt"
+    path.write_text(
+        "1796236\tShanghai\tShanghai\t\t31.22222\t121.45806\tP\tPPLA\tCN\n"
+        "truncated line\n",
+        encoding="utf-8",
+    )
+    match = load_geocoder(path).lookup(*SHANGHAI)
+    assert match.place == "Shanghai"
+    assert match.category == "PPLA"
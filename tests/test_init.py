@@ -0,0 +1,214 @@
+"""Tests for setting up the NIO Vehicle integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.nio_vehicle.api import NIOApiConnectionError
+from custom_components.nio_vehicle.const import (
+    ATTR_CACHED_AT,
+    CACHE_MAX_AGE,
+    CONF_ENABLE_COMMANDS,
+    DOMAIN,
+    SERVICE_GET_TRAIL,
+    SERVICE_GET_TRIPS,
+    SERVICE_REFRESH,
+    SERVICE_SEND_COMMAND,
+)
+from custom_components.nio_vehicle.model import VehicleSnapshot
+
+from .conftest import MOCK_DATA, MOCK_STATUS, setup_integration
+
+
+async def test_setup_and_unload(hass: HomeAssistant, mock_api: AsyncMock) -> None:
+    """The entry loads, polls the vehicle and registers the services."""
+    entry = await setup_integration(hass)
+    assert entry.state is ConfigEntryState.LOADED
+    assert mock_api.called
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.data.soc.soc == 80
+    assert coordinator.commands is None
+    for service in (SERVICE_GET_TRAIL, SERVICE_GET_TRIPS, SERVICE_REFRESH):
+        assert hass.services.has_service(DOMAIN, service)
+    assert not hass.services.has_service(DOMAIN, SERVICE_SEND_COMMAND)
+    assert hass.states.get("sensor.nio_s8_1_battery").state == "80"
+    assert hass.states.get("binary_sensor.nio_s8_1_lock").state == "off"
+    tracker = hass.states.get("device_tracker.nio_s8_1_location")
+    assert tracker.attributes["latitude"] == 31.2304
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert entry.entry_id not in hass.data[DOMAIN]
+
+
+async def test_first_refresh_requests_entity_fields(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """Startup polls once, including the groups of all enabled entities."""
+    entity_registry = er.async_get(hass)
+    for key in ("low_beam", "high_beam"):
+        entity_registry.async_get_or_create(
+            "binary_sensor",
+            DOMAIN,
+            f"ES8-1_{key}",
+            disabled_by=er.RegistryEntryDisabler.USER,
+        )
+    entry = await setup_integration(hass)
+    assert mock_api.call_count == 1
+    fields = set(mock_api.call_args.args[1])
+    assert {"soc", "door", "position", "tyre", "hvac", "window", "maintain"} <= fields
+    # 读取 light 的实体都已被禁用
+    assert "light" not in fields
+    assert hass.states.get("sensor.nio_s8_1_tyre_front_left").state != "unavailable"
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_refresh_service(hass: HomeAssistant, mock_api: AsyncMock) -> None:
+    """The refresh service skips the fetch while the snapshot is recent."""
+    entry = await setup_integration(hass)
+    calls = mock_api.call_count
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_REFRESH, {}, blocking=True, return_response=True
+    )
+    assert response["vehicles"]["ES8-1"]["refreshed"] is False
+    assert mock_api.call_count == calls
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_REFRESH, {"max_age": 0}, blocking=True, return_response=True
+    )
+    assert response["vehicles"]["ES8-1"]["refreshed"] is True
+    assert mock_api.call_count == calls + 1
+
+    # 快照中不保留的字段组无法判断是否已获取，不接受
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REFRESH, {"fields": ["fota"]}, blocking=True
+        )
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_REFRESH, {"fields": ["soc"]}, blocking=True, return_response=True
+    )
+    assert response["vehicles"]["ES8-1"]["refreshed"] is False
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_concurrent_refreshes_share_a_fetch(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """Refreshes started while a fetch is running wait for it."""
+    entry = await setup_integration(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    calls = mock_api.call_count
+    release = asyncio.Event()
+
+    async def _slow_status(*args: Any) -> dict:
+        await release.wait()
+        return MOCK_STATUS
+
+    mock_api.side_effect = _slow_status
+    refreshes = [
+        hass.async_create_task(coordinator.async_refresh_status(timedelta(0)))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    assert coordinator._refresh_task is not None
+    release.set()
+    assert await asyncio.gather(*refreshes) == [True, True, True]
+    assert mock_api.call_count == calls + 1
+    assert coordinator._refresh_task is None
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_send_command_is_opt_in(
+    hass: HomeAssistant, mock_api: AsyncMock
+) -> None:
+    """The command service only exists while an entry enabled commands."""
+    plain = await setup_integration(hass)
+    assert not hass.services.has_service(DOMAIN, SERVICE_SEND_COMMAND)
+
+    entry = await setup_integration(
+        hass, {CONF_ENABLE_COMMANDS: True}, vehicle_id="ES8-2"
+    )
+    assert hass.services.has_service(DOMAIN, SERVICE_SEND_COMMAND)
+    assert hass.data[DOMAIN][entry.entry_id].commands is not None
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert not hass.services.has_service(DOMAIN, SERVICE_SEND_COMMAND)
+    await hass.config_entries.async_unload(plain.entry_id)
+
+
+async def _setup_cached(
+    hass: HomeAssistant, hass_storage: dict, fetched_at: datetime
+) -> MockConfigEntry:
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_DATA, entry_id="cached")
+    hass_storage[f"{DOMAIN}.cached"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": f"{DOMAIN}.cached",
+        "data": VehicleSnapshot.from_status(MOCK_STATUS, fetched_at).as_dict(),
+    }
+    entry.add_to_hass(hass)
+    with patch("custom_components.nio_vehicle.resilience.API_RETRY_DELAY", 0):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    return entry
+
+
+async def test_cached_start_survives_api_outage(
+    hass: HomeAssistant, hass_storage: dict, mock_api: AsyncMock
+) -> None:
+    """Entities restored from the cache stay available until a poll succeeds."""
+    mock_api.side_effect = NIOApiConnectionError("Timeout error")
+    fetched_at = dt_util.utcnow() - timedelta(hours=1)
+    entry = await _setup_cached(hass, hass_storage, fetched_at)
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    # 后台刷新失败
+    assert mock_api.called
+    assert not coordinator.last_update_success
+
+    state = hass.states.get("sensor.nio_s8_1_battery")
+    assert state.state == "80"
+    assert state.attributes[ATTR_CACHED_AT] == fetched_at.isoformat()
+
+    mock_api.side_effect = None
+    await coordinator.async_refresh()
+    state = hass.states.get("sensor.nio_s8_1_battery")
+    assert state.state == "80"
+    assert ATTR_CACHED_AT not in state.attributes
+
+    # 实时数据获取后，失败的轮询照常使实体不可用
+    mock_api.side_effect = NIOApiConnectionError("Timeout error")
+    with patch("custom_components.nio_vehicle.resilience.API_RETRY_DELAY", 0):
+        await coordinator.async_refresh()
+    assert hass.states.get("sensor.nio_s8_1_battery").state == "unavailable"
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_stale_cache_is_unavailable(
+    hass: HomeAssistant, hass_storage: dict, mock_api: AsyncMock
+) -> None:
+    """A cache older than the limit does not hide an API outage."""
+    mock_api.side_effect = NIOApiConnectionError("Timeout error")
+    entry = await _setup_cached(
+        hass, hass_storage, dt_util.utcnow() - CACHE_MAX_AGE - timedelta(minutes=1)
+    )
+    assert hass.states.get("sensor.nio_s8_1_battery").state == "unavailable"
+    await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,72 @@
+"""Tests for the poll metrics."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.nio_vehicle.metrics import PollMetrics, RollingHistogram
+
+
+def test_empty_histogram() -> None:
+    """An empty window has no percentiles."""
+    histogram = RollingHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.as_dict() == {"count": 0}
+
+
+def test_single_value() -> None:
+    """Every percentile of a single value is that value."""
+    histogram = RollingHistogram()
+    histogram.add(0.2)
+    assert histogram.percentile(99) == 0.2
+    assert histogram.as_dict(1000) == {
+        "count": 1,
+        "p50": 200.0,
+        "p95": 200.0,
+        "max": 200.0,
+    }
+
+
+@pytest.mark.parametrize("count", [2, 3, 10, 100])
+def test_percentiles_within_range(count: int) -> None:
+    """Percentiles never leave the range of the values."""
+    rng = random.Random(count)
+    histogram = RollingHistogram()
+    values = [rng.expovariate(10) for _ in range(count)]
+    for value in values:
+        histogram.add(value)
+
+    for percent in range(1, 100):
+        assert min(values) <= histogram.percentile(percent) <= max(values)
+    summary = histogram.as_dict()
+    assert summary["p50"] <= summary["p95"] <= summary["max"]
+    assert summary["max"] == round(max(values), 2)
+
+
+def test_window_size() -> None:
+    """Only the most recent values are kept."""
+    histogram = RollingHistogram(size=3)
+    for value in (100.0, 1.0, 2.0, 3.0):
+        histogram.add(value)
+    assert histogram.as_dict()["count"] == 3
+    assert histogram.percentile(99) <= 3.0
+
+
+def test_poll_metrics() -> None:
+    """Poll outcomes are counted and durations reported in ms."""
+    metrics = PollMetrics()
+    metrics.record_poll(0.1, True)
+    metrics.record_poll(0.3, True)
+    metrics.record_poll(0.5, False)
+    data = metrics.as_dict()
+    assert data["successes"] == 2
+    assert data["failures"] == 1
+    assert data["success_ratio"] == 66.7
+    assert data["phases_ms"]["total"] == {
+        "count": 3,
+        "p50": 300.0,
+        "p95": 480.0,
+        "max": 500.0,
+    }
+    assert data["phases_ms"]["connect"] == {"count": 0}
@@ -0,0 +1,122 @@
+"""Tests for the parsed status snapshots."""
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError
+from datetime import datetime, timedelta, timezone
+import json
+
+import pytest
+
+from custom_components.nio_vehicle.model import (
+    DoorStatus,
+    SocStatus,
+    VehicleSnapshot,
+    compile_path,
+)
+
+FETCHED_AT = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+STATUS = {
+    "soc_status": {"soc": 80, "remaining_range": 400, "unknown_attribute": 1},
+    "door_status": {"vehicle_lock_status": 1, "tailgate_ajar_status": 1},
+    "exterior_status": {"mileage": 12345.6},
+    # 未建模的字段组和格式错误的字段组都被忽略
+    "fota_status": {"version": "5.2.0"},
+    "tyre_status": None,
+}
+
+
+def test_from_status() -> None:
+    """Modelled groups are parsed, missing attributes are None."""
+    snapshot = VehicleSnapshot.from_status(STATUS, FETCHED_AT)
+    assert snapshot.fetched_at == FETCHED_AT
+    assert not snapshot.restored
+    assert snapshot.soc == SocStatus(soc=80, remaining_range=400)
+    assert snapshot.door.vehicle_lock_status == 1
+    assert snapshot.door.door_ajar_front_left_status is None
+    assert snapshot.tyre is None
+    assert snapshot.group("fota") is None
+    assert snapshot.has_groups(("soc", "door", "exterior"))
+    assert not snapshot.has_groups(("soc", "tyre"))
+
+
+def test_snapshots_are_immutable() -> None:
+    """Snapshots and groups cannot be modified in place."""
+    snapshot = VehicleSnapshot.from_status(STATUS, FETCHED_AT)
+    with pytest.raises(FrozenInstanceError):
+        snapshot.soc = None
+    with pytest.raises(FrozenInstanceError):
+        snapshot.soc.soc = 10
+
+
+def test_merge_status() -> None:
+    """Pushed deltas update attributes and carry over everything else."""
+    snapshot = VehicleSnapshot.from_status(STATUS, FETCHED_AT)
+    later = FETCHED_AT + timedelta(minutes=1)
+    merged = snapshot.merge_status(
+        {
+            "soc_status": {"soc": 79},
+            "door_status": {"door_ajar_front_left_status": 0},
+            "hvac_status": {"air_con_on": 1},
+        },
+        later,
+    )
+    assert merged is not snapshot
+    assert merged.fetched_at == later
+    assert merged.soc == SocStatus(soc=79, remaining_range=400)
+    assert merged.door == DoorStatus(
+        vehicle_lock_status=1,
+        door_ajar_front_left_status=0,
+        tailgate_ajar_status=1,
+    )
+    assert merged.hvac.air_con_on == 1
+    assert merged.exterior is snapshot.exterior
+    # 原快照保持不变
+    assert snapshot.soc.soc == 80
+
+
+def test_dict_round_trip() -> None:
+    """A snapshot survives saving as JSON and is marked as restored."""
+    snapshot = VehicleSnapshot.from_status(STATUS, FETCHED_AT)
+    data = json.loads(json.dumps(snapshot.as_dict()))
+    assert set(data) == {"fetched_at", "soc", "door", "exterior"}
+    restored = VehicleSnapshot.from_dict(data)
+    assert restored.restored
+    assert restored.fetched_at == FETCHED_AT
+    for field in ("soc", "door", "exterior", "tyre"):
+        assert restored.group(field) == snapshot.group(field)
+
+
+def test_from_dict_ignores_unknown_groups() -> None:
+    """Caches written by other versions load what they can."""
+    restored = VehicleSnapshot.from_dict(
+        {
+            "fetched_at": FETCHED_AT.isoformat(),
+            "soc": {"soc": 50, "removed_attribute": 1},
+            "removed_group": {"value": 1},
+            "door": "invalid",
+        }
+    )
+    assert restored.soc == SocStatus(soc=50)
+    assert restored.door is None
+
+
+def test_compile_path() -> None:
+    """Accessors return None for missing groups and reject unknown ones."""
+    snapshot = VehicleSnapshot.from_status(STATUS, FETCHED_AT)
+    assert compile_path("soc.soc")(snapshot) == 80
+    assert compile_path("tyre.front_left_wheel_press_bar")(snapshot) is None
+    assert compile_path("soc.soc") is compile_path("soc.soc")
+    with pytest.raises(ValueError):
+        compile_path("fota.version")
+
+
+def test_status_predicates() -> None:
+    """Lock, charge port and charging states are decoded in one place."""
+    assert DoorStatus(vehicle_lock_status=1).locked is True
+    assert DoorStatus(vehicle_lock_status=0).locked is False
+    assert DoorStatus().locked is None
+    assert DoorStatus(second_charge_port_ajar_status=0).charge_port_open is True
+    assert DoorStatus(second_charge_port_ajar_status=1).charge_port_open is False
+    assert SocStatus(charge_state=3).charging is True
+    assert SocStatus(charge_state=0).charging is False
+    assert SocStatus().charging is None
@@ -0,0 +1,69 @@
+"""Tests for the push transports."""
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.push import StreamTransport, parse_message
+
+URL = "http://bridge.local/events/ES8-1"
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    [
+        ('{"soc_status": {"soc": 80}}', {"soc_status": {"soc": 80}}),
+        (b'{"data": {"soc_status": {"soc": 80}}}', {"soc_status": {"soc": 80}}),
+        (
+            '{"vehicle_id": "ES8-1", "data": {"soc_status": {"soc": 80}}}',
+            {"soc_status": {"soc": 80}},
+        ),
+        ('{"vehicle_id": "ET7-2", "data": {"soc_status": {"soc": 80}}}', None),
+        ('{"data": [1, 2]}', None),
+        ("[]", None),
+        ("not json", None),
+    ],
+)
+def test_parse_message(payload: str | bytes, expected: dict | None) -> None:
+    """Only status objects addressed to the vehicle are accepted."""
+    assert parse_message(payload, "ES8-1") == expected
+
+
+async def test_malformed_status_is_ignored(hass: HomeAssistant) -> None:
+    """A status the coordinator cannot apply does not break the transport."""
+    on_status = Mock(side_effect=[ValueError("bad mileage"), None])
+    transport = StreamTransport(hass, "ES8-1", on_status, Mock(), URL)
+    transport._async_handle_payload('{"exterior_status": {"mileage": "x"}}')
+    transport._async_handle_payload('{"soc_status": {"soc": 80}}')
+    assert on_status.call_count == 2
+    assert transport.messages == 2
+
+
+async def test_server_sent_events(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Events are parsed line by line, skipping broken ones."""
+    aioclient_mock.get(
+        URL,
+        content=(
+            b": heartbeat\n\n"
+            b'data: {"soc_status":\n'
+            b'data: {"soc": 80}}\n\n'
+            b"data: not json\n\n"
+            b'data: {"soc_status": {"soc": \xff}}\n\n'
+            b'data:{"door_status": {"vehicle_lock_status": 1}}\n\n'
+        ),
+    )
+    on_status = Mock()
+    on_connection = Mock()
+    transport = StreamTransport(hass, "ES8-1", on_status, on_connection, URL)
+    await transport._async_read_events()
+    assert [call.args[0] for call in on_status.call_args_list] == [
+        {"soc_status": {"soc": 80}},
+        {"door_status": {"vehicle_lock_status": 1}},
+    ]
+    on_connection.assert_called_once_with(True)
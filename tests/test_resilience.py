@@ -0,0 +1,160 @@
+"""Tests for the retry policy and the circuit breaker."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.api import (
+    NIOApiAuthError,
+    NIOApiCircuitOpenError,
+    NIOApiConnectionError,
+    NIOApiRateLimitError,
+    NIOApiResponseError,
+)
+from custom_components.nio_vehicle.resilience import (
+    STATE_AUTH_FAILED,
+    STATE_CLOSED,
+    STATE_OPEN,
+    CircuitBreaker,
+    async_call_with_retry,
+    async_get_circuit_breaker,
+)
+
+from .conftest import MOCK_DATA
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay():
+    """Retry immediately."""
+    with patch("custom_components.nio_vehicle.resilience.API_RETRY_DELAY", 0):
+        yield
+
+
+def test_breaker_opens_after_threshold() -> None:
+    """The breaker stays closed until the failure threshold is reached."""
+    breaker = CircuitBreaker(threshold=3, base_backoff=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert 48 <= breaker.retry_in() <= 72
+    with pytest.raises(NIOApiCircuitOpenError):
+        breaker.before_request()
+
+
+def test_backoff_grows_and_is_capped() -> None:
+    """Every trip doubles the backoff up to the maximum."""
+    breaker = CircuitBreaker(threshold=1, base_backoff=10, max_backoff=35)
+    retry_in = []
+    for _ in range(4):
+        breaker.record_failure()
+        retry_in.append(breaker.retry_in())
+    assert 8 <= retry_in[0] <= 12
+    assert 16 <= retry_in[1] <= 24
+    assert 28 <= retry_in[2] <= 42
+    assert retry_in[3] <= 35 * 1.2
+
+
+async def test_half_open_lets_one_probe_through() -> None:
+    """After the backoff a single probe is allowed, success closes the breaker."""
+    breaker = CircuitBreaker(threshold=1, base_backoff=0.01)
+    breaker.record_failure()
+    await asyncio.sleep(0.02)
+    breaker.before_request()
+    # 探测请求进行中，其他请求被拒绝
+    with pytest.raises(NIOApiCircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+    breaker.before_request()
+
+
+def test_auth_failure_blocks_until_success() -> None:
+    """Rejected credentials block requests until a success is recorded."""
+    breaker = CircuitBreaker()
+    breaker.record_auth_failure("invalid_token")
+    assert breaker.state == STATE_AUTH_FAILED
+    with pytest.raises(NIOApiAuthError):
+        breaker.before_request()
+    breaker.record_success()
+    breaker.before_request()
+
+
+async def test_transient_errors_are_retried() -> None:
+    """Connection errors and 5xx responses are retried."""
+    breaker = CircuitBreaker()
+    request = AsyncMock(
+        side_effect=[
+            NIOApiConnectionError("timeout"),
+            NIOApiConnectionError("bad gateway", 502),
+            {},
+        ]
+    )
+    assert await async_call_with_retry(breaker, request) == {}
+    assert request.await_count == 3
+    assert breaker.failures == 0
+
+
+async def test_retries_are_bounded() -> None:
+    """A request fails after the retries are used up and counts as one failure."""
+    breaker = CircuitBreaker()
+    request = AsyncMock(side_effect=NIOApiConnectionError("timeout"))
+    with pytest.raises(NIOApiConnectionError):
+        await async_call_with_retry(breaker, request)
+    assert request.await_count == 3
+    assert breaker.failures == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [NIOApiConnectionError("not found", 404), NIOApiResponseError("busy")],
+)
+async def test_permanent_errors_are_not_retried(error: Exception) -> None:
+    """Client errors and rejected requests are not retried."""
+    breaker = CircuitBreaker()
+    request = AsyncMock(side_effect=error)
+    with pytest.raises(type(error)):
+        await async_call_with_retry(breaker, request)
+    assert request.await_count == 1
+    assert breaker.failures == 1
+
+
+async def test_rate_limit_trips_immediately() -> None:
+    """A rate limit opens the breaker for at least the requested time."""
+    breaker = CircuitBreaker(base_backoff=1)
+    request = AsyncMock(side_effect=NIOApiRateLimitError(300))
+    with pytest.raises(NIOApiRateLimitError):
+        await async_call_with_retry(breaker, request)
+    assert breaker.state == STATE_OPEN
+    assert breaker.retry_in() > 290
+
+
+async def test_auth_error_is_recorded() -> None:
+    """An auth error suspends the vehicle without retrying."""
+    breaker = CircuitBreaker()
+    request = AsyncMock(side_effect=NIOApiAuthError("invalid_token"))
+    with pytest.raises(NIOApiAuthError):
+        await async_call_with_retry(breaker, request)
+    assert request.await_count == 1
+    assert breaker.state == STATE_AUTH_FAILED
+    with pytest.raises(NIOApiAuthError):
+        await async_call_with_retry(breaker, AsyncMock(return_value={}))
+
+
+async def test_breaker_per_vehicle(hass: HomeAssistant) -> None:
+    """Rejected credentials of one vehicle do not block the others."""
+    breaker = async_get_circuit_breaker(hass, MOCK_DATA)
+    other = async_get_circuit_breaker(hass, {**MOCK_DATA, "vehicle_id": "ES8-2"})
+    assert other is not breaker
+    assert async_get_circuit_breaker(hass, dict(MOCK_DATA)) is breaker
+
+    breaker.record_auth_failure("invalid_sign")
+    assert breaker.state == STATE_AUTH_FAILED
+    assert other.state == STATE_CLOSED
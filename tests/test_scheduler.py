@@ -0,0 +1,127 @@
+"""Tests for the adaptive polling scheduler."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.nio_vehicle.const import (
+    IDLE_SLEEP_AFTER,
+    INTERVAL_ASLEEP,
+    INTERVAL_AWAKE,
+    INTERVAL_CHARGING,
+    INTERVAL_DRIVING,
+    INTERVAL_FAST_CHARGING,
+    INTERVAL_PARKED,
+)
+from custom_components.nio_vehicle.model import (
+    ConnectionStatus,
+    DoorStatus,
+    ExteriorStatus,
+    PositionStatus,
+    SocStatus,
+    VehicleSnapshot,
+)
+from custom_components.nio_vehicle.scheduler import (
+    STATE_ASLEEP,
+    STATE_AWAKE,
+    STATE_CHARGING,
+    STATE_DRIVING,
+    STATE_FAST_CHARGING,
+    STATE_PARKED,
+    AdaptiveScheduler,
+)
+from custom_components.nio_vehicle.util import distance_m
+
+START = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _snapshot(
+    minutes: float,
+    *,
+    mileage: float = 1000.0,
+    soc: float = 50.0,
+    charge_state: int = 0,
+    locked: bool = True,
+    latitude: float = 31.2304,
+    connection: int | None = None,
+) -> VehicleSnapshot:
+    return VehicleSnapshot(
+        START + timedelta(minutes=minutes),
+        soc=SocStatus(soc=soc, charge_state=charge_state),
+        # vehicle_lock_status: 1 表示锁定
+        door=DoorStatus(vehicle_lock_status=1 if locked else 0),
+        exterior=ExteriorStatus(mileage=mileage),
+        position=PositionStatus(latitude=latitude, longitude=121.4737),
+        connection=ConnectionStatus(connection=connection),
+    )
+
+
+@pytest.fixture
+def scheduler() -> AdaptiveScheduler:
+    """Return a scheduler with wide bounds."""
+    return AdaptiveScheduler(timedelta(seconds=5), timedelta(hours=2))
+
+
+def test_parked_then_asleep(scheduler: AdaptiveScheduler) -> None:
+    """A locked, idle vehicle is polled less once it dwelled long enough."""
+    assert scheduler.next_interval(_snapshot(0)) == INTERVAL_PARKED
+    assert scheduler.state == STATE_PARKED
+    minutes = IDLE_SLEEP_AFTER.total_seconds() / 60
+    assert scheduler.next_interval(_snapshot(minutes - 1)) == INTERVAL_PARKED
+    assert scheduler.next_interval(_snapshot(minutes)) == INTERVAL_ASLEEP
+    assert scheduler.state == STATE_ASLEEP
+
+
+def test_offline_vehicle_is_asleep(scheduler: AdaptiveScheduler) -> None:
+    """A locked vehicle that is offline sleeps right away."""
+    scheduler.next_interval(_snapshot(0, connection=0))
+    assert scheduler.state == STATE_ASLEEP
+
+
+def test_unlocked_vehicle_is_awake(scheduler: AdaptiveScheduler) -> None:
+    """Unlocking resets the dwell time."""
+    scheduler.next_interval(_snapshot(0))
+    assert scheduler.next_interval(_snapshot(40, locked=False)) == INTERVAL_AWAKE
+    assert scheduler.state == STATE_AWAKE
+    scheduler.next_interval(_snapshot(41))
+    assert scheduler.state == STATE_PARKED
+
+
+def test_driving(scheduler: AdaptiveScheduler) -> None:
+    """Odometer or position changes mean driving."""
+    scheduler.next_interval(_snapshot(0))
+    assert scheduler.next_interval(_snapshot(1, mileage=1001)) == INTERVAL_DRIVING
+    assert scheduler.state == STATE_DRIVING
+    # 里程未更新，但位置移动超过阈值
+    scheduler.next_interval(_snapshot(2, mileage=1001, latitude=31.2404))
+    assert scheduler.state == STATE_DRIVING
+    scheduler.next_interval(_snapshot(3, mileage=1001, latitude=31.2404))
+    assert scheduler.state == STATE_PARKED
+
+
+def test_charging(scheduler: AdaptiveScheduler) -> None:
+    """The charging interval depends on how fast the SOC rises."""
+    scheduler.next_interval(_snapshot(0, soc=50, charge_state=1))
+    assert scheduler.next_interval(_snapshot(10, soc=52, charge_state=1)) == (
+        INTERVAL_CHARGING
+    )
+    assert scheduler.state == STATE_CHARGING
+    assert scheduler.next_interval(_snapshot(11, soc=53, charge_state=1)) == (
+        INTERVAL_FAST_CHARGING
+    )
+    assert scheduler.state == STATE_FAST_CHARGING
+
+
+def test_interval_is_clamped() -> None:
+    """The state intervals are clamped to the configured bounds."""
+    scheduler = AdaptiveScheduler(timedelta(minutes=1), timedelta(minutes=10))
+    assert scheduler.next_interval(_snapshot(0, mileage=1000)) == INTERVAL_PARKED
+    assert scheduler.next_interval(_snapshot(1, mileage=1001)) == timedelta(minutes=1)
+    assert scheduler.next_interval(_snapshot(2, connection=0)) == timedelta(minutes=10)
+
+
+def test_distance_m() -> None:
+    """One thousandth of a degree of latitude is about 111 metres."""
+    assert distance_m(31.2304, 121.4737, 31.2314, 121.4737) == pytest.approx(111.2, abs=0.1)
+    assert distance_m(31.2304, 121.4737, 31.2304, 121.4737) == 0
@@ -0,0 +1,172 @@
+"""Tests for the traffic recording and replay."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import gzip
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.nio_vehicle.const import (
+    CONF_PUSH_TRANSPORT,
+    CONF_REPLAY_PATH,
+    CONF_REPLAY_SPEED,
+    DOMAIN,
+    PUSH_REPLAY,
+)
+from custom_components.nio_vehicle.push import ReplayTransport
+from custom_components.nio_vehicle.traffic import (
+    FORMAT,
+    KIND_POLL,
+    KIND_PUSH,
+    TrafficRecorder,
+    read_recording,
+    sanitize,
+)
+
+from .conftest import setup_integration
+
+
+def test_sanitize() -> None:
+    """Identifiers are removed at any depth."""
+    assert sanitize(
+        {
+            "vin": "LJ1EEASP0KG000000",
+            "soc_status": {"soc": 80, "vehicle_id": "ES8-1"},
+            "list": [{"phone": "123", "value": 1}],
+        }
+    ) == {"soc_status": {"soc": 80}, "list": [{"value": 1}]}
+
+
+async def test_record_round_trip(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Recorded traffic is read back without identifiers."""
+    recorder = TrafficRecorder(hass, "ES8-1")
+    recorder.path = tmp_path / "es8_1.jsonl.gz"
+    with patch("custom_components.nio_vehicle.traffic.time.time", return_value=1000.0):
+        recorder.record(KIND_POLL, {"soc_status": {"soc": 80}, "vin": "x"}, ["soc"])
+    await recorder.async_flush()
+    with patch("custom_components.nio_vehicle.traffic.time.time", return_value=1012.5):
+        recorder.record(KIND_PUSH, {"door_status": {"vehicle_lock_status": 1}})
+    await recorder.async_flush()
+
+    with gzip.open(recorder.path, "rt") as file:
+        assert json.loads(file.readline())["format"] == FORMAT
+    records = list(read_recording(recorder.path))
+    assert [(record.time, record.kind, record.fields) for record in records] == [
+        (1000.0, KIND_POLL, ("soc",)),
+        (1012.5, KIND_PUSH, ()),
+    ]
+    assert records[0].data == {"soc_status": {"soc": 80}}
+    assert recorder.as_dict() == {"file": "es8_1.jsonl.gz", "records": 2, "pending": 0}
+
+
+def test_invalid_lines_are_skipped(tmp_path: Path) -> None:
+    """Broken lines and records without data are ignored."""
+    path = tmp_path / "recording.jsonl.gz"
+    path.write_bytes(
+        gzip.compress(
+            b'{"format": "nio_vehicle_traffic", "version": 1}\n'
+            b'{"t": 1, "data": {"soc_status": {"soc": 1}}}\n'
+            b'{"t": 2, "data": null}\n'
+            b'{"t": 3, "da\n'
+        )
+    )
+    records = list(read_recording(path))
+    assert len(records) == 1
+    assert records[0].kind == KIND_POLL
+
+
+async def test_replay(hass: HomeAssistant, tmp_path: Path) -> None:
+    """The replay transport feeds the recorded statuses with their times."""
+    recorder = TrafficRecorder(hass, "ES8-1")
+    recorder.path = tmp_path / "es8_1.jsonl.gz"
+    for soc in (80, 79, 78):
+        recorder.record(KIND_POLL, {"soc_status": {"soc": soc}})
+    await recorder.async_flush()
+
+    on_status = Mock()
+    on_connection = Mock()
+    transport = ReplayTransport(
+        hass, "ES8-1", on_status, on_connection, recorder.path, speed=0
+    )
+    await transport.async_start()
+    await transport.finished.wait()
+    assert [call.args[0]["soc_status"]["soc"] for call in on_status.call_args_list] == [
+        80,
+        79,
+        78,
+    ]
+    assert isinstance(on_status.call_args.args[1], datetime)
+    assert [call.args[0] for call in on_connection.call_args_list] == [True, False]
+    assert transport.as_dict()["records"] == 3
+
+
+def _write_truncated(path: Path) -> None:
+    complete = gzip.compress(b'{"t": 1, "data": {"soc_status": {"soc": 80}}}\n')
+    damaged = gzip.compress(b'{"t": 2, "data": {"soc_status": {"soc": 79}}}\n')
+    # 第二个 gzip 段在写入时被中断
+    path.write_bytes(complete + damaged[: len(damaged) // 2])
+
+
+def test_truncated_recording(tmp_path: Path) -> None:
+    """A recording cut off mid-member yields the records before the cut."""
+    path = tmp_path / "recording.jsonl.gz"
+    _write_truncated(path)
+    records = list(read_recording(path))
+    assert [record.data["soc_status"]["soc"] for record in records] == [80]
+
+
+@pytest.mark.parametrize("content", [None, b"not gzip"])
+async def test_replay_unreadable(
+    hass: HomeAssistant, tmp_path: Path, content: bytes | None
+) -> None:
+    """Truncated or invalid recordings end the replay instead of failing."""
+    path = tmp_path / "recording.jsonl.gz"
+    if content is None:
+        _write_truncated(path)
+    else:
+        path.write_bytes(content)
+    on_status = Mock()
+    transport = ReplayTransport(hass, "ES8-1", on_status, Mock(), path, speed=0)
+    await transport.async_start()
+    await transport.finished.wait()
+    assert on_status.call_count == (1 if content is None else 0)
+
+
+async def test_replay_suspends_polling(
+    hass: HomeAssistant, mock_api: AsyncMock, tmp_path: Path
+) -> None:
+    """The coordinator does not poll while a replay is running."""
+    path = tmp_path / "recording.jsonl.gz"
+    path.write_bytes(
+        gzip.compress(
+            b'{"t": 1.0, "data": {"soc_status": {"soc": 70}}}\n'
+            b'{"t": 1.2, "data": {"soc_status": {"soc": 69}}}\n'
+        )
+    )
+    entry = await setup_integration(
+        hass,
+        options={
+            CONF_PUSH_TRANSPORT: PUSH_REPLAY,
+            CONF_REPLAY_PATH: str(path),
+            CONF_REPLAY_SPEED: 1,
+        },
+    )
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    await asyncio.sleep(0)
+    assert coordinator.push.connected
+    assert coordinator.update_interval is None
+    calls = mock_api.call_count
+
+    await asyncio.wait_for(coordinator.push.finished.wait(), 5)
+    await hass.async_block_till_done()
+    # 回放结束后立即对账，并恢复自适应轮询
+    assert mock_api.call_count == calls + 1
+    assert coordinator.update_interval is not None
+
+    await hass.config_entries.async_unload(entry.entry_id)
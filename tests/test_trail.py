@@ -0,0 +1,72 @@
+"""Tests for the simplified location trail."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.nio_vehicle.trail import LocationTrail, encode_polyline
+
+START = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+# 纬度 0.001° 约 111 米
+STEP = 0.001
+
+
+def _drive(trail: LocationTrail, points: list[tuple[float, float]]) -> None:
+    for index, (latitude, longitude) in enumerate(points):
+        trail.add(START + timedelta(seconds=15 * index), latitude, longitude)
+
+
+def test_encode_polyline_reference() -> None:
+    """Encode the example of the polyline algorithm documentation."""
+    points = [(0, 38.5, -120.2), (0, 40.7, -120.95), (0, 43.252, -126.453)]
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+def test_parked_duplicates_are_dropped() -> None:
+    """Positions within the minimum distance of the last one are dropped."""
+    trail = LocationTrail()
+    assert trail.add(START, 31.2, 121.4)
+    assert not trail.add(START + timedelta(minutes=1), 31.2, 121.40001)
+    assert len(trail) == 1
+
+
+def test_straight_line_keeps_end_points() -> None:
+    """A straight drive collapses to its first and last position."""
+    trail = LocationTrail()
+    _drive(trail, [(31.2 + i * STEP, 121.4) for i in range(50)])
+    points = trail.points()
+    assert len(points) == 2
+    assert points[0][1:] == (31.2, 121.4)
+    assert points[-1][1] == 31.2 + 49 * STEP
+
+
+def test_corner_is_kept() -> None:
+    """Turning a corner keeps the corner as an anchor."""
+    trail = LocationTrail()
+    north = [(31.2 + i * STEP, 121.4) for i in range(20)]
+    east = [(31.2 + 19 * STEP, 121.4 + i * STEP) for i in range(1, 20)]
+    _drive(trail, north + east)
+    points = [point[1:] for point in trail.points()]
+    assert len(points) == 3
+    assert points[1] == north[-1]
+
+
+def test_trail_is_bounded() -> None:
+    """Old anchors are discarded once the trail is full."""
+    trail = LocationTrail(max_points=5)
+    # 之字形路线使每个拐点都被保留
+    _drive(
+        trail,
+        [(31.2 + i * STEP, 121.4 + (i % 2) * STEP) for i in range(40)],
+    )
+    assert len(trail) <= 6
+
+
+def test_points_since() -> None:
+    """Only points at or after the given time are returned."""
+    trail = LocationTrail()
+    north = [(31.2 + i * STEP, 121.4) for i in range(10)]
+    east = [(31.2 + 9 * STEP, 121.4 + i * STEP) for i in range(1, 10)]
+    _drive(trail, north + east)
+    since = START + timedelta(seconds=15 * 5)
+    assert [point[1:] for point in trail.points(since)] == [north[-1], east[-1]]
+    assert trail.as_polyline(since) == encode_polyline(trail.points(since))
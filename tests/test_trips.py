@@ -0,0 +1,108 @@
+"""Tests for the incremental trip detection."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.nio_vehicle.const import TRIP_END_IDLE, TRIP_LOCKED_DWELL
+from custom_components.nio_vehicle.model import (
+    DoorStatus,
+    ExteriorStatus,
+    SocStatus,
+    VehicleSnapshot,
+)
+from custom_components.nio_vehicle.trips import TripDetector
+
+START = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+class Drive:
+    """Feed a trip detector with synthetic snapshots."""
+
+    def __init__(self, detector: TripDetector) -> None:
+        self.detector = detector
+        self.time = START
+        self.mileage = 1000.0
+        self.soc = 80.0
+        self.finished = []
+
+    def sample(self, after: timedelta, distance: float = 0.0, locked: bool = False):
+        self.time += after
+        self.mileage += distance
+        self.soc -= distance * 0.2
+        snapshot = VehicleSnapshot(
+            self.time,
+            soc=SocStatus(soc=round(self.soc, 1)),
+            # vehicle_lock_status: 1 表示锁定
+            door=DoorStatus(vehicle_lock_status=1 if locked else 0),
+            exterior=ExteriorStatus(mileage=self.mileage),
+        )
+        if (trip := self.detector.update(snapshot)) is not None:
+            self.finished.append(trip)
+        return trip
+
+    def drive(self, samples: int, distance: float = 0.5, locked: bool = False):
+        for _ in range(samples):
+            self.sample(timedelta(seconds=15), distance, locked)
+
+
+def test_trip_ends_after_idle_time() -> None:
+    """An unlocked vehicle ends its trip after standing still for a while."""
+    drive = Drive(TripDetector())
+    drive.sample(timedelta(0), locked=True)
+    drive.drive(10)
+    assert drive.detector.current is not None
+    assert drive.sample(TRIP_END_IDLE / 2) is None
+    trip = drive.sample(TRIP_END_IDLE / 2)
+    assert trip is not None
+    assert trip.distance == 5.0
+    assert trip.soc_used == 1.0
+    assert trip.start.time == START
+    assert trip.duration == 2.5
+    assert drive.detector.last_trip is trip
+    assert drive.detector.current is None
+
+
+def test_auto_lock_at_traffic_stop_keeps_the_trip() -> None:
+    """Locking while briefly stopped does not split the trip."""
+    drive = Drive(TripDetector())
+    drive.sample(timedelta(0))
+    drive.drive(10, locked=True)
+    # 等红灯一分钟，车辆保持锁定
+    for _ in range(4):
+        drive.sample(timedelta(seconds=15), locked=True)
+    drive.drive(10, locked=True)
+    assert drive.finished == []
+
+    assert drive.sample(TRIP_LOCKED_DWELL - timedelta(seconds=1), locked=True) is None
+    trip = drive.sample(timedelta(seconds=1), locked=True)
+    assert trip is not None
+    assert trip.distance == 10.0
+    assert len(drive.detector.trips) == 1
+
+
+def test_short_trips_are_discarded() -> None:
+    """Moving the car a few metres is not recorded as a trip."""
+    drive = Drive(TripDetector())
+    drive.sample(timedelta(0))
+    drive.drive(1, distance=0.1)
+    assert drive.sample(TRIP_END_IDLE) is None
+    assert drive.detector.current is None
+    assert not drive.detector.trips
+
+
+def test_trip_log_is_bounded() -> None:
+    """Only the most recent trips are kept."""
+    drive = Drive(TripDetector(max_trips=3))
+    drive.sample(timedelta(0))
+    for _ in range(5):
+        drive.drive(4)
+        drive.sample(TRIP_END_IDLE)
+    assert len(drive.finished) == 5
+    assert list(drive.detector.trips) == drive.finished[-3:]
+
+
+def test_snapshots_without_mileage_are_ignored() -> None:
+    """Snapshots missing the odometer do not affect the detection."""
+    detector = TripDetector()
+    assert detector.update(VehicleSnapshot(START)) is None
+    assert detector.current is None
@@ -0,0 +1,114 @@
+"""Tests for the tyre slow-leak detection."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import math
+import random
+
+import pytest
+
+from custom_components.nio_vehicle.const import TYRE_LEAK_RATE
+from custom_components.nio_vehicle.model import HvacStatus, TyreStatus, VehicleSnapshot
+from custom_components.nio_vehicle.tyres import TyreLeakDetector, compensate
+
+START = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(
+    hours: float, temperature: float, front_left_offset: float = 0.0, noise=None
+) -> VehicleSnapshot:
+    # 冷态 2.5 bar，按温度变化
+    pressure = 2.5 * (temperature + 273.15) / 293.15
+    jitter = noise or (lambda: 0.0)
+    return VehicleSnapshot(
+        START + timedelta(hours=hours),
+        tyre=TyreStatus(
+            front_left_wheel_press_bar=round(pressure + front_left_offset + jitter(), 2),
+            front_right_wheel_press_bar=round(pressure + jitter(), 2),
+            rear_left_wheel_press_bar=round(pressure + 0.1 + jitter(), 2),
+            rear_right_wheel_press_bar=round(pressure + 0.1 + jitter(), 2),
+        ),
+        hvac=HvacStatus(outside_temperature=temperature),
+    )
+
+
+def _temperature(hours: float) -> float:
+    # 昼夜温差 15 °C
+    return 10 + 7.5 * math.sin(hours / 24 * 2 * math.pi)
+
+
+def test_compensate() -> None:
+    """Pressures are normalized to 20 °C."""
+    assert compensate(2.5, 20) == pytest.approx(2.5)
+    assert compensate(2.5, None) == 2.5
+    assert compensate(2.3, -10) > 2.5
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_no_leak_with_temperature_swings(seed: int) -> None:
+    """Day and night cycles with sensor noise are not a leak."""
+    generator = random.Random(seed)
+    detector = TyreLeakDetector()
+    for hour in range(24 * 14):
+        detector.update(
+            _snapshot(hour, _temperature(hour), noise=lambda: generator.gauss(0, 0.015))
+        )
+        assert detector.leaking == ()
+    assert detector.leak_rate < TYRE_LEAK_RATE
+
+
+def test_slow_leak_is_detected() -> None:
+    """A tyre losing air against its axle partner is flagged."""
+    detector = TyreLeakDetector()
+    for hour in range(24 * 7):
+        detector.update(_snapshot(hour, _temperature(hour)))
+    assert detector.leaking == ()
+
+    detected = None
+    for hour in range(24 * 7, 24 * 10):
+        # 每天漏 0.1 bar
+        offset = -0.1 * (hour - 24 * 7) / 24
+        detector.update(_snapshot(hour, _temperature(hour), offset))
+        if detector.leaking and detected is None:
+            detected = hour - 24 * 7
+    assert detected is not None and detected < 48
+    assert detector.leaking == ("front_left",)
+    assert 0.05 <= detector.leak_rate <= 0.1
+    assert detector.as_dict()["front_left"]["leaking"]
+
+
+def test_leak_clears_with_hysteresis() -> None:
+    """A leak clears only once the pressure mostly recovered."""
+    detector = TyreLeakDetector()
+    hour = 0
+    for hour in range(24 * 7):
+        detector.update(_snapshot(hour, 20))
+    for offset in (-0.1, -0.2, -0.3):
+        hour += 6
+        detector.update(_snapshot(hour, 20, offset))
+    assert detector.leaking == ("front_left",)
+
+    # 仍低于阈值的一半，保持告警
+    hour += 6
+    detector.update(_snapshot(hour, 20, -0.1))
+    assert detector.leaking == ("front_left",)
+    hour += 6
+    assert detector.update(_snapshot(hour, 20, 0.0))
+    assert detector.leaking == ()
+
+
+def test_incomplete_snapshots_are_ignored() -> None:
+    """Snapshots missing a pressure do not update the statistics."""
+    detector = TyreLeakDetector()
+    assert not detector.update(VehicleSnapshot(START))
+    assert not detector.update(VehicleSnapshot(START, tyre=TyreStatus()))
+    assert detector.leak_rate is None
+
+
+def test_older_snapshots_are_ignored() -> None:
+    """Samples older than the last one, e.g. from a replay, are skipped."""
+    detector = TyreLeakDetector()
+    detector.update(_snapshot(24 * 365 * 50, 20))
+    deviations = {p: s.deviation for p, s in detector.tyres.items()}
+    assert not detector.update(_snapshot(0, 20, front_left_offset=-0.5))
+    assert {p: s.deviation for p, s in detector.tyres.items()} == deviations